@@ -1,16 +1,43 @@
-from selenium import webdriver
-from selenium.common.exceptions import NoSuchElementException, TimeoutException, UnexpectedAlertPresentException
-from selenium.webdriver.support.ui import WebDriverWait, Select
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.common.by import By
+# selenium.webdriver (SEMUA DRIVER BROWSER) DIIMPOR SAAT BROWSER DIPAKAI, BUKAN SAAT COLD START
+from selenium.common.exceptions import TimeoutException, UnexpectedAlertPresentException, WebDriverException
 from dotenv import load_dotenv
 from .utilities import Util
-from time import sleep
+from .layout import LAYOUT
+from .skp import SkpCatalog, SCRAPE_OPTIONS_JS
+from .report import RunReport
+from .deadline import Deadline, DeadlineExceeded
+from .runstate import RunStateStore, find_entry, DONE_STATES, SUBMITTING, SUBMITTED, VERIFIED, FAILED
+from .planner import PlanCache, compile_plan
+from .history import History
+from .governor import Governor, is_portal_error
+from .watchdog import Watchdog, WatchdogTripped, DriverCrashed
+from .browser import chrome_arguments
+from .memory import MemorySampler
+from .memtrace import MemoryTracer
+from .diagnostics import Diagnostics
+from .navtiming import NavigationTimer
+from .commands import CommandCounter
+from .recorder import SessionRecorder
+from .timeouts import StepTimeouts
+from .profiling import profiled
+from .logs import bind_run
+from .validation import validate_plan, check_skp, has_errors
+from time import sleep, perf_counter, time
+from datetime import date, datetime
+from collections import deque
 import logging
 import os
 
+# Perkiraan awal durasi pengisian satu kegiatan (detik), sebelum ada pengukuran
+ENTRY_BUDGET = 30
+# Batas browser dibuat ulang (watchdog atau crash) dalam satu run
+MAX_RESTARTS = 3
+
 load_dotenv()
 botlog = logging.getLogger(__name__)
+
+# Alamat SIMPEG, dapat diarahkan ke portal tiruan untuk benchmark (portal_url)
+PORTAL_URL = "https://simpeg.kemenkumham.go.id/devp/siap"
 botlog.setLevel(logging.INFO)
 
 class BOT(Util):
@@ -20,11 +47,13 @@ class BOT(Util):
     and starting the automation process. The class uses the Chrome webdriver and supports both local and remote execution. 
     The code also imports necessary modules and defines some utility functions.
     """
-    def __init__(self, server='lambda'):
+    def __init__(self, server='lambda', username=None, password=None):
         """Initialize the BOT class.
 
         Parameters:
         - server (str) {local/lambda}: The server to be used for execution. Default is 'lambda'.
+        - username (str): The NIP to log in with. Defaults to the `nip` environment variable.
+        - password (str): The password to log in with. Defaults to the `password` environment variable.
 
         Attributes:
         - username (str): The username for login.
@@ -32,35 +61,84 @@ class BOT(Util):
         - is_complete_fill (bool): Flag to indicate if the journal filling process is complete. Default is False.
         - exception_occured (bool): Flag to indicate if a timeout occurred during the journal filling process. Default is False.
         - server (str): The server to be used for execution.
+        - driver (WebDriver): The webdriver, None until `launch()` is called.
+        - report (RunReport): The report of the current run, created by `start()`.
+        - plan_cache (PlanCache): Cache of the compiled daily plans.
+        - deadline (Deadline): Remaining time budget of the current run, unlimited by default.
+        - run_state (RunStateStore): Lifecycle state of the planned entries, opened by `start()`.
+        - history (History): History of every submitted entry, opened by `start()`.
+        - attempts (int): Number of attempts used by the last `fill_jurnal` call.
+        - keep_browser (bool): Keep the driver open after `start()`, used by the daemon mode. Default is False.
+        - governor (Governor): Shared portal rate limit, session cap and circuit breaker, opened by `start()`.
+        - session_id (str): The portal session slot held during `start()`, taken before it by a daemon warm login.
+        - watchdog (Watchdog): Wall-clock limits on WebDriver commands and entries, installed on every driver.
+        - restarts (int): Drivers recreated after a watchdog intervention or a crash during the current run.
+        - cookies (list): Cookies of the last successful login, used to restore the session after a crash.
+        - memory (MemorySampler): Peak RSS of chromedriver and Chrome per phase, and the alert threshold.
+        - memtrace (MemoryTracer): Python allocations at the phase boundaries, when `memtrace` is set.
+        - diagnostik (Diagnostics): Recent pages and failed attempts of the current entry, saved when it fails.
+        - portal_url (str): Base URL of the portal. Defaults to the `portal_url` environment variable, else SIMPEG.
+        - login_pause (float): Seconds waited after logging in. Default is 3.
+        - navigasi (NavigationTimer): Collects the Navigation Timing and CDP metrics of every page into the report.
+        - perintah (CommandCounter): Counts the WebDriver commands per phase, entry and command type.
+        - perekam (SessionRecorder): Records the WebDriver commands and pages of the run, when `record` is set.
+        - timeouts (StepTimeouts): Timeout of each wait step, learned from its latency in the history.
 
         Returns:
         - None
         """
         super().__init__()
-        self.username = os.getenv('nip')
-        self.password = os.getenv('password')
+        self.username = username or os.getenv('nip')
+        self.password = password or os.getenv('password')
         self.is_complete_fill = False
         self.exception_occured = False
         self.is_login = False
         self.server = server
+        self.driver = None
+        self.report = None
+        self.plan_cache = PlanCache()
+        self.deadline = Deadline()
+        self.run_state = None
+        self.history = None
+        self.attempts = 0
+        self.keep_browser = False
+        self.governor = None
+        self.session_id = None
+        self.watchdog = Watchdog(on_trip=self.catat_intervensi)
+        self.restarts = 0
+        self.cookies = None
+        self.portal_url = os.getenv('portal_url', PORTAL_URL)
+        self.login_pause = 3
+        self.navigasi = NavigationTimer()
+        self.perintah = CommandCounter(context=lambda: (self.report.current if self.report is not None else None,
+                                                        self.watchdog.entry_idx))
+        self.perekam = SessionRecorder(context=self.perintah.context)
+        self.timeouts = StepTimeouts()
+        self.memory = MemorySampler(phase=lambda: self.report.current if self.report is not None else None)
+        self.memtrace = MemoryTracer()
+        self.diagnostik = Diagnostics()
+
+    def launch(self):
+        """Start the Chrome webdriver for the configured server.
+
+        The driver is started lazily by `start()`, after the day's plan has been validated,
+        so a holiday or invalid sheet data never pays for launching Chrome.
+        """
+        if self.driver is not None:
+            return self.driver
+        from selenium import webdriver
 
         if self.server == 'lambda':
             options = webdriver.ChromeOptions()
-            service = webdriver.ChromeService("/opt/chromedriver")
-
-            options.binary_location = '/opt/chrome/chrome'
-            options.add_argument("--headless=new")
-            options.add_argument('--no-sandbox')
-            options.add_argument("--disable-gpu")
-            options.add_argument("--window-size=1280x1696")
-            options.add_argument("--single-process")
-            options.add_argument("--disable-dev-shm-usage")
-            options.add_argument("--disable-dev-tools")
-            options.add_argument("--no-zygote")
-            options.add_argument("--remote-debugging-port=9222")
-            options.add_argument("--incognito")
+            service = webdriver.ChromeService(os.getenv('chromedriver', '/opt/chromedriver'))
+
+            options.binary_location = os.getenv('chrome_binary', '/opt/chrome/chrome')
+            # PROFIL MEMORI RENDAH (chrome_profile, chrome_js_heap, chrome_renderer_limit)
+            for argument in chrome_arguments():
+                options.add_argument(argument)
 
             self.driver = webdriver.Chrome(options=options, service=service)
+            self.memory.attach(service.process.pid)
 
         elif self.server == 'local':
             from selenium.webdriver.chrome.options import Options as ChromeOptions
@@ -68,14 +146,54 @@ class BOT(Util):
                             command_executor='http://localhost:4444/wd/hub',
                             options=ChromeOptions()
                         )
-            
+        # PEREKAM PALING DALAM: DURASI TANPA OVERHEAD PENCATAT LAIN, DI DALAM BATAS WATCHDOG
+        self.perekam.install(self.driver)
+        self.watchdog.install(self.driver)
+        self.perintah.install(self.driver)
+        if self.watchdog.command_timeout > 0:
+            # PORTAL YANG TIDAK MERESPON DIHENTIKAN OLEH CHROMEDRIVER SEBELUM WATCHDOG TURUN TANGAN
+            self.driver.set_page_load_timeout(self.watchdog.command_timeout)
+        return self.driver
+
     def get(self, url):
-        """Navigate to the specified URL.
+        """Navigate to the specified URL and add its timing record to the run report.
 
         Parameters:
         - url (str): The URL to navigate to.
         """
+        self.antre()
+        self.diagnostik.note("url", url)
+        started = perf_counter()
         self.driver.get(url)
+        if self.report is not None:
+            record = self.navigasi.collect(self.driver, url, perf_counter() - started, phase=self.report.current)
+            if record is not None:
+                self.report.navigations.append(record)
+
+    def antre(self):
+        """Wait for the governor's turn before a portal request and report the queueing delay.
+
+        Raises:
+        - PortalBusy: If the turn does not come within the remaining time budget.
+        """
+        if self.governor is None:
+            return
+        waited = self.governor.request(timeout=self.deadline.remaining())
+        if self.report is not None:
+            self.report.add_wait("portal", waited)
+
+    def portal_error(self, error) -> bool:
+        """Return True if `error` was caused by the portal (connection error, 5xx page) rather than by the entry.
+
+        Parameters:
+        - error (Exception): The error of a failed attempt.
+        """
+        try:
+            title = self.driver.title
+        except Exception:
+            title = None
+        # repr() DARI EXCEPTION SELENIUM TIDAK MEMUAT PESANNYA
+        return is_portal_error(repr(error), str(error), title)
 
     def wait_element_clear(self, XPATH, time=30):
         """Wait for an element to be clickable and then clear its value.
@@ -93,9 +211,7 @@ class BOT(Util):
         Raises:
         - TimeoutException: If the element is not clickable within the specified time limit.
         """
-        WebDriverWait(self.driver, time).until(EC.element_to_be_clickable(
-            (By.XPATH, XPATH)))
-        self.driver.find_element(By.XPATH, XPATH).clear()
+        self.wait_element_get(XPATH, time).clear()
 
     def wait_element_get(self, XPATH, time=30):
         """Wait for an element to be clickable and return it.
@@ -106,18 +222,29 @@ class BOT(Util):
         Parameters:
         - XPATH (str): The XPath of the element to wait for and return.
         - time (int): The maximum time in seconds to wait for the element to be clickable. Default is 30 seconds.
+          Replaced by the timeout learned from the latency of this XPath once it has enough samples (see `app/timeouts.py`).
 
         Returns:
         - WebElement: The clickable element specified by the given XPath.
         """
-        WebDriverWait(self.driver, time).until(EC.element_to_be_clickable(
-            (By.XPATH, XPATH)))
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.webdriver.common.by import By
+
+        self.diagnostik.note("xpath", XPATH)
+        timeout = self.timeouts.get(XPATH, time)
+        started = perf_counter()
+        try:
+            WebDriverWait(self.driver, self.deadline.clamp(timeout)).until(
+                EC.element_to_be_clickable((By.XPATH, XPATH)))
+        except TimeoutException:
+            self.timeouts.timed_out(XPATH, shortened=timeout < time)
+            raise
+        self.timeouts.observe(XPATH, perf_counter() - started)
         return self.driver.find_element(By.XPATH, XPATH)
 
     def wait_element_click(self, XPATH, time=60):
-        WebDriverWait(self.driver, time).until(EC.element_to_be_clickable(
-            (By.XPATH, XPATH)))
-        self.driver.find_element(By.XPATH, XPATH).click()
+        self.wait_element_get(XPATH, time).click()
 
     def wait_element_input(self, input, XPATH, time=30):
         """Wait for an element to be clickable and click it.
@@ -129,9 +256,7 @@ class BOT(Util):
         - XPATH (str): The XPath of the element to wait for and click.
         - time (int): The maximum time in seconds to wait for the element to be clickable. Default is 60 seconds.
         """
-        WebDriverWait(self.driver, time).until(EC.element_to_be_clickable(
-            (By.XPATH, XPATH)))
-        self.driver.find_element(By.XPATH, XPATH).send_keys(input)\
+        self.wait_element_get(XPATH, time).send_keys(input)
 
     def wait_element_select_value(self, value: str, XPATH, time=30):
         """Wait for an element to be clickable and select an option by its value.
@@ -144,9 +269,9 @@ class BOT(Util):
         - XPATH (str): The XPath of the element to wait for and select.
         - time (int): The maximum time in seconds to wait for the element to be clickable. Default is 30 seconds.
         """
-        WebDriverWait(self.driver, time).until(EC.element_to_be_clickable(
-            (By.XPATH, XPATH)))
-        Select(self.driver.find_element(By.XPATH, XPATH)).select_by_value(value)
+        from selenium.webdriver.support.ui import Select
+
+        Select(self.wait_element_get(XPATH, time)).select_by_value(value)
 
     def wait_element_select_index(self, index: int, XPATH, time=30):
         """Wait for an element to be clickable and select an option by its index.
@@ -159,14 +284,111 @@ class BOT(Util):
         - XPATH (str): The XPath of the element to wait for and select.
         - time (int): The maximum time in seconds to wait for the element to be clickable. Default is 30 seconds.
         """
-        WebDriverWait(self.driver, time).until(EC.element_to_be_clickable(
-            (By.XPATH, XPATH)))
-        Select(self.driver.find_element(By.XPATH, XPATH)).select_by_index(index)
+        from selenium.webdriver.support.ui import Select
+
+        Select(self.wait_element_get(XPATH, time)).select_by_index(index)
     
     def close(self):
         """Close Driver"""
-        return self.driver.quit()
+        if self.driver is not None:
+            try:
+                self.driver.quit()
+            except Exception as e:
+                # SESI YANG SUDAH MATI TIDAK DAPAT DI-QUIT
+                botlog.warning(f"Driver tidak dapat ditutup {repr(e)}")
+            self.driver = None
+            self.memory.detach()
+        self.is_login = False
     
+    def catat_intervensi(self, record: dict):
+        """Record a watchdog intervention in the report of the current run.
+
+        Parameters:
+        - record (dict): The intervention, as built by `Watchdog.trip`.
+        """
+        if self.report is not None:
+            self.report.interventions.append(record)
+            self.report.count("watchdog")
+
+    def mulai_ulang_browser(self) -> bool:
+        """Tear down the driver, launch a new one and log in again.
+
+        Returns:
+        - bool: True if the new session is logged in.
+
+        Raises:
+        - WatchdogTripped: If the driver has already been recreated `MAX_RESTARTS` times in this run.
+        """
+        self.restarts += 1
+        if self.restarts > MAX_RESTARTS:
+            raise WatchdogTripped(f"Browser sudah dibuat ulang {MAX_RESTARTS} kali, portal tidak merespon")
+        botlog.warning(f"Membuat ulang browser ({self.restarts} dari {MAX_RESTARTS}) ...")
+        self.close()
+        return self.buka_sesi()
+
+    def buka_sesi(self) -> bool:
+        """Launch the driver if needed and log in, relaunching it if the browser crashes meanwhile.
+
+        A session lost with a crashed browser is first restored from the cookies of the last login,
+        so a crash usually costs one browser restart and no new login.
+
+        Returns:
+        - bool: True if the session is logged in.
+        """
+        try:
+            with self.report.phase("browser"):
+                self.launch()
+            self.memtrace.snapshot("browser")
+            if not self.is_login:
+                with self.report.phase("login"):
+                    self.is_login = self.pulihkan_sesi() or self.login()
+                self.memtrace.snapshot("login")
+            return self.is_login
+        except DriverCrashed as e:
+            botlog.error(f"{e}")
+            self.report.count("crash")
+            return self.mulai_ulang_browser()
+
+    def pulihkan_sesi(self) -> bool:
+        """Restore the login of this employee from the cached cookies into a fresh browser.
+
+        Returns:
+        - bool: True if the journal page opens with the restored cookies.
+        """
+        if not self.cookies:
+            return False
+        try:
+            # COOKIE HANYA DAPAT DIPASANG PADA DOMAIN YANG SEDANG DIBUKA
+            self.get(f'{self.portal_url}/skp_journal.php')
+            for cookie in self.cookies:
+                self.driver.add_cookie({key: cookie[key] for key in ("name", "value", "path", "secure", "httpOnly") if key in cookie})
+            self.get(f'{self.portal_url}/skp_journal.php')
+            # TOMBOL TAMBAH HANYA ADA JIKA SUDAH LOGIN
+            self.wait_element_get(XPATH="/html/body/div[3]/div[2]/a[1]", time=10)
+            botlog.info("Sesi login dipulihkan dari cookie")
+            return True
+        except (DeadlineExceeded, WatchdogTripped, DriverCrashed):
+            raise
+        except Exception as e:
+            botlog.warning(f"Sesi tidak dapat dipulihkan, login ulang {repr(e)}")
+            return False
+
+    def ganti_pegawai(self, username: str, password: str):
+        """Switch to another employee, keeping an open browser but forcing a new login.
+
+        Parameters:
+        - username (str): The NIP of the next employee.
+        - password (str): Its password.
+        """
+        if self.driver is not None:
+            try:
+                self.driver.delete_all_cookies()
+            except Exception:
+                self.close()
+        self.is_login = False
+        self.cookies = None
+        self.username, self.password = username, password
+
     def login(self):
         """Login to SIMPEG KEMENKUMHAM
 
@@ -178,7 +400,7 @@ class BOT(Util):
         botlog.info("Login ...")
         
         try:
-            self.get('https://simpeg.kemenkumham.go.id/devp/siap/signin.php')
+            self.get(f'{self.portal_url}/signin.php')
             # USERNAME FILL FORM
             self.wait_element_input(input=self.username, XPATH="/html/body/div[1]/div/div/div/div/div/div/div[2]/input[1]")
             # USERNAME CLICK FORM
@@ -186,10 +408,15 @@ class BOT(Util):
             # PASSWORD FILL FORM
             self.wait_element_input(input=self.password, XPATH="/html/body/div[2]/div[2]/form/input[7]")
             # PASSWORD CLICK FORM
+            self.antre()
             self.wait_element_click(XPATH="/html/body/div[2]/div[3]/button[1]")
 
             botlog.info("Login Done")
-            sleep(3)
+            if self.governor is not None:
+                self.governor.success()
+            sleep(self.login_pause)
+            # SIMPAN COOKIE SESI UNTUK MEMULIHKAN LOGIN JIKA BROWSER CRASH
+            self.cookies = self.driver.get_cookies()
             return True
         
         except UnexpectedAlertPresentException as uape: 
@@ -197,8 +424,13 @@ class BOT(Util):
             self.exception_occured = True
             return False
 
+        except (DeadlineExceeded, WatchdogTripped, DriverCrashed):
+            raise
+
         except Exception as e:
             botlog.critical(f"Login Failed {repr(e)}")
+            if self.governor is not None:
+                self.governor.failure()
             self.send_email(subject=f"Pengisian Jurnal SIMPEG KEMENKUMHAM Tanggal {self.date} Gagal",
                             body=f"Salam. Semoga anda dalam keadaan baik, saya ingin memberitahu anda bahwa tidak dapat login ke SIMPEG KEMENKUMHAM. Terjadi kesalahan {repr(e)}.\n\nTerima kasih atas perhatiannya,\nSalam hormat.")
             self.exception_occured = True
@@ -212,8 +444,8 @@ class BOT(Util):
         - menit_mulai (str): The starting minute of the activity.
         - jam_selesai (str): The ending hour of the activity.
         - menit_selesai (str): The ending minute of the activity.
-        - skp (int): The SKP value for the activity.
-        - skp_value (str): The SKP value for the activity.
+        - skp (int): The SKP option index for the activity, used for logging.
+        - skp_value (str): The SKP option value for the activity, resolved from the SKP catalog.
         - kegiatan (str): The description of the activity.
         - jumlah_diselesaikan (int): The number of tasks completed for the activity.
 
@@ -226,20 +458,33 @@ class BOT(Util):
         6. Inputs the number of tasks completed for the activity.
         7. Clicks the "Simpan" button to save the journal entry.
 
-        If a TimeoutException occurs during the process, it raises an exception and sends an email notification.
-        If any other exception occurs, it retries the process up to a maximum of 10 times.
+        If waiting for an element times out, it raises an exception and sends an email notification; a page
+        that does not finish loading is retried like any other error.
+        A timeout under a learned limit shorter than the fixed one is first retried once with the fixed timeouts.
+        If any other exception occurs, it retries the process up to a maximum of 15 times.
+        Waits and retries are limited by `self.deadline`; when it is used up `DeadlineExceeded` is raised.
 
         Returns:
-        - None
+        - bool: True if the entry was saved, False otherwise.
         """
         max_retries = 15
         retries = 0
+        self.diagnostik.clear()
+        self.timeouts.relaxed = False
         botlog.info(f"Mengisi jurnal harian {kegiatan} | waktu mulai {jam_mulai}:{menit_mulai} & waktu selesai {jam_selesai}:{menit_selesai} | SKP {skp} dan jumlah diselesaikan {jumlah_diselesaikan}")
         # melakukan pengisian form dengan mencoba ulang ketika ada error.
         while retries <= max_retries:
+            # BERHENTI JIKA SISA WAKTU EKSEKUSI HABIS
+            self.deadline.check()
+            self.attempts = retries + 1
+            self.timeouts.shortened = False
             try:
                 # OPEN WEB JURNAL HARIAN
-                self.get('https://simpeg.kemenkumham.go.id/devp/siap/skp_journal.php')
+                try:
+                    self.get(f'{self.portal_url}/skp_journal.php')
+                except TimeoutException as e:
+                    # BATAS PAGE LOAD CHROMEDRIVER: PORTAL LAMBAT, BUKAN TANDA BUKAN PEGAWAI WFH, DICOBA ULANG
+                    raise WebDriverException(f"Halaman jurnal tidak selesai dimuat: {e.msg}") from e
 
                 # CLICK BTN TAMBAH
                 self.wait_element_click(XPATH="/html/body/div[3]/div[2]/a[1]")
@@ -253,32 +498,47 @@ class BOT(Util):
                 # INPUT MENIT SELESAI
                 self.wait_element_select_value(value=menit_selesai, XPATH="/html/body/div[4]/div[2]/form/fieldset/div[1]/div/select[4]")
 
-                try:
-                    # INPUT SKP VALUE 
-                    self.wait_element_select_value(value=skp_value, XPATH="/html/body/div[4]/div[2]/form/fieldset/div[2]/div/select")
-                except NoSuchElementException:
-                    # INPUT SKP INDEX 
-                    self.wait_element_select_index(index=skp, XPATH="/html/body/div[4]/div[2]/form/fieldset/div[2]/div/select")
-            
+                # INPUT SKP VALUE (sudah di-resolve dari katalog SKP sebelum login)
+                self.wait_element_select_value(value=skp_value, XPATH="/html/body/div[4]/div[2]/form/fieldset/div[2]/div/select")
+
                 # INPUT KEGIATAN
                 self.wait_element_input(input=kegiatan, XPATH="/html/body/div[4]/div[2]/form/fieldset/div[3]/div/textarea")
                 # INPUT JUMLAH DISELESAIKAN
                 self.wait_element_clear(XPATH="/html/body/div[4]/div[2]/form/fieldset/div[4]/div/input")
                 self.wait_element_input(input=jumlah_diselesaikan, XPATH="/html/body/div[4]/div[2]/form/fieldset/div[4]/div/input")
                 # KLIK BTN SIMPAN
+                self.antre()
                 self.wait_element_click(XPATH="/html/body/div[4]/div[3]/button[2]")
-            
-                break
+
+                if self.governor is not None:
+                    self.governor.success()
+                self.timeouts.relaxed = False
+                return True
                 # BTN BATAL
                 # self.wait_element_click(XPATH="/html/body/div[4]/div[3]/button[1]")
             
-            except TimeoutException: # ERROR Anda tidak terdaftar sebagai pegawai WFH!
+            except (DeadlineExceeded, WatchdogTripped, DriverCrashed):
+                raise
+
+            except TimeoutException as e: # ERROR Anda tidak terdaftar sebagai pegawai WFH!
+                # WAKTU TUNGGU DIPOTONG OLEH DEADLINE, BUKAN KARENA SITUS TIDAK DAPAT DIAKSES
+                self.deadline.check()
+                self.diagnostik.capture(self.driver, e)
+                if self.timeouts.shortened and not self.timeouts.relaxed:
+                    # TIMEOUT HASIL BELAJAR BISA TERLALU KETAT PADA MALAM YANG LAMBAT: ULANGI SEKALI DENGAN TIMEOUT TETAP
+                    botlog.warning("Waktu tunggu habis sebelum batas tetap, kegiatan diulang dengan timeout tetap")
+                    self.timeouts.relaxed = True
+                    continue
                 botlog.critical("TimeoutException: Situs pengisian jurnal tidak dapat diakses (Anda tidak terdaftar sebagai pegawai WFH)" )
                 self.exception_occured = True
-                break
+                return False
             
             except Exception as e:
                 retries += 1
+                # HANYA GANGGUAN PORTAL YANG MEMBUKA CIRCUIT BREAKER, BUKAN BARIS JURNAL YANG DITOLAK
+                if self.governor is not None and self.portal_error(e):
+                    self.governor.failure()
+                self.diagnostik.capture(self.driver, e)
                 botlog.error(f"Terjadi kesalahan {repr(e)}. Percobaan ke-{retries} dari {max_retries}")
 
                 if retries == max_retries:
@@ -287,8 +547,28 @@ class BOT(Util):
                                     body=f"Salam. Semoga anda dalam keadaan baik, saya ingin memberitahu anda bahwa jurnal harian untuk tanggal {self.date} Gagal di isi.\
                                     \n\nTerima kasih atas perhatiannya,\
                                     \nSalam hormat.")
-                    break
-                
+                    return False
+        return False
+
+    def scrape_skp_catalog(self, catalog: SkpCatalog):
+        """Scrape the options of the SKP select into the catalog and cache it.
+
+        This method opens the journal form once and reads every option of the SKP dropdown
+        with a single script call. It is only needed when the cached catalog of the employee
+        for this year is missing or does not know a label used in the sheet.
+
+        Parameters:
+        - catalog (SkpCatalog): The catalog to update and save.
+        """
+        botlog.info("Mengambil daftar SKP dari SIMPEG ...")
+        self.get(f'{self.portal_url}/skp_journal.php')
+        # CLICK BTN TAMBAH
+        self.wait_element_click(XPATH="/html/body/div[3]/div[2]/a[1]")
+        select = self.wait_element_get(XPATH="/html/body/div[4]/div[2]/form/fieldset/div[2]/div/select")
+        catalog.update(self.driver.execute_script(SCRAPE_OPTIONS_JS, select))
+        catalog.save()
+        botlog.info(f"{len(catalog)} SKP disimpan ke {catalog.path}")
+
     def is_has_filled(self) -> bool:
         """Check if the journal table has been filled.
 
@@ -299,7 +579,9 @@ class BOT(Util):
         Returns:
         - bool: True if the journal table has been filled, False otherwise.
         """
-        self.get('https://simpeg.kemenkumham.go.id/devp/siap/skp_journal.php')
+        from selenium.webdriver.common.by import By
+
+        self.get(f'{self.portal_url}/skp_journal.php')
         # DAPATKAN ELEMENT TABEL
         try:
           table = self.wait_element_get(XPATH="/html/body/div[3]/div[1]/div/table[1]",
@@ -312,98 +594,376 @@ class BOT(Util):
           else: return False
         except:
             pass
-        
-    def start(self):
+
+    def baca_tabel_jurnal(self) -> list:
+        """Return the text of every row of today's journal table, read with a single script call.
+
+        Returns:
+        - list: The text of each row, empty if the table cannot be read.
+        """
+        self.get(f'{self.portal_url}/skp_journal.php')
+        try:
+            table = self.wait_element_get(XPATH="/html/body/div[3]/div[1]/div/table[1]", time=60)
+            return self.driver.execute_script(
+                "return Array.from(arguments[0].querySelectorAll('tbody tr'), tr => tr.innerText);", table) or []
+        except (DeadlineExceeded, WatchdogTripped, DriverCrashed):
+            raise
+        except Exception as e:
+            botlog.warning(f"Tabel jurnal tidak dapat dibaca {repr(e)}")
+            return []
+
+    def verifikasi(self, plan, indexes: list) -> list:
+        """Look up the given plan entries in the journal table and mark the ones found as verified.
+
+        Parameters:
+        - plan (DayPlan): Today's plan.
+        - indexes (list): Plan indexes to look up.
+
+        Returns:
+        - list: The indexes found in the journal table.
+        """
+        rows = self.baca_tabel_jurnal()
+        found = [i for i in indexes if find_entry(plan.entries[i], rows)]
+        for i in found:
+            self.run_state.mark(self.username, self.date, i, VERIFIED)
+        self.history.verify(self.username, self.date, found)
+        return found
+
+    def siapkan_rencana(self):
+        """Return today's plan, compiling and validating it if it is not cached yet.
+
+        The plan is read from the plan cache when a previous attempt already compiled it, so retries
+        submit exactly the same entries. Otherwise the sheet is read, today's entries are compiled with
+        the per-employee-per-date seed, their SKP is resolved from the cached SKP catalog and the whole
+        plan is validated. Only a valid plan whose SKP labels are all resolved is stored in the cache;
+        one with a label missing from the cached catalog is cached by `start()` once the catalog scraped
+        after login resolves it, so a corrected sheet is read again by the next run if it does not.
+
+        Returns:
+        - tuple: `(plan, catalog)`, or `(None, catalog)` if today is a holiday or the plan is invalid.
+        """
+        plan = self.plan_cache.load(self.username, self.date)
+        if plan is not None:
+            botlog.info(f"Memakai rencana jurnal tersimpan ({plan.hari}, {len(plan.entries)} kegiatan)")
+            return plan, SkpCatalog.load(self.username, self.date.year)
+
+        with self.report.phase("sheet"):
+            jurnal = self.get_jurnal()
+        self.memtrace.snapshot("sheet")
+        hari = self.jenis_hari()
+
+        # JIKA LIBUR TIDAK ADA YANG DIISI
+        if hari is None:
+            botlog.info("HARI INI LIBUR")
+            self.report.status = "libur"
+            return None, None
+
+        plan, catalog, issues = self.susun_rencana(jurnal, hari, self.username)
+        self.report.issues.extend(issues)
+        if has_errors(issues):
+            self.gagal_validasi(issues)
+            return None, catalog
+
+        if plan.resolved:
+            self.plan_cache.save(plan)
+        return plan, catalog
+
+    def susun_rencana(self, jurnal: dict, hari: str, nip: str):
+        """Compile and validate the plan of `nip` for today from already parsed sheet data.
+
+        Parameters:
+        - jurnal (dict): The parsed sheet, as returned by `get_jurnal`.
+        - hari (str): Today's day type.
+        - nip (str): The employee, part of the plan seed and of the SKP catalog.
+
+        Returns:
+        - tuple: `(plan, catalog, issues)`.
+        """
+        catalog = SkpCatalog.load(nip, self.date.year)
+        with self.report.phase("plan"):
+            plan = compile_plan(jurnal, LAYOUT, hari, nip, self.date)
+            catalog.resolve_entries(plan.entries)
+
+        # VALIDASI SELURUH RENCANA SEBELUM BROWSER DIPAKAI
+        with self.report.phase("validasi"):
+            issues = validate_plan(plan.entries, catalog)
+        return plan, catalog, issues
+
+    @profiled
+    def start(self, deadline: Deadline = None, plan=None):
         """Starts the process of filling out the daily journal on the SIMPEG website.
 
         This method performs the following steps:
-        1. Retrieves the journal data.
-        2. Checks if it is a holiday. If not, proceeds with the journal filling process.
-        3. Logs in to the SIMPEG website.
-        4. Checks the day of the week and fills out the journal accordingly.
-        - If it is Monday to Thursday, fills out the journal for that day.
-        - If it is Friday or Saturday, fills out the journal for that day.
-        5. Sends an email notification with the details of the filled journal.
-        6. Closes the driver.
+        1. Gets today's plan with `siapkan_rencana`: from the plan cache, or compiled from the sheet
+           and validated. If today is a holiday or the plan is invalid, Chrome is never launched.
+        2. Registers the plan in the run-state store and skips the entries already submitted or
+           verified. If every entry is done, stops.
+        3. Launches the driver and logs in to the SIMPEG website. The SKP catalog is scraped again only
+           if a label of the plan is not in the cached one, and the run stops if it is still unknown
+           after that. Entries left in 'submitting' by a crashed run are looked
+           up in the journal table first, so an entry the portal already saved is not submitted twice.
+        4. Replays the remaining entries of the plan, recording every state transition. Before an
+           entry is started the remaining budget must fit the slowest entry so far, otherwise the run
+           stops with status 'timeout' and a follow-up run resumes from the run state. When the
+           watchdog tears down a hung driver or the browser crashes, a new one is launched and logged
+           in (from the cached session cookies when possible); the interrupted entry is looked up in
+           the journal table and, if the portal did not save it, retried once: right away after a
+           crash, after the remaining entries after a watchdog intervention.
+           When the browser's RSS went over `chrome_rss_limit`, it is restarted before the next entry.
+        5. Verifies the submitted entries against the journal table and sends an email notification
+           with the details of the filled journal.
+        6. Closes the driver, unless `keep_browser` is set, and saves the run report.
+
+        With the `profile` environment variable set, the whole run is profiled (see `app/profiling.py`),
+        with `memtrace` set, Python allocations are snapshotted after each phase and entry (see `app/memtrace.py`),
+        with `record=1` the WebDriver session is recorded for replay (see `app/recorder.py`).
+
+        Parameters:
+        - deadline (Deadline): Time budget of the run, e.g. `Deadline.from_context(context)` on Lambda.
+          Defaults to the `run_budget` environment variable, unlimited if it is not set.
+        - plan (DayPlan): A plan compiled beforehand, e.g. by the planner stage of `app/pipeline.py`.
+          Step 1 is skipped and the plan's date is used instead of today.
 
         Returns:
-        - None
+        - RunReport: The report of the run.
         """
         botlog.info("================= TASK START =================")
+        # BOT DAPAT DIPAKAI ULANG OLEH CONTAINER LAMBDA YANG MASIH HANGAT
+        self.date = date.fromisoformat(plan.tanggal) if plan is not None else datetime.now(self.tz).date()
+        self.is_complete_fill = False
+        self.exception_occured = False
+        self.deadline = deadline or Deadline.from_context()
+        self.report = RunReport(nip=self.username)
+        bind_run(run_id=self.report.run_id, nip=self.username)
+        self.restarts = 0
+        self.memory.take_peaks()
+        self.perintah.reset()
+        self.perekam.reset()
 
-        jurnal = self.get_jurnal()
-
-        while not self.is_complete_fill:
-            if self.is_complete_fill: break
-            if self.exception_occured: break
-            # JIKA TIDAK LIBUR LANJUT TASKS
-            if not self.is_holiday():
-
-                if self.login(): # JIKA LOGIN BERHASIL
-                    # JIKA HARI INI BELUM TERISI?
-                    botlog.info("MENGISI JURNAL HARIAN ...")
-                    # APAKAH HARI INI SENIN - KAMIS?
-                    if self.is_senin_kamis():
-                        for item in jurnal.get("senin-kamis"):
+        try:
+            if plan is None:
+                plan, catalog = self.siapkan_rencana()
+            else:
+                catalog = SkpCatalog.load(self.username, self.date.year)
+            if plan is None:
+                return self.report
+
+            if self.run_state is None:
+                self.run_state = RunStateStore()
+            if self.history is None:
+                self.history = History()
+            # TIMEOUT SETIAP LANGKAH DARI LATENSI RUN SEBELUMNYA
+            self.timeouts.load(self.history)
+            self.run_state.plan(self.username, self.date, plan.entries)
+            states = self.run_state.states(self.username, self.date)
+            pending = [i for i in range(len(plan.entries)) if states.get(i) not in DONE_STATES]
+            if not pending:
+                botlog.info("JURNAL HARI INI SUDAH TERISI")
+                self.is_complete_fill = True
+                self.report.status = "sudah_terisi"
+                return self.report
+            if len(pending) < len(plan.entries):
+                botlog.info(f"Melanjutkan proses sebelumnya, {len(plan.entries) - len(pending)} kegiatan sudah terisi")
+
+            # TUNGGU SLOT SESI PORTAL AGAR LOGIN BERSAMAAN TIDAK MELEBIHI BATAS
+            if self.governor is None:
+                self.governor = Governor()
+            # SLOT DARI LOGIN HANGAT MODE DAEMON DIPAKAI ULANG
+            if self.session_id is None:
+                self.session_id = f"{self.username}-{self.report.run_id}"
+                self.report.add_wait("sesi", self.governor.acquire_session(self.session_id, timeout=self.deadline.remaining()))
+
+            # SESI HANGAT DARI MODE DAEMON SUDAH LOGIN
+            if not self.buka_sesi():
+                botlog.critical("Tidak dapat melanjutkan proses karena login gagal.")
+                self.report.status = "login_gagal"
+                return self.report
+
+            # ADA SKP YANG BELUM DIKENAL (KATALOG KOSONG ATAU USANG): SCRAPE ULANG SEKALI LALU PERIKSA LAGI
+            if not plan.resolved:
+                self.scrape_skp_catalog(catalog)
+                catalog.resolve_entries(plan.entries)
+                issues = check_skp(plan.entries, catalog, final=True)
+                self.report.issues.extend(issues)
+                if has_errors(issues):
+                    self.gagal_validasi(issues)
+                    return self.report
+                self.plan_cache.save(plan)
+
+            # KEGIATAN YANG TERPUTUS SAAT DIKIRIM: CEK DULU DI TABEL JURNAL SEBELUM DIKIRIM ULANG
+            unsure = [i for i in pending if states.get(i) == SUBMITTING]
+            if unsure:
+                found = self.verifikasi(plan, unsure)
+                botlog.info(f"{len(found)} dari {len(unsure)} kegiatan yang terputus sudah tersimpan di SIMPEG")
+                pending = [i for i in pending if i not in found]
+                self.report.count("verified", len(found))
+
+            botlog.info(f"MENGISI JURNAL {plan.hari.upper()} ...")
+            slowest = ENTRY_BUDGET
+            antrean, diulang = deque(pending), set()
+            with self.report.phase("isi_jurnal"):
+                while antrean:
+                    i = antrean.popleft()
+                    # JANGAN MULAI KEGIATAN BARU JIKA SISA WAKTU TIDAK CUKUP
+                    if not self.deadline.allows(slowest):
+                        raise DeadlineExceeded(f"Sisa waktu {self.deadline.remaining():.0f} detik tidak cukup untuk kegiatan berikutnya")
+
+                    # MEMORI BROWSER MENDEKATI BATAS: BUAT ULANG SEBELUM DIMATIKAN KERNEL
+                    if self.memory.over_limit:
+                        botlog.warning("Memori browser melebihi batas, browser dibuat ulang sebelum kegiatan berikutnya")
+                        self.report.count("memory_restart")
+                        self.close()
+                        if not self.buka_sesi():
+                            botlog.critical("Tidak dapat melanjutkan proses karena login ulang gagal.")
+                            self.report.status = "login_gagal"
+                            return self.report
+
+                    item = plan.entries[i]
+                    self.governor.heartbeat(self.session_id)
+                    self.run_state.mark(self.username, self.date, i, SUBMITTING)
+                    self.report.count("started")
+                    started_at, started = time(), perf_counter()
+                    try:
+                        with self.watchdog.entry(i):
                             # OPEN WEB JURNAL HARIAN
-                            self.fill_jurnal(
-                                                jam_mulai=item.get("jam_mulai"),
-                                                menit_mulai=self.random_time(time=item.get("menit_mulai")),
-                                                jam_selesai=item.get("jam_selesai"),
-                                                menit_selesai=self.random_time(time=item.get("menit_selesai")),
-                                                skp=item.get("skp"),
-                                                skp_value=item.get("skp_value"),
-                                                kegiatan=item.get("kegiatan"),
-                                                jumlah_diselesaikan=item.get("jumlah_diselesaikan")
+                            is_saved = self.fill_jurnal(
+                                                jam_mulai=item.jam_mulai,
+                                                menit_mulai=item.menit_mulai,
+                                                jam_selesai=item.jam_selesai,
+                                                menit_selesai=item.menit_selesai,
+                                                skp=item.skp,
+                                                skp_value=item.skp_value,
+                                                kegiatan=item.kegiatan,
+                                                jumlah_diselesaikan=item.jumlah_diselesaikan
                                             )
-                            if self.exception_occured == True:
-                                self.send_email(subject=f"Pengisian Jurnal SIMPEG KEMENKUMHAM Tanggal {self.date} Gagal",
-                                    body=f"Salam. Semoga anda dalam keadaan baik, saya ingin memberitahu anda bahwa jurnal harian untuk tanggal {self.date} gagal di isi. Situs pengisian jurnal tidak dapat diakses karena 'Anda tidak terdaftar sebagai pegawai WFH'.\n\nTerima kasih atas perhatiannya,\nSalam hormat.")
-                                break
-                            
-                        if self.exception_occured == False:
-                            self.is_complete_fill = True
-                            self.send_email(subject=f"Pengisian Jurnal SIMPEG KEMENKUMHAM Tanggal {self.date}",
-                                        body=f"Salam. Semoga anda dalam keadaan baik, saya ingin memberitahu anda bahwa jurnal harian untuk tanggal {self.date} telah berhasil di isi. Berikut adalah rincian kegiatan hari ini:\
-                                        \n\n{self.parse_data_to_pretty_output(jurnal, 'senin-kamis')} \
-                                        \n\nTerima kasih atas perhatiannya,\
-                                        \nSalam hormat.")
-                            botlog.info("FILL JURNAL SENIN KAMIS DONE")
-        
-                    # APAKAH HARI INI JUMAT - SABTU?
-                    elif self.is_jumat_sabtu():
-                        for item in jurnal.get("jumat-sabtu"):
-                            # OPEN WEB JURNAL HARIAN
-                            self.fill_jurnal(
-                                            jam_mulai=item.get("jam_mulai"),
-                                            menit_mulai=self.random_time(time=item.get("menit_mulai")),
-                                            jam_selesai=item.get("jam_selesai"),
-                                            menit_selesai=self.random_time(time=item.get("menit_selesai")),
-                                            skp=item.get("skp"),
-                                            skp_value=item.get("skp_value"),
-                                            kegiatan=item.get("kegiatan"),
-                                            jumlah_diselesaikan=item.get("jumlah_diselesaikan")
-                                        )
-                            if self.exception_occured == True:
-                                self.send_email(subject=f"Pengisian Jurnal SIMPEG KEMENKUMHAM Tanggal {self.date} Gagal",
-                                    body=f"Salam. Semoga anda dalam keadaan baik, saya ingin memberitahu anda bahwa jurnal harian untuk tanggal {self.date} gagal di isi. Situs pengisian jurnal tidak dapat diakses karena 'Anda tidak terdaftar sebagai pegawai WFH'.\n\nTerima kasih atas perhatiannya,\nSalam hormat.")
-                                break
-
-                        if self.exception_occured == False: 
-                            self.is_complete_fill = True
-                            self.send_email(subject=f"Pengisian Jurnal SIMPEG KEMENKUMHAM Tanggal {self.date}",
-                                            body=f"Salam. Semoga anda dalam keadaan baik, saya ingin memberitahu anda bahwa jurnal harian untuk tanggal {self.date} telah berhasil di isi. Berikut adalah rincian kegiatan hari ini:\
-                                        \n\n{self.parse_data_to_pretty_output(jurnal, 'jumat-sabtu')} \
-                                        \n\nTerima kasih atas perhatiannya,\
-                                        \nSalam hormat.")
-                            botlog.info("FILL JURNAL JUMAT SABTU DONE")
-
-                else: 
-                    botlog.critical("Tidak dapat melanjutkan proses karena login gagal.")
-                    break
+                    except (WatchdogTripped, DriverCrashed) as e:
+                        # DRIVER MACET (SUDAH DIHENTIKAN) ATAU BROWSER CRASH: BUAT ULANG BROWSER
+                        crash = isinstance(e, DriverCrashed)
+                        # BROWSER SUDAH MATI: TIDAK ADA HALAMAN UNTUK DIRINGKAS
+                        self.diagnostik.capture(None, e)
+                        if crash:
+                            self.report.count("crash")
+                        self.history.record(self.username, self.date, i, item, self.attempts, started_at,
+                                            perf_counter() - started, "crash" if crash else "watchdog", self.report.run_id)
+                        botlog.error(f"{e}. Kegiatan ke-{i} terputus")
+                        if not self.mulai_ulang_browser():
+                            botlog.critical("Tidak dapat melanjutkan proses karena login ulang gagal.")
+                            self.report.status = "login_gagal"
+                            return self.report
+                        # STATUS TETAP 'submitting' SAMPAI DIPASTIKAN DI TABEL JURNAL
+                        if self.verifikasi(plan, [i]):
+                            self.report.count("verified")
+                        elif i not in diulang:
+                            # CRASH: ULANGI KEGIATAN INI SEKARANG, MACET: SETELAH KEGIATAN LAINNYA
+                            diulang.add(i)
+                            if crash:
+                                antrean.appendleft(i)
+                            else:
+                                antrean.append(i)
+                        else:
+                            self.run_state.mark(self.username, self.date, i, FAILED, error="watchdog")
+                            self.simpan_diagnostik(i, item, "watchdog")
+                            self.report.count("failed")
+                        continue
+                    finally:
+                        self.memtrace.snapshot(f"kegiatan_{i}")
+                    duration = perf_counter() - started
+                    self.history.record(self.username, self.date, i, item, self.attempts, started_at, duration,
+                                        "submitted" if is_saved else "failed", self.report.run_id)
+                    if self.exception_occured == True:
+                        self.run_state.mark(self.username, self.date, i, FAILED, error="tidak terdaftar sebagai pegawai WFH")
+                        self.simpan_diagnostik(i, item, "tidak terdaftar sebagai pegawai WFH")
+                        self.send_email(subject=f"Pengisian Jurnal SIMPEG KEMENKUMHAM Tanggal {self.date} Gagal",
+                            body=f"Salam. Semoga anda dalam keadaan baik, saya ingin memberitahu anda bahwa jurnal harian untuk tanggal {self.date} gagal di isi. Situs pengisian jurnal tidak dapat diakses karena 'Anda tidak terdaftar sebagai pegawai WFH'.\n\nTerima kasih atas perhatiannya,\nSalam hormat.")
+                        break
+                    slowest = max(slowest, duration)
+                    if not is_saved:
+                        self.run_state.mark(self.username, self.date, i, FAILED, error="percobaan maksimum tercapai")
+                        self.simpan_diagnostik(i, item, "percobaan maksimum tercapai")
+                        self.report.count("failed")
+                        continue
+                    self.run_state.mark(self.username, self.date, i, SUBMITTED)
+                    self.report.count("submitted")
+
+            # KONFIRMASI KEGIATAN YANG TERKIRIM DI TABEL JURNAL
+            states = self.run_state.states(self.username, self.date)
+            submitted = [i for i in pending if states.get(i) == SUBMITTED]
+            if submitted and self.deadline.allows(slowest):
+                with self.report.phase("verifikasi"):
+                    self.report.count("verified", len(self.verifikasi(plan, submitted)))
+
+            if self.exception_occured == False and "failed" not in self.report.counters:
+                self.is_complete_fill = True
+                self.report.status = "selesai"
+                self.send_email(subject=f"Pengisian Jurnal SIMPEG KEMENKUMHAM Tanggal {self.date}",
+                            body=f"Salam. Semoga anda dalam keadaan baik, saya ingin memberitahu anda bahwa jurnal harian untuk tanggal {self.date} telah berhasil di isi. Berikut adalah rincian kegiatan hari ini:\
+                            \n\n{self.parse_data_to_pretty_output(plan.entries)} \
+                            \n\nTerima kasih atas perhatiannya,\
+                            \nSalam hormat.")
+                botlog.info(f"FILL JURNAL {plan.hari.upper()} DONE")
             else:
-                botlog.info("HARI INI LIBUR")
-                break
-            
-        self.driver.close()
-        botlog.info("================= TASK DONE =================")
+                self.report.status = "gagal"
+
+        except DeadlineExceeded as e:
+            # STATUS SETIAP KEGIATAN TERSIMPAN DI RUN STATE, PROSES BERIKUTNYA MELANJUTKAN
+            botlog.warning(f"{e}. Proses dihentikan dan akan dilanjutkan pada proses berikutnya.")
+            self.report.status = "timeout"
+
+        except (WatchdogTripped, DriverCrashed) as e:
+            # BROWSER TETAP MACET / CRASH SETELAH DIBUAT ULANG, PROSES BERIKUTNYA MELANJUTKAN DARI RUN STATE
+            botlog.error(f"{e}. Proses dihentikan dan akan dilanjutkan pada proses berikutnya.")
+            self.report.status = "crash" if isinstance(e, DriverCrashed) else "watchdog"
+
+        finally:
+            if not self.keep_browser:
+                self.close()
+            self.memtrace.snapshot("teardown")
+            self.report.allocations = self.memtrace.take_records()
+            if self.session_id is not None:
+                self.governor.release_session(self.session_id)
+                self.session_id = None
+            self.report.memory = self.memory.take_peaks()
+            self.report.commands = self.perintah.summary()
+            self.report.recording = self.perekam.save(f"{self.report.started[:10]}-{self.report.run_id}",
+                                                      portal_url=self.portal_url)
+            if self.history is not None and self.report.navigations:
+                self.history.record_navigations(self.username, self.date, self.report.run_id, self.report.navigations)
+            if self.history is not None:
+                self.history.record_steps(self.username, self.date, self.report.run_id, self.timeouts.take_samples())
+            self.report.timeouts = self.timeouts.summary()
+            botlog.info(self.report.summary())
+            self.report.save()
+            botlog.info("================= TASK DONE =================")
+
+        return self.report
+
+    def simpan_diagnostik(self, i: int, item, error: str):
+        """Save the diagnostics of the failed entry `i` and add their path to the run report.
+
+        Parameters:
+        - i (int): Index of the entry in the plan.
+        - item (Entry): The entry.
+        - error (str): Why the entry failed.
+        """
+        try:
+            path = self.diagnostik.dump(f"{self.date}-{self.report.run_id}-{i}", run_id=self.report.run_id,
+                                        nip=self.username, tanggal=str(self.date), kegiatan=i,
+                                        isi=item.to_dict(), percobaan=self.attempts, error=error)
+        except OSError as e:
+            botlog.warning(f"Diagnostik kegiatan ke-{i} tidak dapat disimpan {repr(e)}")
+            return
+        if path is not None:
+            self.report.diagnostics.append(path)
+
+    def gagal_validasi(self, issues: list):
+        """Abort the run because the plan is invalid and notify the user by email.
+
+        Parameters:
+        - issues (list): The validation issues, only those with level 'error' are listed in the email.
+        """
+        errors = "\n".join(f"- {issue}" for issue in issues if issue.level == "error")
+        botlog.critical(f"Jurnal tidak valid, pengisian dibatalkan:\n{errors}")
+        self.exception_occured = True
+        self.report.status = "tidak_valid"
+        self.send_email(subject=f"Pengisian Jurnal SIMPEG KEMENKUMHAM Tanggal {self.date} Gagal",
+            body=f"Salam. Semoga anda dalam keadaan baik, saya ingin memberitahu anda bahwa jurnal harian untuk tanggal {self.date} tidak di isi karena data pada spreadsheet tidak valid:\n\n{errors}\n\nTerima kasih atas perhatiannya,\nSalam hormat.")
@@ -0,0 +1,199 @@
+"""Long running scheduler for local runs, started with `python local.py --daemon`.
+
+Instead of an external cron starting `local.py` (and a new Remote Selenium session) for every
+run, the daemon computes the next run from the variant's calendar (`Util.jenis_hari`), keeps one
+browser session warm and health-checked between runs and logs in shortly before the scheduled
+time, so the run starts submitting right after it is triggered. The warm login takes its portal
+session slot from the governor like any run (see `app/governor.py`) and hands it to the run, which
+releases it. A small JSON status endpoint is served on localhost.
+"""
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import logging
+import signal
+import threading
+
+from .governor import Governor
+
+daemonlog = logging.getLogger(__name__)
+
+# Detik sebelum jadwal untuk memeriksa browser dan login
+WARMUP = 120
+# Selenium Grid menutup sesi yang menganggur setelah 300 detik (SE_NODE_SESSION_TIMEOUT)
+HEALTH_INTERVAL = 120
+# Batas pencarian hari kerja berikutnya
+MAX_LOOKAHEAD = 400
+
+
+class StatusHandler(BaseHTTPRequestHandler):
+    """Serves `GET /status` with the daemon's status as JSON."""
+
+    def do_GET(self):
+        if self.path not in ("/", "/status"):
+            self.send_error(404)
+            return
+        body = json.dumps(self.server.scheduler.status(), indent=1).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        daemonlog.debug(format % args)
+
+
+class Daemon:
+    """
+    In-process scheduler around one `BOT`.
+
+    Parameters:
+        bot (BOT): The bot to run, its browser is kept open between runs.
+        at (str): Time of the run in Asia/Jakarta as 'HH:MM'. Default is '00:05'.
+        port (int): Port of the status endpoint on 127.0.0.1, 0 disables it. Default is 8765.
+        warmup (int): Seconds before the run to check the browser and log in. Default is `WARMUP`.
+        health_interval (int): Seconds between browser health checks while idle. Default is `HEALTH_INTERVAL`.
+    """
+
+    def __init__(self, bot, at: str = "00:05", port: int = 8765, warmup: int = WARMUP,
+                 health_interval: int = HEALTH_INTERVAL):
+        self.bot = bot
+        self.at = datetime.strptime(at, "%H:%M").time()
+        self.port = port
+        self.warmup = warmup
+        self.health_interval = health_interval
+        self.state = "idle"
+        self.next_run = None
+        self.last_health = None
+        self.last_report = None
+        self.started = datetime.now(bot.tz)
+        self.stopped = threading.Event()
+        self.server = None
+
+    def next_run_after(self, after: datetime):
+        """Return the first scheduled run after `after` on a day that has a journal, or None."""
+        day = after.date()
+        for _ in range(MAX_LOOKAHEAD):
+            run = self.bot.tz.localize(datetime.combine(day, self.at))
+            if run > after and self.bot.jenis_hari(day) is not None:
+                return run
+            day += timedelta(days=1)
+        return None
+
+    def health_check(self) -> bool:
+        """Return True if the browser session answers, closing it when it does not."""
+        self.last_health = datetime.now(self.bot.tz)
+        if self.bot.driver is None:
+            return False
+        try:
+            self.bot.driver.execute_script("return 1")
+            return True
+        except Exception as e:
+            daemonlog.warning(f"Sesi browser tidak merespon {repr(e)}, browser dibuka ulang")
+            self.bot.close()
+            return False
+
+    def acquire_session(self):
+        """Take a portal session slot for the warm login, kept by the run that follows."""
+        if self.bot.governor is None:
+            self.bot.governor = Governor()
+        if self.bot.session_id is None:
+            session_id = f"{self.bot.username}-daemon"
+            self.bot.governor.acquire_session(session_id, timeout=self.warmup)
+            self.bot.session_id = session_id
+
+    def release_session(self):
+        if self.bot.session_id is not None:
+            self.bot.governor.release_session(self.bot.session_id)
+            self.bot.session_id = None
+
+    def warm(self):
+        """Make sure a healthy browser is open and logged in before the run."""
+        self.state = "warming"
+        try:
+            if not self.health_check():
+                self.bot.launch()
+            # LOGIN ULANG, SESI SIMPEG DARI RUN SEBELUMNYA SUDAH KEDALUWARSA
+            self.acquire_session()
+            self.bot.driver.delete_all_cookies()
+            self.bot.is_login = self.bot.login()
+        except Exception as e:
+            # start() AKAN MENCOBA MEMBUKA BROWSER DAN LOGIN SENDIRI
+            daemonlog.error(f"Gagal menyiapkan browser {repr(e)}")
+            self.release_session()
+            self.bot.close()
+        finally:
+            self.state = "idle"
+
+    def wait_until(self, moment: datetime, health: bool = True) -> bool:
+        """Sleep until `moment`, health checking the idle browser. Returns False when stopped."""
+        while not self.stopped.is_set():
+            remaining = (moment - datetime.now(self.bot.tz)).total_seconds()
+            if remaining <= 0:
+                return True
+            self.stopped.wait(min(remaining, self.health_interval))
+            if health and self.bot.driver is not None and not self.stopped.is_set():
+                self.health_check()
+        return False
+
+    def run_once(self):
+        self.state = "running"
+        try:
+            self.last_report = self.bot.start().to_dict()
+        finally:
+            self.state = "idle"
+
+    def status(self) -> dict:
+        """Return the current state of the daemon as a JSON serializable dict."""
+        return {
+            "state": self.state,
+            "started": self.started.isoformat(timespec="seconds"),
+            "next_run": self.next_run.isoformat(timespec="seconds") if self.next_run else None,
+            "browser": self.bot.driver is not None,
+            "is_login": self.bot.is_login,
+            "last_health": self.last_health.isoformat(timespec="seconds") if self.last_health else None,
+            "last_report": self.last_report,
+        }
+
+    def serve_status(self):
+        """Start the status endpoint in a background thread."""
+        self.server = ThreadingHTTPServer(("127.0.0.1", self.port), StatusHandler)
+        self.server.daemon_threads = True
+        self.server.scheduler = self
+        threading.Thread(target=self.server.serve_forever, name="status", daemon=True).start()
+        daemonlog.info(f"Status tersedia di http://127.0.0.1:{self.server.server_port}/status")
+
+    def stop(self, *args):
+        self.stopped.set()
+
+    def run_forever(self):
+        """Run the bot on every scheduled day until stopped with Ctrl+C or SIGTERM."""
+        self.bot.keep_browser = True
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, self.stop)
+        if self.port:
+            self.serve_status()
+        try:
+            while not self.stopped.is_set():
+                self.next_run = self.next_run_after(datetime.now(self.bot.tz))
+                if self.next_run is None:
+                    daemonlog.warning("Tidak ada hari kerja dalam kalender, diperiksa lagi besok")
+                    self.wait_until(datetime.now(self.bot.tz) + timedelta(days=1), health=False)
+                    continue
+                daemonlog.info(f"Pengisian berikutnya {self.next_run.isoformat(timespec='minutes')}")
+                if not self.wait_until(self.next_run - timedelta(seconds=self.warmup)):
+                    break
+                self.warm()
+                if not self.wait_until(self.next_run):
+                    break
+                self.run_once()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            daemonlog.info("Daemon berhenti")
+            self.bot.keep_browser = False
+            self.release_session()
+            self.bot.close()
+            if self.server is not None:
+                self.server.shutdown()
@@ -0,0 +1,130 @@
+"""Diagnostics of failed journal entries, written to disk only when an entry ultimately fails.
+
+While an entry is filled the bot keeps a small ring buffer in memory: the pages navigated to and
+the elements waited for, which cost no WebDriver command, and after every failed attempt a
+summary of the page read with one script (URL, title, readyState, open modal and alert text,
+number of forms and fields). The screenshot and the page source of the last failed attempt are
+only kept as handles on the driver.
+
+Nothing is written while the entry is retried or succeeds. When it is marked failed, `dump` takes
+the screenshot and the source from the browser, still showing the failed state, and writes them
+with the buffer to `diagnostics/` in the state directory; the paths are added to the run report.
+
+Configured with environment variables:
+
+- `diagnostics`: 0 disables the buffer and the artifacts, default 1,
+- `diagnostics_size`: number of events kept, default 30.
+"""
+from collections import deque
+from datetime import datetime
+import json
+import logging
+import os
+
+from .state import state_path
+
+diagnosticslog = logging.getLogger(__name__)
+
+SIZE = 30
+# Sumber halaman yang disimpan dibatasi agar artefak tetap kecil
+SOURCE_LIMIT = 512 * 1024
+
+# Ringkasan halaman dengan satu perintah WebDriver
+SUMMARY_JS = """
+const visible = el => el && el.offsetParent !== null;
+const texts = sel => Array.from(document.querySelectorAll(sel)).filter(visible)
+    .map(el => el.innerText.trim().slice(0, 300)).filter(Boolean).slice(0, 5);
+return {
+    url: location.href,
+    title: document.title,
+    ready: document.readyState,
+    modal: texts('.modal, .ui-dialog, [role=dialog]'),
+    alert: texts('.alert, .error, .ui-state-error, .notification'),
+    forms: document.forms.length,
+    fields: document.querySelectorAll('input, select, textarea').length,
+    text: document.body ? document.body.innerText.length : 0,
+};
+"""
+
+
+class Diagnostics:
+    """
+    Ring buffer of the recent navigation and failures of one journal entry.
+
+    Parameters:
+        size (int): Number of events kept. Defaults to `diagnostics_size`.
+        enabled (bool): Defaults to the `diagnostics` environment variable.
+    """
+
+    def __init__(self, size: int = None, enabled: bool = None):
+        self.enabled = enabled if enabled is not None else os.getenv("diagnostics", "1") != "0"
+        self.events = deque(maxlen=size or int(os.getenv("diagnostics_size", SIZE)))
+        self.screenshot = None
+        self.source = None
+
+    def clear(self):
+        """Forget the events and handles of the previous entry."""
+        self.events.clear()
+        self.screenshot = self.source = None
+
+    def note(self, kind: str, value):
+        """Record a navigation (`url`) or an element waited for (`xpath`); no WebDriver command is sent."""
+        if self.enabled:
+            self.events.append((datetime.now().isoformat(timespec="milliseconds"), kind, value))
+
+    def capture(self, driver, error: Exception):
+        """
+        Record a failed attempt with a summary of the page and keep handles on its screenshot and source.
+
+        Parameters:
+            driver (WebDriver): The driver showing the failed page, None when it is gone.
+            error (Exception): The error of the attempt.
+        """
+        if not self.enabled:
+            return
+        summary = None
+        self.screenshot = self.source = None
+        if driver is not None:
+            try:
+                summary = driver.execute_script(SUMMARY_JS)
+            except Exception as e:
+                summary = {"error": repr(e)}
+            # BARU DIAMBIL SAAT KEGIATAN BENAR-BENAR GAGAL
+            self.screenshot = driver.get_screenshot_as_png
+            self.source = lambda: driver.page_source
+        self.note("gagal", {"error": repr(error)[:500], "halaman": summary})
+
+    def dump(self, name: str, **fields) -> str:
+        """
+        Write the buffer, the screenshot and the page source as `diagnostics/<name>.*` and return the JSON path.
+
+        Parameters:
+            name (str): Base name of the artifacts.
+            **fields: Written in the JSON, e.g. the entry and the reason it failed.
+
+        Returns:
+            str: Path of the JSON file, None when disabled or nothing was recorded.
+        """
+        if not self.enabled or not self.events:
+            return None
+        path = state_path("diagnostics", f"{name}.json")
+        data = dict(fields)
+        data["events"] = [{"waktu": at, "jenis": kind, "nilai": value} for at, kind, value in self.events]
+        base = path[:-len(".json")]
+        for key, handle, suffix in (("screenshot", self.screenshot, ".png"), ("source", self.source, ".html")):
+            if handle is None:
+                continue
+            try:
+                content = handle()
+                if isinstance(content, str):
+                    content = content[:SOURCE_LIMIT].encode("utf-8")
+                with open(base + suffix, "wb") as f:
+                    f.write(content)
+                data[key] = base + suffix
+            except Exception as e:
+                data[key] = repr(e)
+        with open(path, "w") as f:
+            json.dump(data, f, indent=1, ensure_ascii=False, default=str)
+        diagnosticslog.info(f"Diagnostik disimpan ke {path}")
+        self.clear()
+        return path
@@ -0,0 +1,236 @@
+"""Table-driven parser for the journal spreadsheet.
+
+The sheet layout of every variant is described declaratively with a
+``SheetLayout`` (see ``app/layout.py``) and parsed by the single
+``parse_jurnal`` function below, instead of indexing ``value[1]``..``value[n]``
+by hand.
+"""
+
+# Kolom default pada sheet (index 0-based dari get_all_values)
+COLUMNS = {
+    "kegiatan": 1,
+    "jam_mulai": 2,
+    "menit_mulai": 3,
+    "jam_selesai": 4,
+    "menit_selesai": 5,
+    "skp": 6,
+    "jumlah_diselesaikan": 7,
+}
+
+
+def to_number(value):
+    """Convert a cell to int, returning None when it is not an integer."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def to_minutes(jam, menit):
+    """Convert an hour and minute cell pair into minutes since midnight.
+
+    Returns None when the hour is not within 0-23 or the minute not within 0-59,
+    so invalid cells are reported by the validation instead of raising while parsing.
+
+    Example:
+        >>> to_minutes("07", "30")
+        450
+        >>> to_minutes("07", "75") is None
+        True
+    """
+    jam, menit = to_number(jam), to_number(menit)
+    if jam is None or menit is None or not (0 <= jam <= 23 and 0 <= menit <= 59):
+        return None
+    return jam * 60 + menit
+
+
+def format_minutes(minutes: int) -> tuple:
+    """Split minutes since midnight into zero padded ('HH', 'MM') strings.
+
+    Example:
+        >>> format_minutes(450)
+        ('07', '30')
+    """
+    jam, menit = divmod(minutes, 60)
+    return f"{jam:02d}", f"{menit:02d}"
+
+
+class Entry:
+    """A single journal activity parsed from one sheet row.
+
+    Attributes:
+        kegiatan (str): The description of the activity.
+        mulai (int): Start time in minutes since midnight, None if the cells are invalid.
+        selesai (int): End time in minutes since midnight, None if the cells are invalid.
+        skp_label (str): The SKP label exactly as written in the sheet.
+        skp (int): The SKP option index, resolved once while parsing.
+        skp_value (str): The SKP option value, resolved once while parsing.
+        jumlah_diselesaikan (int): The number of tasks completed, None if the cell is not a number.
+        row (int): The 0-based sheet row the entry was read from.
+    """
+    __slots__ = ("kegiatan", "mulai", "selesai", "skp_label", "skp", "skp_value",
+                 "jumlah_diselesaikan", "row")
+
+    def __init__(self, kegiatan, mulai, selesai, skp_label, skp, skp_value, jumlah_diselesaikan, row=None):
+        self.kegiatan = kegiatan
+        self.mulai = mulai
+        self.selesai = selesai
+        self.skp_label = skp_label
+        self.skp = skp
+        self.skp_value = skp_value
+        self.jumlah_diselesaikan = jumlah_diselesaikan
+        self.row = row
+
+    @property
+    def jam_mulai(self) -> str:
+        return format_minutes(self.mulai)[0]
+
+    @property
+    def menit_mulai(self) -> str:
+        return format_minutes(self.mulai)[1]
+
+    @property
+    def jam_selesai(self) -> str:
+        return format_minutes(self.selesai)[0]
+
+    @property
+    def menit_selesai(self) -> str:
+        return format_minutes(self.selesai)[1]
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, values: dict):
+        return cls(**{name: values.get(name) for name in cls.__slots__})
+
+    def replace(self, **fields):
+        """Return a copy of the entry with the given fields replaced."""
+        values = {name: getattr(self, name) for name in self.__slots__}
+        values.update(fields)
+        return Entry(**values)
+
+    def __repr__(self):
+        if self.mulai is None or self.selesai is None:
+            waktu = f"{self.mulai}-{self.selesai}"
+        else:
+            waktu = f"{self.jam_mulai}:{self.menit_mulai}-{self.jam_selesai}:{self.menit_selesai}"
+        return (f"Entry(row={self.row}, kegiatan={self.kegiatan!r}, "
+                f"{waktu}, "
+                f"skp={self.skp_label!r}, jumlah_diselesaikan={self.jumlah_diselesaikan})")
+
+
+class DayLayout:
+    """A block of consecutive sheet rows holding the activities of one day type.
+
+    Parameters:
+        name (str): The day type key, e.g. 'senin-kamis' or 'Hari Kerja 1'.
+        rows (int): The number of rows in the block. ``None`` reads until the first blank row.
+        pick (int): Number of activities randomly chosen per day. ``None`` submits every row.
+        jitter_start (bool): Whether the start minute is randomised as well as the end minute.
+    """
+    __slots__ = ("name", "rows", "pick", "jitter_start")
+
+    def __init__(self, name: str, rows: int = None, pick: int = None, jitter_start: bool = True):
+        self.name = name
+        self.rows = rows
+        self.pick = pick
+        self.jitter_start = jitter_start
+
+
+class SheetLayout:
+    """Declarative description of the journal spreadsheet of a variant.
+
+    Parameters:
+        days (tuple): ``DayLayout`` blocks in the order they appear in the sheet.
+        columns (dict): Field name to 0-based column index. Defaults to ``COLUMNS``.
+        header_rows (int): Number of rows above the first block. Default is 1.
+    """
+
+    def __init__(self, days: tuple, columns: dict = None, header_rows: int = 1):
+        self.days = tuple(days)
+        self.columns = dict(COLUMNS if columns is None else columns)
+        self.header_rows = header_rows
+        self._by_name = {day.name: day for day in self.days}
+
+    def day(self, name: str) -> DayLayout:
+        """Return the ``DayLayout`` registered under ``name``."""
+        return self._by_name[name]
+
+    @property
+    def row_limit(self):
+        """Number of sheet rows the layout needs, or None when a block is open ended."""
+        if any(day.rows is None for day in self.days):
+            return None
+        return self.header_rows + sum(day.rows for day in self.days)
+
+
+def parse_row(row: list, index: int, columns: dict, skp_resolver=None) -> Entry:
+    """Parse one sheet row into an ``Entry``.
+
+    Every cell is read exactly once and the SKP label is resolved with a single
+    ``skp_resolver`` call. Invalid time or count cells are parsed as None and
+    reported by ``app/validation.py``.
+
+    Parameters:
+        row (list): The raw cell values of the row.
+        index (int): The 0-based sheet row number.
+        columns (dict): Field name to 0-based column index.
+        skp_resolver (callable): Maps an SKP label to ``(index, value)``. Optional.
+
+    Returns:
+        Entry: The parsed entry.
+    """
+    width = max(columns.values()) + 1
+    if len(row) < width:
+        row = list(row) + [""] * (width - len(row))
+
+    mulai = to_minutes(row[columns["jam_mulai"]], row[columns["menit_mulai"]])
+    selesai = to_minutes(row[columns["jam_selesai"]], row[columns["menit_selesai"]])
+    jumlah_diselesaikan = to_number(row[columns["jumlah_diselesaikan"]])
+
+    skp_label = row[columns["skp"]]
+    skp, skp_value = (skp_resolver(skp_label) if skp_resolver else None) or (None, None)
+
+    return Entry(row[columns["kegiatan"]], mulai, selesai, skp_label, skp, skp_value, jumlah_diselesaikan, index)
+
+
+def parse_jurnal(values: list, layout: SheetLayout, skp_resolver=None) -> dict:
+    """Parse the values of the journal sheet according to ``layout``.
+
+    Rows whose ``kegiatan`` cell is blank are skipped. A block declared with
+    ``rows=None`` consumes rows until the first blank ``kegiatan`` cell.
+
+    Parameters:
+        values (list): The sheet values as returned by ``get_all_values``.
+        layout (SheetLayout): The layout of the variant.
+        skp_resolver (callable): Maps an SKP label to ``(index, value)``. Optional.
+
+    Returns:
+        dict: Day type name to a list of ``Entry`` objects.
+
+    Example:
+        >>> layout = SheetLayout(days=(DayLayout("senin-sabtu", rows=1),))
+        >>> parse_jurnal([[], ["1", "Apel", "7", "30", "8", "0", "Lain-Lain", "1"]], layout)
+        {'senin-sabtu': [Entry(row=1, kegiatan='Apel', 07:30-08:00, skp='Lain-Lain', jumlah_diselesaikan=1)]}
+    """
+    columns = layout.columns
+    kegiatan_col = columns["kegiatan"]
+    total = len(values)
+    index = layout.header_rows
+    jurnal = {}
+
+    for day in layout.days:
+        end = total if day.rows is None else min(index + day.rows, total)
+        entries = []
+        while index < end:
+            row = values[index]
+            if len(row) <= kegiatan_col or not row[kegiatan_col].strip():
+                index += 1
+                if day.rows is None: break
+                continue
+            entries.append(parse_row(row, index, columns, skp_resolver))
+            index += 1
+        jurnal[day.name] = entries
+
+    return jurnal
@@ -0,0 +1,9 @@
+"""Sheet layout of this variant: Senin-Kamis and Jumat-Sabtu, 4 kegiatan each."""
+from .jurnal import DayLayout, SheetLayout
+
+LAYOUT = SheetLayout(
+    days=(
+        DayLayout("senin-kamis", rows=4),
+        DayLayout("jumat-sabtu", rows=4),
+    ),
+)
@@ -0,0 +1,109 @@
+"""SKP catalog built from the options of the portal's own SKP `<select>`.
+
+The label -> option value map is scraped once per employee per year and cached in
+the state directory, so journal entries are resolved before the browser is used.
+"""
+from datetime import datetime
+import json
+import logging
+import os
+import re
+
+from .state import state_path
+
+skplog = logging.getLogger(__name__)
+
+# Ambil semua option dari <select> dalam satu perintah WebDriver
+SCRAPE_OPTIONS_JS = "return Array.from(arguments[0].options).map(function (o) { return [o.text, o.value]; });"
+
+
+def normalize_label(label: str) -> str:
+    """Normalize an SKP label for matching (case, whitespace and leading numbering are ignored)."""
+    label = re.sub(r"\s+", " ", str(label or "")).strip().casefold()
+    return re.sub(r"^\d+[.)]\s*", "", label)
+
+
+class SkpCatalog:
+    """
+    Cached map of SKP labels to the portal's `<select>` options for one employee and year.
+
+    Attributes:
+        nip (str): The employee NIP the options belong to.
+        year (int): The year of the SKP, option values change every year.
+        options (list): `[label, value]` pairs in the order of the `<select>`.
+        path (str): Location of the JSON cache file.
+    """
+
+    def __init__(self, nip: str, year: int, options: list = None, path: str = None):
+        self.nip = nip
+        self.year = year
+        self.options = []
+        self.path = path or state_path("skp", f"{nip}-{year}.json")
+        self._index = {}
+        self.update(options or [])
+
+    @classmethod
+    def load(cls, nip: str, year: int, path: str = None):
+        """Load the cached catalog of `nip` for `year`. Returns an empty catalog if there is no cache."""
+        catalog = cls(nip, year, path=path)
+        if os.path.exists(catalog.path):
+            try:
+                with open(catalog.path) as f:
+                    catalog.update(json.load(f).get("options", []))
+            except (OSError, ValueError) as e:
+                skplog.warning(f"Cache SKP {catalog.path} tidak dapat dibaca {repr(e)}")
+        return catalog
+
+    def save(self):
+        """Write the catalog to its cache file."""
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"nip": self.nip, "year": self.year,
+                       "scraped_at": datetime.now().isoformat(timespec="seconds"),
+                       "options": self.options}, f, indent=1)
+        os.replace(tmp, self.path)
+
+    def update(self, options: list):
+        """Replace the options with `[label, value]` pairs scraped from the `<select>`."""
+        self.options = [[str(label), str(value)] for label, value in options]
+        self._index = {}
+        for index, (label, value) in enumerate(self.options):
+            # option kosong seperti "-- Pilih --" tidak dipakai
+            if value:
+                self._index.setdefault(normalize_label(label), (index, value))
+
+    def __len__(self):
+        return len(self._index)
+
+    def resolve(self, label: str):
+        """
+        Resolve an SKP label from the sheet to its option.
+
+        An exact (normalized) match is preferred, otherwise a single option whose label
+        contains the sheet label, or is contained by it, is accepted.
+
+        Returns:
+            tuple: `(index, value)` of the option, or None if the label is unknown or ambiguous.
+        """
+        key = normalize_label(label)
+        if not key:
+            return None
+        if key in self._index:
+            return self._index[key]
+        matches = [option for name, option in self._index.items() if key in name or name in key]
+        return matches[0] if len(matches) == 1 else None
+
+    def missing(self, entries) -> list:
+        """Return the SKP labels of `entries` that cannot be resolved."""
+        return sorted({entry.skp_label for entry in entries if self.resolve(entry.skp_label) is None})
+
+    def resolve_entries(self, entries) -> list:
+        """
+        Fill in `skp` and `skp_value` of every entry in place.
+
+        Returns:
+            list: The SKP labels that could not be resolved.
+        """
+        for entry in entries:
+            entry.skp, entry.skp_value = self.resolve(entry.skp_label) or (None, None)
+        return self.missing(entries)
@@ -0,0 +1,29 @@
+"""Location of the bot's local state (caches, checkpoints and databases)."""
+import os
+
+
+def state_dir() -> str:
+    """
+    Returns the directory used for local state, creating it if needed.
+
+    The directory is taken from the `state_dir` environment variable. When it is not set,
+    `/tmp/jurnal-harian` is used on AWS Lambda (the only writable path) and `.jurnal` otherwise.
+    """
+    path = os.getenv("state_dir")
+    if not path:
+        path = "/tmp/jurnal-harian" if os.getenv("AWS_LAMBDA_FUNCTION_NAME") else ".jurnal"
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def state_path(*parts) -> str:
+    """
+    Returns a path inside the state directory, creating its parent directories.
+
+    Example:
+        >>> state_path("skp", "199001012020121001-2024.json")
+        '.jurnal/skp/199001012020121001-2024.json'
+    """
+    path = os.path.join(state_dir(), *parts)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return path
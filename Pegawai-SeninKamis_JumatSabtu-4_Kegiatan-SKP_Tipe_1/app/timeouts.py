@@ -0,0 +1,117 @@
+"""Timeouts of the `wait_element_*` helpers learned from the latency of each step.
+
+The helpers used to wait a fixed 30 seconds (inputs, selects) or 60 seconds (clicks, the journal
+table). A dead page then costs a full minute, while on a slow night a healthy portal can still go
+over. Every wait that succeeds is kept as a sample of its step (the XPath waited for) in the
+history database (see `app/history.py`). At the start of a run the `timeout_quantile` percentile
+of each step over the last `timeout_days` days is read, and the timeout of the step becomes that
+percentile times `timeout_factor`, kept between `timeout_floor` and `timeout_ceiling`. Slow
+nights are part of the samples, so they are tolerated; a page far slower than any seen before
+fails fast. Steps with fewer than `timeout_min_samples` samples keep the fixed timeout.
+
+A wait that expires under a learned timeout shorter than the fixed one is marked `shortened`.
+`fill_jurnal` treats a timeout as fatal ("tidak terdaftar sebagai pegawai WFH"), so it first retries
+the entry once with `relaxed` set, i.e. with the fixed timeouts, as before they were learned.
+
+Configured with environment variables:
+
+- `timeout_adaptive`: 0 keeps the fixed timeouts, default 1,
+- `timeout_quantile`: default 99,
+- `timeout_factor`: default 3,
+- `timeout_floor` and `timeout_ceiling`: seconds, default 15 and 90,
+- `timeout_min_samples`: default 20,
+- `timeout_days`: default 30.
+"""
+from datetime import date, timedelta
+import logging
+import os
+
+timeoutlog = logging.getLogger(__name__)
+
+QUANTILE = 99
+FACTOR = 3
+FLOOR = 15
+CEILING = 90
+MIN_SAMPLES = 20
+DAYS = 30
+
+
+class StepTimeouts:
+    """
+    Timeout of each wait step, derived from the step latencies stored in the history.
+
+    Parameters:
+        enabled (bool): Defaults to the `timeout_adaptive` environment variable.
+
+    Attributes:
+        learned (dict): Step to `(samples, percentile, timeout)` read by `load`.
+        samples (list): `(step, seconds)` of the waits of the current run, stored by `take_samples`.
+        expired (dict): Step to the number of waits of the current run that timed out.
+        shortened (bool): The last expired wait used a learned timeout shorter than the fixed one.
+        relaxed (bool): Use at least the fixed timeout of every step, set while an entry is retried.
+    """
+
+    def __init__(self, enabled: bool = None):
+        self.enabled = enabled if enabled is not None else os.getenv("timeout_adaptive", "1") != "0"
+        self.quantile = float(os.getenv("timeout_quantile", QUANTILE))
+        self.factor = float(os.getenv("timeout_factor", FACTOR))
+        self.floor = float(os.getenv("timeout_floor", FLOOR))
+        self.ceiling = float(os.getenv("timeout_ceiling", CEILING))
+        self.min_samples = int(os.getenv("timeout_min_samples", MIN_SAMPLES))
+        self.days = int(os.getenv("timeout_days", DAYS))
+        self.learned = {}
+        self.samples = []
+        self.expired = {}
+        self.shortened = False
+        self.relaxed = False
+
+    def derive(self, value: float) -> float:
+        """Return the timeout for a step whose percentile latency is `value` seconds."""
+        return min(self.ceiling, max(self.floor, value * self.factor))
+
+    def load(self, history):
+        """Read the latency percentile of every step from `history` and derive the timeouts."""
+        if not self.enabled:
+            return
+        since = date.today() - timedelta(days=self.days)
+        self.learned = {step: (count, value, round(self.derive(value), 1))
+                        for step, (count, value) in history.step_latency(since, self.quantile).items()
+                        if count >= self.min_samples}
+        if self.learned:
+            timeoutlog.debug(f"Timeout {len(self.learned)} langkah dari p{self.quantile:g} {self.days} hari terakhir")
+
+    def get(self, step: str, default: float) -> float:
+        """Return the timeout of `step`, `default` when it has not enough samples yet or when relaxed."""
+        learned = self.learned.get(step)
+        if learned is None:
+            return default
+        return max(default, learned[2]) if self.relaxed else learned[2]
+
+    def observe(self, step: str, seconds: float):
+        """Keep the latency of a wait that succeeded."""
+        self.samples.append((step, round(seconds, 3)))
+
+    def timed_out(self, step: str, shortened: bool = False):
+        """Count a wait that ran out of time, `shortened` if its timeout was below the fixed one."""
+        self.expired[step] = self.expired.get(step, 0) + 1
+        self.shortened = shortened
+
+    def take_samples(self) -> list:
+        """Return the samples since the last call and start a new list."""
+        samples, self.samples = self.samples, []
+        return samples
+
+    def summary(self) -> dict:
+        """
+        Return the timeouts of the run for the report and forget the expired waits.
+
+        Returns:
+            dict: `learned` (step to timeout, samples and percentile) and `expired` (step to count).
+        """
+        result = {
+            "learned": {step: {"timeout": timeout, "samples": count, f"p{self.quantile:g}": round(value, 3)}
+                        for step, (count, value, timeout) in self.learned.items()},
+            "expired": self.expired,
+        }
+        self.expired = {}
+        return result
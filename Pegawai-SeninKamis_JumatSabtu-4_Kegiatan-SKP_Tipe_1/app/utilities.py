@@ -2,12 +2,12 @@ from datetime import date, timedelta, datetime
 from random import randint
 from dotenv import load_dotenv
 import logging
-import smtplib
-import holidays
 import pytz
 import os
 
-from .spreadsheet import get_sheet_row_col, get_sheet_time, get_skp_value, get_sheet_table_values
+from .spreadsheet import get_sheet_row_col, get_sheet_table_values
+from .jurnal import parse_jurnal
+from .layout import LAYOUT
 
 load_dotenv()
 class Util:
@@ -48,13 +48,16 @@ class Util:
         random_time(time: str, range: int = 5) -> int:
             Generates a random time by adding a random number of minutes to the given time.
 
+        jenis_hari() -> str:
+            Returns the day type of today as declared in the layout.
+
         get_jurnal() -> dict:
             Retrieves data from a spreadsheet and returns it as a dictionary.
 
         send_email(subject: str, body: str):
             Sends an email to a specified receiver.
 
-        parse_data_to_pretty_output(json_data: dict, value: str) -> str:
+        parse_data_to_pretty_output(entries: list) -> str:
             Parses data from the journal into a formatted description.
 
     Example:
@@ -69,7 +72,7 @@ class Util:
         random_time = util.random_time('09:30')
         jurnal_data = util.get_jurnal()
         util.send_email('Subject', 'Body')
-        pretty_output = util.parse_data_to_pretty_output(jurnal_data, 'senin-kamis')
+        pretty_output = util.parse_data_to_pretty_output(jurnal_data['senin-kamis'])
     """
     def __init__(self) -> None:
         self.now = datetime.now()
@@ -127,12 +130,15 @@ class Util:
         minutes, seconds = divmod(remainder, 60)
         return f"{int(hours):02d}:{int(minutes):02d}:{int(seconds):02d}"
 
-    def list_holiday(self) -> list:
+    def list_holiday(self, year: int = None) -> list:
         """
         Retrieves a list of holidays in Indonesia.
 
         This method iterates through each date in the specified year and checks if it is a Sunday. If a date is a Sunday, it is considered a weekend holiday. The method then adds these weekend holidays to a dictionary object, where the keys are the holiday dates and the values are set to "Weekend Holiday". The dictionary is created using the 'holidays' module, specifically the 'CountryHoliday' class with the country code 'ID' for Indonesia.
 
+        Parameters:
+            year (int, optional): The year to list the weekend holidays of. Defaults to the current year.
+
         Returns:
             list: A list of holidays in Indonesia, including both official holidays and weekend holidays.
 
@@ -147,13 +153,17 @@ class Util:
                 ...
             }
         """
+        # DIIMPOR SAAT DIPAKAI AGAR TIDAK MEMPERLAMBAT COLD START
+        import holidays
+
         id_holidays = holidays.CountryHoliday('ID')
         # Mendapatkan daftar hari libur akhir pekan
         weekend_holidays = []
 
         # Iterasi melalui setiap tanggal dalam rentang tahun
-        start_date = date(self.date.year, 1, 1)
-        end_date = date(self.date.year, 12, 31)
+        year = year or self.date.year
+        start_date = date(year, 1, 1)
+        end_date = date(year, 12, 31)
 
         while start_date <= end_date:
             # Periksa apakah tanggal adalah hari Minggu
@@ -167,12 +177,15 @@ class Util:
             id_holidays[holiday] = "Weekend Holiday"
         return id_holidays
 
-    def is_holiday(self) -> bool:
+    def is_holiday(self, tanggal: date = None) -> bool:
         """
-        Checks if the current date is a holiday.
+        Checks if the given date, today by default, is a holiday.
+
+        Parameters:
+            tanggal (date, optional): The date to check. Defaults to today in Asia/Jakarta.
 
         Returns:
-            bool: True if the current date is a holiday, False otherwise.
+            bool: True if the date is a holiday, False otherwise.
 
         Example:
             >>> util = Util()
@@ -181,14 +194,18 @@ class Util:
             >>> util.is_holiday()
             False
         """
-        if datetime.now(self.tz).date() in self.list_holiday():
+        tanggal = tanggal or datetime.now(self.tz).date()
+        if tanggal in self.list_holiday(tanggal.year):
             return True
         return False
 
-    def is_senin_kamis(self) -> bool:
+    def is_senin_kamis(self, tanggal: date = None) -> bool:
         """
         Checks if the current weekday is Monday to Thursday.
 
+        Parameters:
+            tanggal (date, optional): The date to check instead of today.
+
         Returns:
             bool: True if the current weekday is Monday to Thursday, False otherwise.
 
@@ -199,14 +216,17 @@ class Util:
             >>> util.is_senin_kamis()
             False
         """
-        if 0 <= datetime.now(self.tz).weekday() <= 3:
+        if 0 <= (tanggal or datetime.now(self.tz).date()).weekday() <= 3:
             return True
         return False
 
-    def is_jumat_sabtu(self) -> bool:
+    def is_jumat_sabtu(self, tanggal: date = None) -> bool:
         """
         Checks if the current weekday is Friday or Saturday.
 
+        Parameters:
+            tanggal (date, optional): The date to check instead of today.
+
         Returns:
             bool: True if the current weekday is Friday or Saturday, False otherwise.
 
@@ -217,10 +237,33 @@ class Util:
             >>> util.is_jumat_sabtu()
             False
         """
-        if 4 <= datetime.now(self.tz).weekday() <= 5:
+        if 4 <= (tanggal or datetime.now(self.tz).date()).weekday() <= 5:
             return True
         return False
 
+    def jenis_hari(self, tanggal: date = None):
+        """
+        Returns the day type of a date, today by default, as declared in ``app/layout.py``.
+
+        Parameters:
+            tanggal (date, optional): The date to check. Defaults to today in Asia/Jakarta.
+
+        Returns:
+            str: The day type name, or None if no journal has to be filled on that date.
+
+        Example:
+            >>> util = Util()
+            >>> util.jenis_hari()
+            'senin-kamis'
+        """
+        if self.is_holiday(tanggal):
+            return None
+        if self.is_senin_kamis(tanggal):
+            return "senin-kamis"
+        if self.is_jumat_sabtu(tanggal):
+            return "jumat-sabtu"
+        return None
+
     def random_time(self, time, range: int = 5) -> int:
         """
         Generates a random time by adding a random number of minutes to the given time.
@@ -247,8 +290,12 @@ class Util:
         """
         Retrieves data from a spreadsheet and returns it as a dictionary.
 
+        The rows are parsed by ``parse_jurnal`` according to the variant's ``LAYOUT``,
+        so adding rows or day types only requires changing ``app/layout.py``. The SKP
+        labels are resolved later from the ``SkpCatalog``.
+
         Returns:
-            dict: A dictionary containing the retrieved data from the spreadsheet.
+            dict: Day type name to a list of ``Entry`` objects.
 
         Example:
             >>> util = Util()
@@ -256,139 +303,15 @@ class Util:
             >>> print(jurnal_data)
             {
                 "senin-kamis": [
-                    {
-                        "kegiatan": "Kegiatan 1",
-                        "jam_mulai": "09:00",
-                        "menit_mulai": "00",
-                        "jam_selesai": "17:00",
-                        "menit_selesai": "30",
-                        "skp": "SKP 1",
-                        "skp_value": "SKP Value 1",
-                        "jumlah_diselesaikan": 5
-                    },
-                    {
-                        "kegiatan": "Kegiatan 2",
-                        "jam_mulai": "10:00",
-                        "menit_mulai": "30",
-                        "jam_selesai": "18:00",
-                        "menit_selesai": "00",
-                        "skp": "SKP 2",
-                        "skp_value": "SKP Value 2",
-                        "jumlah_diselesaikan": 3
-                    }
+                    Entry(row=1, kegiatan='Kegiatan 1', 09:00-17:30, skp='Lain-Lain', jumlah_diselesaikan=5),
+                    Entry(row=2, kegiatan='Kegiatan 2', 10:30-18:00, skp='Tugas Tambahan', jumlah_diselesaikan=3)
                 ],
                 "jumat-sabtu": [
-                    {
-                        "kegiatan": "Kegiatan 3",
-                        "jam_mulai": "08:00",
-                        "menit_mulai": "15",
-                        "jam_selesai": "16:30",
-                        "menit_selesai": "45",
-                        "skp": "SKP 3",
-                        "skp_value": "SKP Value 3",
-                        "jumlah_diselesaikan": 2
-                    },
-                    {
-                        "kegiatan": "Kegiatan 4",
-                        "jam_mulai": "09:30",
-                        "menit_mulai": "45",
-                        "jam_selesai": "17:45",
-                        "menit_selesai": "15",
-                        "skp": "SKP 4",
-                        "skp_value": "SKP Value 4",
-                        "jumlah_diselesaikan": 4
-                    }
+                    Entry(row=5, kegiatan='Kegiatan 3', 08:15-16:45, skp='Kreatifitas', jumlah_diselesaikan=2)
                 ]
             }
         """
-
-        value = get_sheet_table_values()
-        return {
-            "senin-kamis": [
-                {
-                    "kegiatan": value[1][1],
-                    "jam_mulai": get_sheet_time(value[1][2]),
-                    "menit_mulai": get_sheet_time(value[1][3]),
-                    "jam_selesai": get_sheet_time(value[1][4]),
-                    "menit_selesai": get_sheet_time(value[1][5]),
-                    "skp": get_skp_value(value[1][6])[0],
-                    "skp_value": get_skp_value(value[1][6])[1],
-                    "jumlah_diselesaikan": int(value[1][7])
-                },
-                {
-                    "kegiatan": value[2][1],
-                    "jam_mulai": get_sheet_time(value[2][2]),
-                    "menit_mulai": get_sheet_time(value[2][3]),
-                    "jam_selesai": get_sheet_time(value[2][4]),
-                    "menit_selesai": get_sheet_time(value[2][5]),
-                    "skp": get_skp_value(value[2][6])[0],
-                    "skp_value": get_skp_value(value[2][6])[1],
-                    "jumlah_diselesaikan": int(value[2][7])
-                },
-                {
-                    "kegiatan": value[3][1],
-                    "jam_mulai": get_sheet_time(value[3][2]),
-                    "menit_mulai": get_sheet_time(value[3][3]),
-                    "jam_selesai": get_sheet_time(value[3][4]),
-                    "menit_selesai": get_sheet_time(value[3][5]),
-                    "skp": get_skp_value(value[3][6])[0],
-                    "skp_value": get_skp_value(value[3][6])[1],
-                    "jumlah_diselesaikan": int(value[3][7])
-                },
-                {
-                    "kegiatan": value[4][1],
-                    "jam_mulai": get_sheet_time(value[4][2]),
-                    "menit_mulai": get_sheet_time(value[4][3]),
-                    "jam_selesai": get_sheet_time(value[4][4]),
-                    "menit_selesai": get_sheet_time(value[4][5]),
-                    "skp": get_skp_value(value[4][6])[0],
-                    "skp_value": get_skp_value(value[4][6])[1],
-                    "jumlah_diselesaikan": int(value[4][7])
-                }
-            ],
-            "jumat-sabtu": [
-                {
-                    "kegiatan": value[5][1],
-                    "jam_mulai": get_sheet_time(value[5][2]),
-                    "menit_mulai": get_sheet_time(value[5][3]),
-                    "jam_selesai": get_sheet_time(value[5][4]),
-                    "menit_selesai": get_sheet_time(value[5][5]),
-                    "skp": get_skp_value(value[5][6])[0],
-                    "skp_value": get_skp_value(value[5][6])[1],
-                    "jumlah_diselesaikan": int(value[5][7])
-                },
-                {
-                    "kegiatan": value[6][1],
-                    "jam_mulai": get_sheet_time(value[6][2]),
-                    "menit_mulai": get_sheet_time(value[6][3]),
-                    "jam_selesai": get_sheet_time(value[6][4]),
-                    "menit_selesai": get_sheet_time(value[6][5]),
-                    "skp": get_skp_value(value[6][6])[0],
-                    "skp_value": get_skp_value(value[6][6])[1],
-                    "jumlah_diselesaikan": int(value[6][7])
-                },
-                {
-                    "kegiatan": value[7][1],
-                    "jam_mulai": get_sheet_time(value[7][2]),
-                    "menit_mulai": get_sheet_time(value[7][3]),
-                    "jam_selesai": get_sheet_time(value[7][4]),
-                    "menit_selesai": get_sheet_time(value[7][5]),
-                    "skp": get_skp_value(value[7][6])[0],
-                    "skp_value": get_skp_value(value[7][6])[1],
-                    "jumlah_diselesaikan": int(value[7][7])
-                },
-                {
-                    "kegiatan": value[8][1],
-                    "jam_mulai": get_sheet_time(value[8][2]),
-                    "menit_mulai": get_sheet_time(value[8][3]),
-                    "jam_selesai": get_sheet_time(value[8][4]),
-                    "menit_selesai": get_sheet_time(value[8][5]),
-                    "skp": get_skp_value(value[8][6])[0],
-                    "skp_value": get_skp_value(value[8][6])[1],
-                    "jumlah_diselesaikan": int(value[8][7])
-                }
-            ]
-        }
+        return parse_jurnal(get_sheet_table_values(LAYOUT.row_limit), LAYOUT)
 
     def send_email(self, subject:str, body:str):
         """
@@ -410,6 +333,8 @@ class Util:
 
             if RECEIVER_EMAIL is not None:
                 logging.info(f"Sending email to {RECEIVER_EMAIL}")
+                import smtplib
+
                 server_ssl = smtplib.SMTP_SSL('smtp.gmail.com', 465)
                 server_ssl.ehlo()
                 server_ssl.login(os.getenv('email_sender'), os.getenv('email_password'))
@@ -420,13 +345,12 @@ class Util:
         except Exception as e:
             print('Error:', e)
 
-    def parse_data_to_pretty_output(self, json_data:dict, value:str):
+    def parse_data_to_pretty_output(self, entries: list):
         """
         Parses data from the journal into a formatted description.
 
         Parameters:
-            json_data (dict): A dictionary containing the journal data.
-            value (str): The key in the dictionary to retrieve the data from.
+            entries (list): The ``Entry`` objects to describe.
 
         Returns:
             str: The formatted description of the journal data.
@@ -434,23 +358,18 @@ class Util:
         Example:
             >>> util = Util()
             >>> jurnal_data = util.get_jurnal()
-            >>> pretty_output = util.parse_data_to_pretty_output(jurnal_data, 'senin-kamis')
+            >>> pretty_output = util.parse_data_to_pretty_output(jurnal_data['senin-kamis'])
             >>> print(pretty_output)
-            1. Kegiatan 1 dimulai dari jam 09:00:00 hingga 17:00:30
-            2. Kegiatan 2 dimulai dari jam 10:00:30 hingga 18:00:00
+            1. Kegiatan 1 dimulai dari jam 09:00 hingga 17:30
+            2. Kegiatan 2 dimulai dari jam 10:30 hingga 18:00
         """
 
         # Inisialisasi list untuk penjelasan
         descriptions = []
 
         # Iterasi melalui setiap objek dan tambahkan penjelasan ke list
-        for i, obj in enumerate(json_data[value], start=1):
-            kegiatan = obj["kegiatan"]
-            jam_mulai = obj["jam_mulai"]
-            menit_mulai = obj["menit_mulai"]
-            jam_selesai = obj["jam_selesai"]
-            menit_selesai = obj["menit_selesai"]
-            description = f"{i}. {kegiatan} dimulai dari jam {jam_mulai}:{menit_mulai} hingga {jam_selesai}:{menit_selesai}"
+        for i, obj in enumerate(entries, start=1):
+            description = f"{i}. {obj.kegiatan} dimulai dari jam {obj.jam_mulai}:{obj.menit_mulai} hingga {obj.jam_selesai}:{obj.menit_selesai}"
             descriptions.append(description)
 
         # Menggabungkan semua penjelasan dalam satu string
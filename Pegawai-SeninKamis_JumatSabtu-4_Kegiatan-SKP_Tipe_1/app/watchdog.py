@@ -0,0 +1,220 @@
+"""Watchdog for hung and crashed WebDriver sessions.
+
+`WebDriverWait` only bounds the polling of an element. A single command such as `driver.get` or
+`find_element` against a stuck portal blocks until the HTTP client of WebDriver gives up, far later
+than our waits and possibly after the Lambda timeout. The watchdog wraps the command executor of
+the driver and a monitor thread enforces two wall-clock limits:
+
+- `command_timeout`: the longest a single WebDriver command may run,
+- `entry_timeout`: the longest one journal entry (`Watchdog.entry`) may take, retries included.
+
+When a limit is exceeded the driver is torn down from the monitor thread: chromedriver and its
+Chrome processes are killed, or the session is deleted on the Selenium Grid. The blocked command
+then fails and `WatchdogTripped` is raised in the run, which recreates the driver and continues
+from the next unsubmitted entry. Every intervention is passed to `on_trip` to be recorded.
+
+The limits are set with the `watchdog_command` and `watchdog_entry` environment variables
+(seconds, 0 disables the limit).
+
+The same wrapper detects a crashed browser. Chrome started with `--single-process` can die under
+memory pressure, after which every command fails. A command that cannot reach chromedriver, or
+whose error says the session or tab is gone, raises `DriverCrashed` instead of the usual
+WebDriver error, so the run relaunches the browser rather than retrying against a dead session.
+"""
+from contextlib import contextmanager
+from datetime import datetime
+from signal import SIGKILL
+from threading import Event, Lock, Thread
+from time import monotonic
+import logging
+import os
+
+watchdoglog = logging.getLogger(__name__)
+
+# Batas default: satu perintah WebDriver 90 detik (di atas WebDriverWait 60 detik), satu kegiatan 5 menit
+COMMAND_TIMEOUT = 90
+ENTRY_TIMEOUT = 300
+# Jeda pengecekan thread pemantau
+POLL = 0.5
+# Pesan error WebDriver yang berarti browser / tab sudah mati
+CRASH_MARKERS = (
+    "invalid session id",
+    "session deleted because of page crash",
+    "tab crashed",
+    "chrome not reachable",
+    "not connected to devtools",
+    "target window already closed",
+)
+
+
+class WatchdogTripped(Exception):
+    """Raised in the run when the watchdog has torn down the driver of a command that overran its limit."""
+
+
+class DriverCrashed(Exception):
+    """Raised when a WebDriver command finds the browser or chromedriver dead."""
+
+
+def is_crash(response) -> bool:
+    """Return True if a WebDriver response is an error saying that the session or tab is gone."""
+    if not isinstance(response, dict) or response.get("status") in (None, 0, 200):
+        return False
+    text = str(response.get("value")).lower()
+    return any(marker in text for marker in CRASH_MARKERS)
+
+
+def descendants(pid: int) -> list:
+    """Return the pids of every descendant of `pid`, read from /proc (empty where /proc is missing)."""
+    children = {}
+    try:
+        entries = os.listdir("/proc")
+    except OSError:
+        return []
+    for name in entries:
+        if not name.isdigit():
+            continue
+        try:
+            with open(f"/proc/{name}/stat") as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # FORMAT: pid (comm) state ppid ..., comm dapat berisi spasi
+        ppid = int(stat.rsplit(")", 1)[1].split()[1])
+        children.setdefault(ppid, []).append(int(name))
+    found, stack = [], [pid]
+    while stack:
+        for child in children.get(stack.pop(), []):
+            found.append(child)
+            stack.append(child)
+    return found
+
+
+class Watchdog:
+    """
+    Enforces wall-clock limits on the WebDriver commands of one driver at a time.
+
+    Parameters:
+        command_timeout (float): Limit of a single command in seconds. Defaults to `watchdog_command`.
+        entry_timeout (float): Limit of one `entry` block in seconds. Defaults to `watchdog_entry`.
+        on_trip (callable): Called with the intervention record (dict) whenever the driver is torn down.
+    """
+
+    def __init__(self, command_timeout: float = None, entry_timeout: float = None, on_trip=None):
+        self.command_timeout = command_timeout if command_timeout is not None else float(os.getenv("watchdog_command", COMMAND_TIMEOUT))
+        self.entry_timeout = entry_timeout if entry_timeout is not None else float(os.getenv("watchdog_entry", ENTRY_TIMEOUT))
+        self.on_trip = on_trip
+        self.driver = None
+        self.command = None
+        self.entry_idx = None
+        self.entry_started = None
+        self.reason = None
+        self.lock = Lock()
+        self.stopped = Event()
+        self.thread = None
+
+    @property
+    def tripped(self) -> bool:
+        return self.reason is not None
+
+    def install(self, driver):
+        """Guard every command of `driver`, replacing the driver guarded before."""
+        # urllib3 SUDAH DIMUAT OLEH SELENIUM SAAT ADA DRIVER
+        from urllib3.exceptions import HTTPError as ConnectionFailure
+
+        executor = driver.command_executor
+        execute = executor.execute
+
+        def guarded(command, params):
+            with self.lock:
+                if self.tripped and self.driver is driver:
+                    raise WatchdogTripped(self.reason)
+                self.command = (command, monotonic())
+            try:
+                response = execute(command, params)
+            except Exception as e:
+                if self.tripped and self.driver is driver:
+                    raise WatchdogTripped(self.reason) from e
+                if isinstance(e, (ConnectionError, ConnectionFailure)) and command != "quit":
+                    # CHROMEDRIVER TIDAK DAPAT DIHUBUNGI
+                    raise DriverCrashed(f"Driver mati saat {command}: {repr(e)}") from e
+                raise
+            finally:
+                self.command = None
+            if self.tripped and self.driver is driver:
+                raise WatchdogTripped(self.reason)
+            if command != "quit" and is_crash(response):
+                raise DriverCrashed(f"Browser mati saat {command}: {str(response.get('value'))[:200]}")
+            return response
+
+        executor.execute = guarded
+        with self.lock:
+            self.driver = driver
+            self.reason = None
+        if self.thread is None and (self.command_timeout > 0 or self.entry_timeout > 0):
+            self.thread = Thread(target=self._monitor, name="watchdog", daemon=True)
+            self.thread.start()
+
+    @contextmanager
+    def entry(self, idx: int):
+        """Limit the wall time of the block to `entry_timeout`."""
+        self.entry_idx, self.entry_started = idx, monotonic()
+        try:
+            yield
+        finally:
+            self.entry_idx, self.entry_started = None, None
+
+    def _monitor(self):
+        while not self.stopped.wait(POLL):
+            now = monotonic()
+            command, entry_started = self.command, self.entry_started
+            if self.driver is None or self.tripped:
+                continue
+            if command is not None and 0 < self.command_timeout < now - command[1]:
+                self.trip(f"Perintah {command[0]} berjalan lebih dari {self.command_timeout:.0f} detik",
+                          "perintah", command[0], now - command[1])
+            elif entry_started is not None and 0 < self.entry_timeout < now - entry_started:
+                self.trip(f"Kegiatan ke-{self.entry_idx} berjalan lebih dari {self.entry_timeout:.0f} detik",
+                          "kegiatan", command[0] if command else None, now - entry_started)
+
+    def trip(self, reason: str, limit: str, command: str = None, elapsed: float = 0):
+        """Tear down the guarded driver and record the intervention."""
+        with self.lock:
+            if self.tripped or self.driver is None:
+                return
+            self.reason = reason
+            driver = self.driver
+        watchdoglog.error(f"{reason}, driver dihentikan paksa")
+        try:
+            self.kill(driver)
+        except Exception as e:
+            watchdoglog.warning(f"Driver tidak dapat dihentikan {repr(e)}")
+        record = {
+            "waktu": datetime.now().isoformat(timespec="seconds"),
+            "batas": limit,
+            "perintah": command,
+            "kegiatan": self.entry_idx,
+            "durasi": round(elapsed, 1),
+            "alasan": reason,
+        }
+        if self.on_trip is not None:
+            self.on_trip(record)
+
+    def kill(self, driver):
+        """Abort whatever the driver is doing: kill chromedriver and Chrome, or delete the Grid session."""
+        process = getattr(getattr(driver, "service", None), "process", None)
+        if process is not None:
+            # ANAK PROSES (CHROME) DULU, AGAR TIDAK MENJADI YATIM SETELAH CHROMEDRIVER MATI
+            for pid in descendants(process.pid)[::-1] + [process.pid]:
+                try:
+                    os.kill(pid, SIGKILL)
+                except OSError:
+                    pass
+            return
+        # REMOTE: HAPUS SESI DI GRID, PERINTAH YANG MENGGANTUNG IKUT DIAKHIRI
+        from urllib.request import Request, urlopen
+
+        url = f"{driver.command_executor._url}/session/{driver.session_id}"
+        urlopen(Request(url, method="DELETE"), timeout=10).close()
+
+    def stop(self):
+        self.stopped.set()
@@ -0,0 +1,274 @@
+"""Submission window planner: spreads the employees of a roster over the allowed night window.
+
+Scheduling everyone at midnight makes every journal hit the portal in the same minute. The planner
+gives each employee a start minute inside the window so that the portal request rate stays as flat
+as possible and concurrent sessions stay under the governor's cap (`app/governor.py`). Each run must
+also finish before the employee's deadline with `slack` of its duration to spare for retries.
+The resulting timetable is consumed by the daemon (`python local.py --daemon --timetable ...`) or
+turned into one EventBridge rule per employee with its `cron` field.
+
+Usage:
+    python -m app.window plan --roster roster.csv --window 00:00-04:00 --output timetable.json
+    python -m app.window simulate --timetable timetable.json --runs 500
+
+The roster is a CSV file with the columns `nip`, `kegiatan` (entries per day) and optionally
+`deadline` ('HH:MM', default the end of the window) and `durasi` (expected seconds of a run).
+"""
+from math import ceil
+import argparse
+import csv
+import json
+import os
+import random
+import sys
+
+from .history import History, percentile
+from .state import state_dir
+
+# Perkiraan awal jika belum ada riwayat pengisian
+LOGIN_SECONDS = 20
+ENTRY_SECONDS = 30
+# Permintaan ke portal: login (halaman + submit), per kegiatan (halaman + simpan), verifikasi
+LOGIN_REQUESTS = 2
+ENTRY_REQUESTS = 2
+VERIFY_REQUESTS = 1
+# Bagian dari durasi yang dicadangkan sebelum deadline untuk percobaan ulang
+SLACK = 0.5
+MAX_SESSIONS = 4
+# Selisih WIB terhadap UTC, untuk ekspresi cron EventBridge
+WIB_OFFSET = 7 * 60
+
+
+def parse_clock(text: str) -> int:
+    """Convert 'HH:MM' into minutes since midnight."""
+    jam, menit = map(int, text.split(":"))
+    return jam * 60 + menit
+
+
+def format_clock(minutes: int) -> str:
+    """Convert minutes since midnight (possibly past the next midnight) into 'HH:MM'."""
+    jam, menit = divmod(minutes % 1440, 60)
+    return f"{jam:02d}:{menit:02d}"
+
+
+def parse_window(text: str) -> tuple:
+    """
+    Parse a window 'HH:MM-HH:MM' into (start, end) minutes. A window crossing midnight ends after 1440.
+
+    Example:
+        >>> parse_window("23:00-04:00")
+        (1380, 1680)
+    """
+    start, end = (parse_clock(part) for part in text.split("-"))
+    if end <= start:
+        end += 1440
+    return start, end
+
+
+class Employee:
+    """
+    One roster line.
+
+    Attributes:
+        nip (str): The employee.
+        kegiatan (int): Number of journal entries per day.
+        deadline (int): Minute (same scale as the window) the run must be finished by, None for the window end.
+        durasi (float): Expected duration of a run in seconds.
+    """
+    __slots__ = ("nip", "kegiatan", "deadline", "durasi")
+
+    def __init__(self, nip: str, kegiatan: int, deadline: int = None, durasi: float = None):
+        self.nip = nip
+        self.kegiatan = kegiatan
+        self.deadline = deadline
+        self.durasi = durasi
+
+    @property
+    def requests(self) -> int:
+        """Portal requests of one run, the unit the governor's token bucket counts."""
+        return LOGIN_REQUESTS + ENTRY_REQUESTS * self.kegiatan + VERIFY_REQUESTS
+
+
+def load_roster(path: str, window: tuple, history: History = None) -> list:
+    """
+    Read the roster CSV. Missing durations are estimated from the p95 entry duration in the
+    history, or from `ENTRY_SECONDS` when an employee has no history yet.
+    """
+    start, end = window
+    roster = []
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            kegiatan = int(row.get("kegiatan") or 4)
+            deadline = None
+            if row.get("deadline"):
+                deadline = parse_clock(row["deadline"])
+                if deadline <= start:
+                    deadline += 1440
+            durasi = float(row["durasi"]) if row.get("durasi") else None
+            if durasi is None:
+                entry = history.entry_duration(row["nip"]) if history is not None else None
+                durasi = LOGIN_SECONDS + kegiatan * (entry or ENTRY_SECONDS)
+            roster.append(Employee(row["nip"], kegiatan, deadline, durasi))
+    return roster
+
+
+def plan_window(roster: list, window: tuple, max_sessions: int = MAX_SESSIONS, slack: float = SLACK) -> dict:
+    """
+    Assign a start minute to every employee of the roster.
+
+    Employees are placed earliest deadline first (longest run first on ties). Each one gets the
+    feasible start minute that keeps the peak portal request rate over its run lowest, where feasible
+    means the run plus `slack` of its duration ends before its deadline and, over that same reserved
+    time, the concurrent sessions stay below `max_sessions`. An employee that fits nowhere is placed at the least loaded start and
+    flagged.
+
+    Returns:
+        dict: The timetable, with `window`, `max_sessions`, `slack` and one `slots` item per employee.
+    """
+    start, end = window
+    width = end - start
+    sessions = [0] * width
+    load = [0.0] * width
+    slots = []
+
+    def key(emp):
+        return (emp.deadline or end, -emp.durasi)
+
+    for emp in sorted(roster, key=key):
+        run = max(1, ceil(emp.durasi / 60))
+        reserved = ceil(emp.durasi * (1 + slack) / 60)
+        latest = min(emp.deadline or end, end) - start - reserved
+        rate = emp.requests / run
+        best, flag = None, None
+        for s in range(0, max(latest, 0) + 1):
+            span = range(s, min(s + run, width))
+            # SESI DIANGGAP TERPAKAI SELAMA DURASI + SLACK, KARENA PERCOBAAN ULANG MEMPERPANJANG SESI
+            if any(sessions[m] >= max_sessions for m in range(s, min(s + reserved, width))):
+                continue
+            cost = (max(load[m] for m in span) + rate, sum(load[m] for m in span))
+            if best is None or cost < best[0]:
+                best = (cost, s)
+        if best is None:
+            # TIDAK ADA SLOT YANG MEMENUHI SEMUA BATAS, PILIH YANG PALING SEPI
+            flag = "deadline" if latest < 0 else "sesi"
+            candidates = range(0, max(min(latest, width - run), 0) + 1)
+            s = min(candidates, key=lambda s: (max(sessions[s:s + reserved] or [0]), sum(load[s:s + run])))
+        else:
+            s = best[1]
+        for m in range(s, min(s + reserved, width)):
+            sessions[m] += 1
+        for m in range(s, min(s + run, width)):
+            load[m] += rate
+        mulai = start + s
+        utc = (mulai - WIB_OFFSET) % 1440
+        slots.append({
+            "nip": emp.nip,
+            "mulai": format_clock(mulai),
+            "selesai": format_clock(mulai + run),
+            "deadline": format_clock(emp.deadline or end),
+            "durasi": round(emp.durasi, 1),
+            "kegiatan": emp.kegiatan,
+            "requests": emp.requests,
+            "cron": f"cron({utc % 60} {utc // 60} * * ? *)",
+            "peringatan": flag,
+        })
+
+    return {
+        "window": f"{format_clock(start)}-{format_clock(end)}",
+        "max_sessions": max_sessions,
+        "slack": slack,
+        "peak_sessions": max(sessions, default=0),
+        "peak_requests_per_menit": round(max(load, default=0), 2),
+        "peringatan": sum(1 for slot in slots if slot["peringatan"]),
+        "slots": sorted(slots, key=lambda slot: (parse_clock(slot["mulai"]) - start) % 1440),
+    }
+
+
+def load_timetable(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def jadwal_untuk(timetable: dict, nip: str) -> str:
+    """Return the start time 'HH:MM' of `nip` in the timetable, or None if it is not listed."""
+    for slot in timetable["slots"]:
+        if slot["nip"] == nip:
+            return slot["mulai"]
+    return None
+
+
+def simulate(timetable: dict, runs: int = 500, variability: float = 0.5, seed: int = 0) -> dict:
+    """
+    Replay the timetable `runs` times with run durations scaled by a random factor between
+    `1 - variability / 2` and `1 + variability`, as runs with retries take longer than planned.
+
+    Returns:
+        dict: The p50/p95/max of the peak concurrent sessions and peak requests per minute,
+        and the share of runs that finish after their deadline.
+    """
+    rnd = random.Random(seed)
+    start, _ = parse_window(timetable["window"])
+    peaks, rates, late, total = [], [], 0, 0
+    for _ in range(runs):
+        events, per_minute = [], {}
+        for slot in timetable["slots"]:
+            mulai = (parse_clock(slot["mulai"]) - start) % 1440
+            durasi = slot["durasi"] * rnd.uniform(1 - variability / 2, 1 + variability) / 60
+            selesai = mulai + durasi
+            events += [(mulai, 1), (selesai, -1)]
+            for m in range(int(mulai), int(selesai) + 1):
+                per_minute[m] = per_minute.get(m, 0) + slot["requests"] / max(durasi, 1)
+            total += 1
+            if selesai > (parse_clock(slot["deadline"]) - start) % 1440:
+                late += 1
+        active = peak = 0
+        for _, delta in sorted(events):
+            active += delta
+            peak = max(peak, active)
+        peaks.append(peak)
+        rates.append(max(per_minute.values(), default=0))
+    peaks.sort()
+    rates.sort()
+    return {
+        "runs": runs,
+        "peak_sessions": {"p50": percentile(peaks, 50), "p95": percentile(peaks, 95), "max": peaks[-1] if peaks else 0},
+        "peak_requests_per_menit": {"p50": round(percentile(rates, 50) or 0, 2),
+                                    "p95": round(percentile(rates, 95) or 0, 2),
+                                    "max": round(rates[-1] if rates else 0, 2)},
+        "max_sessions": timetable.get("max_sessions"),
+        "terlambat": round(late / total, 4) if total else 0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.window", description="Perencana jadwal pengisian jurnal")
+    sub = parser.add_subparsers(dest="name", required=True)
+
+    p = sub.add_parser("plan", help="bagi jadwal mulai setiap pegawai dalam rentang waktu")
+    p.add_argument("--roster", required=True, help="CSV dengan kolom nip, kegiatan, deadline, durasi")
+    p.add_argument("--window", default="00:00-04:00", help="rentang waktu WIB, contoh 23:00-04:00")
+    p.add_argument("--sessions", type=int, default=int(os.getenv("portal_sessions", MAX_SESSIONS)))
+    p.add_argument("--slack", type=float, default=SLACK, help="cadangan waktu percobaan ulang (bagian dari durasi)")
+    p.add_argument("--output", help="file timetable JSON, default stdout")
+
+    p = sub.add_parser("simulate", help="simulasi puncak sesi bersamaan dari timetable")
+    p.add_argument("--timetable", required=True)
+    p.add_argument("--runs", type=int, default=500)
+    p.add_argument("--variability", type=float, default=0.5)
+
+    args = parser.parse_args(argv)
+    if args.name == "plan":
+        window = parse_window(args.window)
+        history = History() if os.path.exists(os.path.join(state_dir(), "history.db")) else None
+        timetable = plan_window(load_roster(args.roster, window, history), window, args.sessions, args.slack)
+        out = open(args.output, "w") if args.output else sys.stdout
+        json.dump(timetable, out, indent=1)
+        if args.output:
+            out.close()
+            print(f"{len(timetable['slots'])} jadwal ditulis ke {args.output}", file=sys.stderr)
+    else:
+        print(json.dumps(simulate(load_timetable(args.timetable), args.runs, args.variability), indent=1))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""Durable local work queue backed by SQLite, with visibility timeouts.
+
+A consumer that takes a job leases it for `visibility` seconds. It must `ack` the job when done
+or `nack` it to retry later. A consumer that crashes simply lets the lease run out, after which
+the job becomes visible to other consumers again. Jobs that fail `max_attempts` times are moved
+to the 'dead' state so they stop being retried but can still be inspected.
+"""
+from time import time
+from uuid import uuid4
+import json
+import logging
+
+from .runstate import connect
+from .state import state_path
+
+queuelog = logging.getLogger(__name__)
+
+# Detik sebuah job tidak terlihat oleh worker lain setelah diambil
+VISIBILITY = 900
+MAX_ATTEMPTS = 3
+
+READY = "ready"
+DONE = "done"
+DEAD = "dead"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    queue TEXT NOT NULL,
+    key TEXT,
+    payload TEXT NOT NULL,
+    state TEXT NOT NULL,
+    visible_at REAL NOT NULL,
+    lease TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    created REAL NOT NULL,
+    updated REAL NOT NULL,
+    UNIQUE (queue, key)
+);
+CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (queue, state, visible_at);
+"""
+
+
+class Job:
+    """
+    A leased job.
+
+    Attributes:
+        id (int): Row id of the job.
+        key (str): Deduplication key given to `put`, e.g. '<nip>-<tanggal>'.
+        payload (dict): The work item.
+        lease (str): Token proving the lease, required to ack or nack.
+        attempts (int): Number of times the job has been taken, this one included.
+    """
+    __slots__ = ("id", "key", "payload", "lease", "attempts")
+
+    def __init__(self, id: int, key: str, payload: dict, lease: str, attempts: int):
+        self.id = id
+        self.key = key
+        self.payload = payload
+        self.lease = lease
+        self.attempts = attempts
+
+    def __repr__(self):
+        return f"Job(id={self.id}, key={self.key!r}, attempts={self.attempts})"
+
+
+class WorkQueue:
+    """
+    SQLite backed queue shared by every process using the same database.
+
+    Parameters:
+        name (str): Name of the queue inside the database.
+        path (str): Location of the database. Defaults to `queue.db` in the state directory.
+        visibility (float): Lease duration in seconds.
+        max_attempts (int): Attempts before a job is moved to 'dead'.
+    """
+
+    def __init__(self, name: str = "jurnal", path: str = None, visibility: float = VISIBILITY,
+                 max_attempts: int = MAX_ATTEMPTS):
+        self.name = name
+        self.path = path or state_path("queue.db")
+        self.visibility = visibility
+        self.max_attempts = max_attempts
+        self.conn = connect(self.path)
+        self.conn.executescript(SCHEMA)
+
+    def put(self, payload: dict, key: str = None, delay: float = 0) -> bool:
+        """
+        Add a job. A job with the same `key` is not added twice.
+
+        Returns:
+            bool: True if the job was added, False if the key was already queued.
+        """
+        now = time()
+        cursor = self.conn.execute(
+            "INSERT OR IGNORE INTO jobs (queue, key, payload, state, visible_at, created, updated) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (self.name, key, json.dumps(payload), READY, now + delay, now, now))
+        return cursor.rowcount == 1
+
+    def get(self, visibility: float = None):
+        """Lease the oldest visible job, or return None when no job is visible."""
+        now = time()
+        lease = uuid4().hex
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = self.conn.execute(
+                "SELECT id, key, payload, attempts FROM jobs WHERE queue = ? AND state = ? AND visible_at <= ? "
+                "ORDER BY visible_at, id LIMIT 1", (self.name, READY, now)).fetchone()
+            if row is None:
+                self.conn.execute("COMMIT")
+                return None
+            id, key, payload, attempts = row
+            self.conn.execute(
+                "UPDATE jobs SET visible_at = ?, lease = ?, attempts = ?, updated = ? WHERE id = ?",
+                (now + (visibility or self.visibility), lease, attempts + 1, now, id))
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        return Job(id, key, json.loads(payload), lease, attempts + 1)
+
+    def extend(self, job: Job, seconds: float = None) -> bool:
+        """Extend the lease of a job that is still being worked on. Returns False if the lease was lost."""
+        cursor = self.conn.execute(
+            "UPDATE jobs SET visible_at = ?, updated = ? WHERE id = ? AND lease = ? AND state = ?",
+            (time() + (seconds or self.visibility), time(), job.id, job.lease, READY))
+        return cursor.rowcount == 1
+
+    def ack(self, job: Job) -> bool:
+        """Mark the job done. Returns False if the lease had expired and was taken by another worker."""
+        cursor = self.conn.execute(
+            "UPDATE jobs SET state = ?, lease = NULL, error = NULL, updated = ? WHERE id = ? AND lease = ?",
+            (DONE, time(), job.id, job.lease))
+        return cursor.rowcount == 1
+
+    def nack(self, job: Job, error: str = None, delay: float = 0) -> bool:
+        """Release the job to be retried after `delay` seconds, or move it to 'dead' after too many attempts."""
+        state = DEAD if job.attempts >= self.max_attempts else READY
+        if state == DEAD:
+            queuelog.error(f"{job} gagal {job.attempts} kali, tidak dicoba lagi: {error}")
+        cursor = self.conn.execute(
+            "UPDATE jobs SET state = ?, visible_at = ?, lease = NULL, error = ?, updated = ? WHERE id = ? AND lease = ?",
+            (state, time() + delay, error, time(), job.id, job.lease))
+        return cursor.rowcount == 1
+
+    def stats(self) -> dict:
+        """Return the number of jobs per state, with leased jobs counted as 'leased'."""
+        now = time()
+        cursor = self.conn.execute(
+            "SELECT CASE WHEN state = ? AND lease IS NOT NULL AND visible_at > ? THEN 'leased' ELSE state END, count(*) "
+            "FROM jobs WHERE queue = ? GROUP BY 1", (READY, now, self.name))
+        return dict(cursor.fetchall())
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,91 @@
+import argparse
+import json
+import sys
+
+from bench import coldstart, commands, fanout, flags, history, logs, parse, replay
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m bench", description="Benchmark jurnal harian bot")
+    sub = parser.add_subparsers(dest="name", required=True)
+
+    p = sub.add_parser("parse", help="microbenchmark parse_jurnal pada sheet besar")
+    p.add_argument("--rows", type=int, default=10000, help="jumlah baris per jenis hari")
+    p.add_argument("--days", type=int, default=4, help="jumlah jenis hari")
+    p.add_argument("--repeat", type=int, default=5)
+
+    p = sub.add_parser("history", help="waktu query laporan pada riwayat pengisian besar")
+    p.add_argument("--employees", type=int, default=200, help="jumlah pegawai")
+    p.add_argument("--years", type=int, default=3, help="lama riwayat dalam tahun")
+    p.add_argument("--repeat", type=int, default=5)
+
+    p = sub.add_parser("fanout", help="throughput orchestrator dengan worker tiruan")
+    p.add_argument("--employees", type=int, default=200)
+    p.add_argument("--workers", default="1,2,4,8,16", help="jumlah worker yang dibandingkan, dipisah koma")
+    p.add_argument("--seconds", type=float, default=0.005, help="durasi tiruan per pegawai")
+    p.add_argument("--fail-rate", type=float, default=0.05)
+
+    p = sub.add_parser("flags", help="matriks flag peluncuran Chrome terhadap portal tiruan")
+    p.add_argument("--runs", type=int, default=3, help="peluncuran per kombinasi flag")
+    p.add_argument("--toggles", default=",".join(flags.TOGGLES), help="flag yang dibandingkan, dipisah koma")
+    p.add_argument("--chrome", help="lokasi binary Chrome, default chrome_binary atau /opt/chrome/chrome")
+    p.add_argument("--chromedriver", help="lokasi chromedriver, default chromedriver atau /opt/chromedriver")
+    p.add_argument("--json", action="store_true", help="cetak JSON, bukan tabel peringkat")
+
+    p = sub.add_parser("commands", help="jumlah perintah WebDriver per fase dan kegiatan, gagal jika melebihi budget")
+    p.add_argument("--entries", type=int, default=3)
+    p.add_argument("--max-login", type=int, default=commands.LOGIN_BUDGET)
+    p.add_argument("--max-entry", type=int, default=commands.ENTRY_BUDGET)
+    p.add_argument("--max-table", type=int, default=commands.TABLE_BUDGET)
+    p.add_argument("--chrome", help="lokasi binary Chrome, default chrome_binary atau /opt/chrome/chrome")
+    p.add_argument("--chromedriver", help="lokasi chromedriver, default chromedriver atau /opt/chromedriver")
+
+    p = sub.add_parser("coldstart", help="waktu impor per modul dan efek samping saat cold start handler")
+    p.add_argument("--handler", default="server", help="modul handler yang diimpor, default server")
+    p.add_argument("--runs", type=int, default=3, help="jumlah interpreter baru yang diukur")
+    p.add_argument("--top", type=int, default=coldstart.TOP, help="jumlah modul terlambat yang ditampilkan")
+    p.add_argument("--compare", help="laporan coldstart sebelumnya (JSON) sebagai pembanding")
+
+    p = sub.add_parser("logs", help="biaya logging di thread pengisi jurnal: sinkron, antrean, level per logger")
+    p.add_argument("--entries", type=int, default=20)
+    p.add_argument("--commands", type=int, default=commands.ENTRY_BUDGET, help="perintah WebDriver per kegiatan")
+
+    p = sub.add_parser("replay", help="putar ulang sesi WebDriver yang direkam (record=1) terhadap portal tiruan")
+    p.add_argument("path", help="file rekaman .jsonl.gz dari folder recordings")
+    p.add_argument("--speed", type=float, default=1.0, help="pengali latensi rekaman, 0 tanpa jeda")
+    p.add_argument("--pages", help="folder untuk menulis HTML setiap halaman yang direkam")
+    p.add_argument("--chrome", help="lokasi binary Chrome, default chrome_binary atau /opt/chrome/chrome")
+    p.add_argument("--chromedriver", help="lokasi chromedriver, default chromedriver atau /opt/chromedriver")
+
+    args = parser.parse_args()
+    if args.name == "parse":
+        result = parse.run(rows=args.rows, days=args.days, repeat=args.repeat)
+    elif args.name == "history":
+        result = history.run(employees=args.employees, years=args.years, repeat=args.repeat)
+    elif args.name == "fanout":
+        result = fanout.run(employees=args.employees, workers=tuple(int(n) for n in args.workers.split(",")),
+                            seconds=args.seconds, fail_rate=args.fail_rate)
+    elif args.name == "flags":
+        result = flags.run(runs=args.runs, toggles=tuple(args.toggles.split(",")), chrome=args.chrome,
+                           chromedriver=args.chromedriver)
+        if not args.json:
+            print(flags.table(result))
+            return
+    elif args.name == "commands":
+        result = commands.run(entries=args.entries, chrome=args.chrome, chromedriver=args.chromedriver,
+                              max_login=args.max_login, max_entry=args.max_entry, max_table=args.max_table)
+    elif args.name == "coldstart":
+        result = coldstart.run(handler=args.handler, runs=args.runs, top=args.top, compare=args.compare)
+    elif args.name == "logs":
+        result = logs.run(entries=args.entries, commands=args.commands)
+    elif args.name == "replay":
+        result = replay.run(args.path, speed=args.speed, pages=args.pages, chrome=args.chrome,
+                            chromedriver=args.chromedriver)
+    print(json.dumps(result, indent=2))
+    if result.get("exceeded"):
+        print(f"Budget perintah terlampaui: {', '.join(result['exceeded'])}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""Replay of a recorded WebDriver session against the stand-in portal.
+
+The commands of a recording (see `app/recorder.py`) are sent again, in order, to a new Chrome
+driver pointed at the stand-in portal: the recorded portal URL is replaced by the one of the
+stand-in and the element ids of the recording by those the replay finds. Each command is made to
+take its recorded latency: a `get` by delaying the first response of the portal, any other command
+by waiting out the difference once it returns. `speed` scales the latencies, 0 replays as fast as
+the stand-in allows. The keys typed were redacted when recording, the placeholder is typed instead
+(the stand-in portal accepts any password).
+
+The report compares the recorded and replayed durations per command type and phase, lists the
+slowest recorded commands and the commands whose outcome differs (e.g. a wait the real portal
+timed out on), so the flow of a slow night can be profiled and optimised offline. `pages` writes
+the recorded HTML of every navigation to a directory.
+"""
+from time import perf_counter, sleep
+import os
+
+from app.recorder import is_ok, load
+from bench.portal import StandInPortal
+
+ELEMENT = "element-6066-11e4-a52e-4f735466cecf"
+# Tidak diputar ulang: sesi dibuat dan ditutup oleh replay sendiri
+SKIPPED = ("newSession", "quit")
+TOP = 10
+
+
+def rewrite(value, ids: dict, portal_url: str, url: str):
+    """Return `value` with the recorded element ids and portal URL replaced by those of the replay."""
+    if isinstance(value, dict):
+        result = {}
+        for key, item in value.items():
+            if key in (ELEMENT, "id") and isinstance(item, str):
+                result[key] = ids.get(item, item)
+            else:
+                result[key] = rewrite(item, ids, portal_url, url)
+        return result
+    if isinstance(value, list):
+        return [rewrite(item, ids, portal_url, url) for item in value]
+    if isinstance(value, str) and portal_url and value.startswith(portal_url):
+        return url + value[len(portal_url):]
+    return value
+
+
+def learn(recorded, replayed, ids: dict):
+    """Map the element ids of a recorded response to those of the replayed one."""
+    if isinstance(recorded, dict) and isinstance(replayed, dict):
+        if ELEMENT in recorded and ELEMENT in replayed:
+            ids[recorded[ELEMENT]] = replayed[ELEMENT]
+            return
+        for key in recorded.keys() & replayed.keys():
+            learn(recorded[key], replayed[key], ids)
+    elif isinstance(recorded, list) and isinstance(replayed, list):
+        for a, b in zip(recorded, replayed):
+            learn(a, b, ids)
+
+
+def replay(driver, records: list, portal_url: str, url: str, portal_delay: list, speed: float = 1.0) -> list:
+    """
+    Send the recorded commands to `driver` and return `(record, seconds, outcome)` per command.
+
+    Parameters:
+        portal_delay (list): One-item list read by the stand-in portal, the delay of its next response.
+    """
+    executor = driver.command_executor
+    ids = {}
+    results = []
+    for record in records:
+        if record["cmd"] in SKIPPED:
+            continue
+        params = rewrite(record["params"], ids, portal_url, url)
+        params["sessionId"] = driver.session_id
+        latency = record["s"] * speed
+        if record["cmd"] == "get":
+            portal_delay[0] = latency
+        started = perf_counter()
+        try:
+            response = executor.execute(record["cmd"], params)
+            outcome = "ok" if is_ok(response) else "error"
+            if outcome == "ok":
+                learn(record.get("value"), response.get("value"), ids)
+        except Exception as e:
+            response, outcome = None, repr(e)[:200]
+        portal_delay[0] = 0
+        elapsed = perf_counter() - started
+        if record["cmd"] != "get" and elapsed < latency:
+            sleep(latency - elapsed)
+        results.append((record, perf_counter() - started, outcome))
+    return results
+
+
+def summarize(results: list) -> dict:
+    """Group the replayed commands per command type and phase and collect the divergences."""
+    groups = {"per_command": {}, "per_phase": {}}
+    divergences = []
+    for record, seconds, outcome in results:
+        for name, key in (("per_command", record["cmd"]), ("per_phase", record.get("phase") or "-")):
+            item = groups[name].setdefault(key, {"count": 0, "recorded": 0.0, "replayed": 0.0})
+            item["count"] += 1
+            item["recorded"] = round(item["recorded"] + record["s"], 4)
+            item["replayed"] = round(item["replayed"] + seconds, 4)
+        recorded = "ok" if "error" not in record and is_ok(record) else "error"
+        if (outcome == "ok") != (recorded == "ok"):
+            divergences.append({"t": record["t"], "cmd": record["cmd"], "phase": record.get("phase"),
+                                "entry": record.get("entry"), "recorded": recorded, "replayed": outcome})
+    slowest = sorted(results, key=lambda item: -item[0]["s"])[:TOP]
+    groups["slowest"] = [{"t": record["t"], "cmd": record["cmd"], "phase": record.get("phase"),
+                          "entry": record.get("entry"), "recorded": record["s"], "replayed": round(seconds, 4)}
+                         for record, seconds, _ in slowest]
+    groups["divergences"] = divergences
+    return groups
+
+
+def run(path: str, speed: float = 1.0, pages: str = None, chrome: str = None, chromedriver: str = None) -> dict:
+    """Replay the recording at `path` once.
+
+    Returns:
+        dict: The header of the recording, the total `recorded` and `replayed` seconds, the
+        summary of `summarize` and, with `pages`, the files the recorded HTML was written to.
+    """
+    if chrome:
+        os.environ["chrome_binary"] = chrome
+    if chromedriver:
+        os.environ["chromedriver"] = chromedriver
+    header, records, recorded_pages = load(path)
+    result = {"recording": header}
+    if pages:
+        os.makedirs(pages, exist_ok=True)
+        result["pages"] = []
+        for key, html in recorded_pages.items():
+            with open(os.path.join(pages, f"{key}.html"), "w", encoding="utf-8") as f:
+                f.write(html)
+            result["pages"].append(f.name)
+
+    from app.bot import BOT
+
+    portal_delay = [0]
+
+    def delay(method, path):
+        # HANYA RESPON PERTAMA SETELAH `get` YANG DITUNDA
+        seconds, portal_delay[0] = portal_delay[0], 0
+        return seconds
+
+    with StandInPortal(delay=delay) as portal:
+        bot = BOT(server="lambda")
+        bot.perekam.enabled = False
+        try:
+            bot.launch()
+            started = perf_counter()
+            results = replay(bot.driver, records, header.get("portal_url"), portal.url, portal_delay, speed)
+            result["replayed"] = round(perf_counter() - started, 3)
+        finally:
+            bot.close()
+    result["recorded"] = round(sum(record["s"] for record in records if record["cmd"] not in SKIPPED), 3)
+    result.update(summarize(results))
+    return result
@@ -0,0 +1,60 @@
+"""Chrome launch arguments for the Lambda runtime.
+
+The Lambda function has 512 MB for Python, chromedriver and Chrome together. Besides the arguments
+needed to run headless in the Lambda sandbox, the 'low' memory profile (the default) caps the V8
+heap and the renderer processes, and disables background features and images the journal pages do
+not need. The profile is chosen with the `chrome_profile` environment variable ('low' or 'default'),
+and the limits are tuned with `chrome_js_heap` (MB) and `chrome_renderer_limit`.
+"""
+import os
+
+# Argumen wajib agar Chrome berjalan di sandbox AWS Lambda
+BASE_ARGUMENTS = [
+    "--headless=new",
+    "--no-sandbox",
+    "--disable-gpu",
+    "--window-size=1280x1696",
+    "--single-process",
+    "--disable-dev-shm-usage",
+    "--disable-dev-tools",
+    "--no-zygote",
+    "--remote-debugging-port=9222",
+    "--incognito",
+]
+
+# Fitur latar belakang yang tidak dibutuhkan halaman jurnal
+LOW_MEMORY_ARGUMENTS = [
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-extensions",
+    "--disable-sync",
+    "--disable-client-side-phishing-detection",
+    "--disable-features=Translate,BackForwardCache,MediaRouter,OptimizationHints,AutofillServerCommunication",
+    "--no-first-run",
+    "--mute-audio",
+    "--disk-cache-size=1048576",
+    "--blink-settings=imagesEnabled=false",
+]
+
+JS_HEAP = 128
+RENDERER_LIMIT = 1
+
+
+def chrome_arguments(profile: str = None, js_heap: int = None, renderer_limit: int = None) -> list:
+    """
+    Return the Chrome command line arguments of a memory profile.
+
+    Parameters:
+        profile (str): 'low' or 'default'. Defaults to `chrome_profile`, else 'low'.
+        js_heap (int): Maximum V8 old space in MB. Defaults to `chrome_js_heap`, else `JS_HEAP`.
+        renderer_limit (int): Maximum renderer processes. Defaults to `chrome_renderer_limit`, else `RENDERER_LIMIT`.
+    """
+    profile = profile or os.getenv("chrome_profile", "low")
+    arguments = list(BASE_ARGUMENTS)
+    if profile == "low":
+        js_heap = js_heap or int(os.getenv("chrome_js_heap", JS_HEAP))
+        renderer_limit = renderer_limit or int(os.getenv("chrome_renderer_limit", RENDERER_LIMIT))
+        arguments += LOW_MEMORY_ARGUMENTS
+        arguments += [f"--js-flags=--max-old-space-size={js_heap}", f"--renderer-process-limit={renderer_limit}"]
+    return arguments
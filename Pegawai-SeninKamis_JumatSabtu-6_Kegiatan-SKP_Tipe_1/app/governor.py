@@ -0,0 +1,215 @@
+"""Traffic governor for the SIMPEG portal, shared by every worker using the same state directory.
+
+When many employees are processed in parallel, the governor keeps the portal (and our office IP)
+safe with three limits whose state lives in a small SQLite database, so they hold across threads
+and processes alike:
+
+- a token bucket limiting the rate of portal requests (page loads and form submissions),
+- a cap on the number of concurrent portal sessions (browsers logged in at the same time),
+- a circuit breaker: after `failure_threshold` consecutive portal failures every worker pauses
+  for `cooldown` seconds before trying again. Only failures of the portal itself count (failed
+  logins, connection errors, 5xx pages, see `is_portal_error`), an entry rejected for its own
+  data is retried without opening the circuit for every other employee.
+
+Every wait is returned to the caller, so time spent queueing is reported apart from the
+latency of the portal itself. Limits are configured with the `portal_rate`, `portal_burst`,
+`portal_sessions` and `portal_cooldown` environment variables. On AWS Lambda the state directory
+must be on EFS for the limits to be shared between containers.
+"""
+from contextlib import contextmanager
+from time import sleep, time
+import logging
+import os
+
+from .deadline import DeadlineExceeded
+from .runstate import connect
+from .state import state_path
+
+governorlog = logging.getLogger(__name__)
+
+# Default: 1 permintaan/detik dengan burst 5, maksimal 4 sesi login bersamaan
+RATE = 1.0
+BURST = 5
+MAX_SESSIONS = 4
+FAILURE_THRESHOLD = 5
+COOLDOWN = 60
+# Sesi yang tidak memberi kabar selama ini dianggap mati (proses crash)
+SESSION_TTL = 900
+# Jeda maksimum antar pengecekan ketika menunggu
+POLL = 1.0
+# Pesan error atau judul halaman ketika portal tidak dapat dihubungi atau membalas 5xx
+PORTAL_ERRORS = ("net::ERR_", "Timed out receiving message from renderer", "500 Internal Server Error",
+                 "502 Bad Gateway", "503 Service", "504 Gateway")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS bucket (id INTEGER PRIMARY KEY CHECK (id = 0), tokens REAL NOT NULL, updated REAL NOT NULL);
+CREATE TABLE IF NOT EXISTS sessions (id TEXT PRIMARY KEY, pid INTEGER, heartbeat REAL NOT NULL);
+CREATE TABLE IF NOT EXISTS circuit (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    state TEXT NOT NULL,
+    failures INTEGER NOT NULL,
+    opened_at REAL
+);
+"""
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class PortalBusy(DeadlineExceeded):
+    """Raised when waiting for the governor would not fit in the remaining time budget."""
+
+
+def is_portal_error(*texts) -> bool:
+    """Return True if an error message or page title shows the portal failing rather than the data sent to it."""
+    return any(marker in text for text in texts if text for marker in PORTAL_ERRORS)
+
+
+class Governor:
+    """
+    Shared token bucket, session cap and circuit breaker for portal traffic.
+
+    Parameters:
+        path (str): Location of the database. Defaults to `governor.db` in the state directory.
+        rate (float): Portal requests per second refilled into the bucket.
+        burst (int): Size of the bucket.
+        max_sessions (int): Maximum number of concurrent portal sessions.
+        failure_threshold (int): Consecutive failures that open the circuit.
+        cooldown (float): Seconds the circuit stays open before a probe request is allowed.
+    """
+
+    def __init__(self, path: str = None, rate: float = None, burst: int = None, max_sessions: int = None,
+                 failure_threshold: int = FAILURE_THRESHOLD, cooldown: float = None):
+        self.path = path or state_path("governor.db")
+        self.rate = rate if rate is not None else float(os.getenv("portal_rate", RATE))
+        self.burst = burst if burst is not None else int(os.getenv("portal_burst", BURST))
+        self.max_sessions = max_sessions if max_sessions is not None else int(os.getenv("portal_sessions", MAX_SESSIONS))
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown if cooldown is not None else float(os.getenv("portal_cooldown", COOLDOWN))
+        self.conn = connect(self.path)
+        self.conn.executescript(SCHEMA)
+        now = time()
+        self.conn.execute("INSERT OR IGNORE INTO bucket VALUES (0, ?, ?)", (self.burst, now))
+        self.conn.execute("INSERT OR IGNORE INTO circuit VALUES (0, ?, 0, NULL)", (CLOSED,))
+
+    @contextmanager
+    def transaction(self):
+        """Exclusive write transaction, serialized across processes by SQLite's file lock."""
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield self.conn
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+
+    def _try_request(self) -> float:
+        """Take a token if the circuit allows it. Returns 0 on success, else the seconds to wait."""
+        now = time()
+        with self.transaction() as conn:
+            state, opened_at = conn.execute("SELECT state, opened_at FROM circuit").fetchone()
+            if state != CLOSED:
+                # OPEN: TUNGGU COOLDOWN, HALF_OPEN: TUNGGU HASIL PERMINTAAN PERCOBAAN
+                if now < opened_at + self.cooldown:
+                    return opened_at + self.cooldown - now
+                # SATU PERMINTAAN PERCOBAAN SETELAH COOLDOWN
+                conn.execute("UPDATE circuit SET state = ?, opened_at = ?", (HALF_OPEN, now))
+            if self.rate <= 0:
+                return 0
+            tokens, updated = conn.execute("SELECT tokens, updated FROM bucket").fetchone()
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            if tokens >= 1:
+                conn.execute("UPDATE bucket SET tokens = ?, updated = ?", (tokens - 1, now))
+                return 0
+            conn.execute("UPDATE bucket SET tokens = ?, updated = ?", (tokens, now))
+            return (1 - tokens) / self.rate
+
+    def _wait(self, attempt, timeout: float, what: str) -> float:
+        """Call `attempt` until it returns 0, sleeping as it asks. Returns the seconds waited."""
+        started = time()
+        while True:
+            delay = attempt()
+            waited = time() - started
+            if delay <= 0:
+                return waited
+            if timeout is not None and waited + delay > timeout:
+                raise PortalBusy(f"Menunggu {what} lebih dari sisa waktu {timeout:.0f} detik")
+            sleep(min(delay, POLL))
+
+    def request(self, timeout: float = None) -> float:
+        """
+        Wait until the circuit is not open and a token is available, then take it.
+
+        Parameters:
+            timeout (float): Maximum seconds to wait, None waits as long as needed.
+
+        Returns:
+            float: Seconds spent queueing.
+
+        Raises:
+            PortalBusy: If the wait would take longer than `timeout`.
+        """
+        return self._wait(self._try_request, timeout, "giliran akses portal")
+
+    def success(self):
+        """Record a successful portal interaction, closing the circuit."""
+        self.conn.execute("UPDATE circuit SET state = ?, failures = 0, opened_at = NULL WHERE state != ? OR failures != 0",
+                          (CLOSED, CLOSED))
+
+    def failure(self):
+        """Record a failed portal interaction, opening the circuit after too many in a row."""
+        with self.transaction() as conn:
+            state, failures = conn.execute("SELECT state, failures FROM circuit").fetchone()
+            failures += 1
+            if state == HALF_OPEN or failures >= self.failure_threshold:
+                if state != OPEN:
+                    governorlog.warning(f"Portal gagal {failures} kali berturut-turut, akses dihentikan {self.cooldown:.0f} detik")
+                conn.execute("UPDATE circuit SET state = ?, failures = ?, opened_at = ?", (OPEN, failures, time()))
+            else:
+                conn.execute("UPDATE circuit SET failures = ?", (failures,))
+
+    def _try_session(self, session_id: str) -> float:
+        now = time()
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM sessions WHERE heartbeat < ?", (now - SESSION_TTL,))
+            active = conn.execute("SELECT count(*) FROM sessions WHERE id != ?", (session_id,)).fetchone()[0]
+            if active >= self.max_sessions:
+                return POLL
+            conn.execute("INSERT OR REPLACE INTO sessions VALUES (?, ?, ?)", (session_id, os.getpid(), now))
+            return 0
+
+    def acquire_session(self, session_id: str, timeout: float = None) -> float:
+        """
+        Wait for a free session slot and register `session_id` in it.
+
+        Returns:
+            float: Seconds spent queueing.
+
+        Raises:
+            PortalBusy: If no slot frees up within `timeout`.
+        """
+        return self._wait(lambda: self._try_session(session_id), timeout, "slot sesi portal")
+
+    def heartbeat(self, session_id: str):
+        """Keep a long running session from being expired as dead."""
+        self.conn.execute("UPDATE sessions SET heartbeat = ? WHERE id = ?", (time(), session_id))
+
+    def release_session(self, session_id: str):
+        self.conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+
+    def status(self) -> dict:
+        """Return the shared state: tokens left, active sessions and circuit."""
+        tokens, updated = self.conn.execute("SELECT tokens, updated FROM bucket").fetchone()
+        state, failures, opened_at = self.conn.execute("SELECT state, failures, opened_at FROM circuit").fetchone()
+        sessions = self.conn.execute("SELECT count(*) FROM sessions").fetchone()[0]
+        return {
+            "tokens": round(min(self.burst, tokens + (time() - updated) * self.rate), 2),
+            "sessions": sessions,
+            "max_sessions": self.max_sessions,
+            "circuit": state,
+            "failures": failures,
+        }
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,9 @@
+"""Sheet layout of this variant: Senin-Kamis and Jumat-Sabtu, 6 kegiatan each."""
+from .jurnal import DayLayout, SheetLayout
+
+LAYOUT = SheetLayout(
+    days=(
+        DayLayout("senin-kamis", rows=6),
+        DayLayout("jumat-sabtu", rows=6),
+    ),
+)
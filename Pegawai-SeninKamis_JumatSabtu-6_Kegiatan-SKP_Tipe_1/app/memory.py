@@ -0,0 +1,100 @@
+"""RSS sampler of the browser processes.
+
+A background thread sums the resident memory of chromedriver and every process below it (Chrome
+and its helpers) from /proc and keeps the peak of each run phase. Shared pages are counted once per
+process, so the value is an upper bound of what the kernel charges to the Lambda container.
+
+When the sum goes over `limit` (the `chrome_rss_limit` environment variable, MB, 0 disables it)
+`over_limit` is set. The bot checks it between journal entries and restarts the browser in a
+controlled way, instead of letting the kernel kill Chrome (or the whole function) in the middle of
+an entry. Where /proc or a local chromedriver is missing, e.g. with the Selenium Grid, nothing is sampled.
+"""
+from threading import Event, Thread
+import logging
+import os
+
+from .watchdog import descendants
+
+memorylog = logging.getLogger(__name__)
+
+# Batas RSS browser (MB) pada Lambda 512 MB, menyisakan ruang untuk Python
+RSS_LIMIT = 400
+INTERVAL = 0.5
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+MB = 1024 * 1024
+
+
+def rss(pid: int) -> int:
+    """Return the resident memory of `pid` in bytes, 0 if it is gone."""
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return 0
+
+
+def tree_rss(pid: int) -> int:
+    """Return the resident memory of `pid` and all its descendants in bytes."""
+    return sum(rss(p) for p in [pid] + descendants(pid))
+
+
+class MemorySampler:
+    """
+    Samples the RSS of a process tree in a background thread.
+
+    Parameters:
+        phase (callable): Returns the name of the current phase, used to group the peaks.
+        limit (float): Alert threshold in MB. Defaults to `chrome_rss_limit`.
+        interval (float): Seconds between samples.
+    """
+
+    def __init__(self, phase=None, limit: float = None, interval: float = INTERVAL):
+        self.phase = phase or (lambda: None)
+        self.limit = limit if limit is not None else float(os.getenv("chrome_rss_limit", RSS_LIMIT))
+        self.interval = interval
+        self.pid = None
+        self.peaks = {}
+        self.over_limit = False
+        self.stopped = Event()
+        self.thread = None
+
+    def attach(self, pid: int):
+        """Start sampling the tree of `pid`, e.g. the chromedriver process."""
+        self.pid = pid
+        self.over_limit = False
+        if self.thread is None:
+            self.thread = Thread(target=self._run, name="memory", daemon=True)
+            self.thread.start()
+
+    def detach(self):
+        self.pid = None
+        self.over_limit = False
+
+    def sample(self) -> int:
+        """Take one sample now, record it in the peaks and return it in bytes."""
+        pid = self.pid
+        if pid is None:
+            return 0
+        value = tree_rss(pid)
+        name = self.phase() or "-"
+        if value > self.peaks.get(name, 0):
+            self.peaks[name] = value
+        if self.limit > 0 and value > self.limit * MB and not self.over_limit:
+            memorylog.warning(f"RSS browser {value / MB:.0f} MB melebihi batas {self.limit:.0f} MB")
+            self.over_limit = True
+        return value
+
+    def _run(self):
+        while not self.stopped.wait(self.interval):
+            try:
+                self.sample()
+            except Exception as e:
+                memorylog.debug(f"Sampel memori gagal {repr(e)}")
+
+    def take_peaks(self) -> dict:
+        """Return the peak RSS per phase in MB since the last call and start over."""
+        peaks, self.peaks = self.peaks, {}
+        return {name: round(value / MB, 1) for name, value in peaks.items()}
+
+    def stop(self):
+        self.stopped.set()
@@ -0,0 +1,125 @@
+"""Python-side memory snapshots per run phase.
+
+The browser gets whatever the Python process leaves of the 512 MB of the Lambda container, and
+the imports (selenium, gspread, google-auth, holidays) plus the parsed sheet are most of it. With
+the `memtrace` environment variable set to a number of traced frames, `tracemalloc` is
+started when the `app` package is imported and a snapshot is taken at every phase boundary:
+import, driver launch, sheet fetch, login, each journal entry and teardown.
+
+Each snapshot records the traced memory, its peak since the previous snapshot, the delta and the
+allocation sites that grew the most, plus the largest sites overall; they are attached to the
+run report as `allocations`. With 1 frame the import record only shows `importlib`, around 10
+frames charge it to the `import` statements instead. `memtrace` has to be set in the environment
+of the process (the `.env` file is read after the package is imported); tracing slows Python
+down, so it is meant for diagnostic runs only.
+"""
+import logging
+import os
+import tracemalloc
+
+memtracelog = logging.getLogger(__name__)
+
+TOP = 10
+KB = 1024
+MB = 1024 * 1024
+
+# Snapshot impor diambil sekali per proses, dilaporkan oleh run pertama
+_imported = None
+
+
+def start():
+    """Start tracing if the `memtrace` environment variable asks for it, before the heavy imports."""
+    frames = int(os.getenv("memtrace") or 0)
+    if frames > 0 and not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+
+
+def site(traceback) -> str:
+    """Return the innermost frame of `traceback` outside the import machinery as 'file:line'.
+
+    Code objects and module globals are allocated by `importlib`; with more than one frame traced
+    they are charged to the `import` statement that loaded the module instead.
+    """
+    for frame in reversed(traceback):
+        if not frame.filename.startswith("<frozen"):
+            return f"{frame.filename}:{frame.lineno}"
+    frame = traceback[-1]
+    return f"{frame.filename}:{frame.lineno}"
+
+
+def by_site(snapshot) -> dict:
+    """Return 'file:line' to `[bytes, blocks]` of every trace of `snapshot`."""
+    sites = {}
+    for trace in snapshot.traces:
+        item = sites.setdefault(site(trace.traceback), [0, 0])
+        item[0] += trace.size
+        item[1] += 1
+    return sites
+
+
+class MemoryTracer:
+    """
+    Takes tracemalloc snapshots at the phase boundaries of a run.
+
+    Parameters:
+        top (int): Number of allocation sites kept per snapshot, defaults to `memtrace_top` or 10.
+    """
+
+    def __init__(self, top: int = None):
+        global _imported
+        self.top = top or int(os.getenv("memtrace_top", TOP))
+        self.records = []
+        self.previous = None
+        if self.enabled and _imported is None:
+            # SEMUA YANG DIALOKASIKAN SEJAK start(): IMPOR MODUL DAN INISIALISASI
+            _imported = self.snapshot("import")
+
+    @property
+    def enabled(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def _take(self):
+        snapshot = tracemalloc.take_snapshot()
+        # ALOKASI PENCATAT SENDIRI TIDAK DIHITUNG
+        return snapshot.filter_traces((tracemalloc.Filter(False, tracemalloc.__file__),
+                                       tracemalloc.Filter(False, __file__, all_frames=True)))
+
+    def snapshot(self, label: str):
+        """
+        Record the memory at the end of the phase `label` and return the record, None when not tracing.
+
+        Returns:
+            dict: `label`, `current_mb`, `peak_mb` (since the previous snapshot), `delta_mb`,
+            `grown` (sites with the largest growth) and `top` (largest sites).
+        """
+        if not self.enabled:
+            return None
+        current, peak = tracemalloc.get_traced_memory()
+        sites = by_site(self._take())
+        record = {"label": label, "current_mb": round(current / MB, 2), "peak_mb": round(peak / MB, 2)}
+        if self.previous is None:
+            record["delta_mb"] = record["current_mb"]
+            record["grown"] = []
+        else:
+            before, total = self.previous
+            record["delta_mb"] = round((current - total) / MB, 2)
+            grown = sorted(((name, size - before.get(name, [0])[0]) for name, (size, _) in sites.items()),
+                           key=lambda item: -item[1])
+            record["grown"] = [{"site": name, "diff_kb": round(diff / KB, 1), "kb": round(sites[name][0] / KB, 1)}
+                               for name, diff in grown[:self.top] if diff > 0]
+        largest = sorted(sites.items(), key=lambda item: -item[1][0])[:self.top]
+        record["top"] = [{"site": name, "kb": round(size / KB, 1), "count": count} for name, (size, count) in largest]
+        self.previous = (sites, current)
+        tracemalloc.reset_peak()
+        self.records.append(record)
+
+        biggest = record["grown"] or record["top"]
+        memtracelog.info(f"Memori python setelah {label}: {record['current_mb']:.1f}MB ({record['delta_mb']:+.1f}MB, "
+                         f"puncak {record['peak_mb']:.1f}MB)"
+                         + (f", terbesar {biggest[0]['site']}" if biggest else ""))
+        return record
+
+    def take_records(self) -> list:
+        """Return the records since the last call and start a new list."""
+        records, self.records = self.records, []
+        return records
@@ -0,0 +1,240 @@
+"""Fan-out orchestrator: shards a roster across worker invocations.
+
+A single Lambda (512 MB, 5 minutes) cannot fill the journals of a large roster one after the other.
+The orchestrator assigns each NIP to a shard by a stable hash and dispatches every shard to a worker
+invocation in parallel. It collects the status of every employee and re-shards the failed ones
+(with a different hash salt, so they land on other workers) for up to `rounds` rounds, as long as
+its own deadline still covers a round.
+
+Only employees for whom nothing was sent to the portal (login failed or never started) are
+re-sharded by default. The run state and plan cache that keep an employee from being submitted
+twice live in the `state_dir` of the worker; after a timeout, watchdog, crash or failed entry they
+only protect the employee on another worker when `state_dir` is shared (e.g. on EFS), so those
+statuses are re-sharded only with `shared_state`.
+
+Workers are called through an invoker, any callable taking the payload `{"shard": i, "nips": [...]}`
+and returning the worker's result:
+
+- `LambdaInvoker` invokes the worker Lambda function synchronously (`server.worker_task`),
+- `LocalInvoker` calls a handler in-process, which lets the orchestrator be run and tested locally.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+import hashlib
+import json
+import logging
+import os
+
+orchestratorlog = logging.getLogger(__name__)
+
+# Status yang dibagi ulang ke worker lain jika belum ada kegiatan yang dikirim ke portal
+SAFE_RETRY_STATUSES = ("login_gagal", "tidak_diproses")
+# Status yang mungkin sudah mengirim kegiatan, dibagi ulang hanya jika state_dir dipakai bersama
+RETRY_STATUSES = ("timeout", "gagal", "login_gagal", "watchdog", "crash", "tidak_diproses", "error")
+ROUNDS = 3
+# Perkiraan waktu minimum satu pegawai (detik), pegawai berikutnya tidak dimulai jika sisa waktu kurang
+EMPLOYEE_BUDGET = 90
+# Timeout maksimum fungsi AWS Lambda dan jeda tambahan untuk membaca respon worker
+WORKER_TIMEOUT = 900
+READ_MARGIN = 30
+
+
+class InvocationError(Exception):
+    """Raised by an invoker when the worker invocation itself failed."""
+
+
+def shard_of(nip: str, shards: int, salt: int = 0) -> int:
+    """
+    Return the shard of `nip`, stable across processes and runs (unlike the builtin `hash`).
+
+    Example:
+        >>> shard_of("199001012020121001", 4) == shard_of("199001012020121001", 4)
+        True
+    """
+    digest = hashlib.sha256(f"{salt}:{nip}".encode()).digest()
+    return int.from_bytes(digest[:8], "big") % shards
+
+
+def shared_state_dir() -> bool:
+    """Return True if `state_dir` is set outside `/tmp`, i.e. a durable directory shared by workers and retries."""
+    path = os.getenv("state_dir")
+    return bool(path) and not os.path.abspath(path).startswith("/tmp")
+
+
+def partition(nips: list, shards: int, salt: int = 0) -> list:
+    """Split `nips` into `shards` lists by `shard_of`, dropping empty shards."""
+    buckets = [[] for _ in range(shards)]
+    for nip in nips:
+        buckets[shard_of(nip, shards, salt)].append(nip)
+    return [bucket for bucket in buckets if bucket]
+
+
+class LocalInvoker:
+    """Invoker calling `handler(payload, None)` in-process, e.g. `server.worker_task` or a stub."""
+
+    def __init__(self, handler):
+        self.handler = handler
+
+    def __call__(self, payload: dict) -> dict:
+        return self.handler(payload, None)
+
+
+class LambdaInvoker:
+    """
+    Invoker calling the worker Lambda function `function_name` synchronously.
+
+    The response is read for up to `timeout` plus a margin and the invocation is never retried by
+    the client: a retried invocation would run the same shard twice in parallel.
+
+    Parameters:
+        timeout (float): Timeout of the worker function in seconds. Defaults to `worker_timeout`, else 900.
+    """
+
+    def __init__(self, function_name: str, client=None, timeout: float = None):
+        self.timeout = timeout or float(os.getenv("worker_timeout", WORKER_TIMEOUT))
+        if client is None:
+            import boto3  # tersedia pada runtime AWS Lambda
+            from botocore.config import Config
+
+            client = boto3.client("lambda", config=Config(read_timeout=self.timeout + READ_MARGIN,
+                                                          retries={"max_attempts": 0}))
+        self.client = client
+        self.function_name = function_name
+
+    def __call__(self, payload: dict) -> dict:
+        response = self.client.invoke(FunctionName=self.function_name, InvocationType="RequestResponse",
+                                      Payload=json.dumps(payload).encode())
+        body = json.loads(response["Payload"].read() or b"null")
+        if response.get("FunctionError"):
+            raise InvocationError(f"{response['FunctionError']}: {body}")
+        return body
+
+
+def run_shard(bot, nips: list, deadline) -> dict:
+    """
+    Worker side: fill the journal of every NIP of a shard with one BOT, one after the other.
+
+    Employees that no longer fit in the remaining budget are reported as 'tidak_diproses' so the
+    orchestrator can re-shard them.
+
+    Returns:
+        dict: `{"results": {nip: status}, "started": [nip, ...]}`, `started` being the employees
+        with at least one entry sent to the portal.
+    """
+    from .pipeline import kredensial
+
+    results = {}
+    started = []
+    # BROWSER TETAP TERBUKA ANTAR PEGAWAI DALAM SATU SHARD
+    bot.keep_browser = True
+    try:
+        for nip in nips:
+            password = kredensial(nip)
+            if password is None:
+                results[nip] = "tanpa_password"
+                continue
+            if not deadline.allows(EMPLOYEE_BUDGET):
+                results[nip] = "tidak_diproses"
+                continue
+            bot.ganti_pegawai(nip, password)
+            try:
+                report = bot.start(deadline=deadline)
+                results[nip] = report.status
+                if report.counters.get("started"):
+                    started.append(nip)
+            except Exception as e:
+                orchestratorlog.error(f"Pengisian {nip} gagal {repr(e)}")
+                results[nip] = "error"
+                started.append(nip)
+    finally:
+        bot.keep_browser = False
+        bot.close()
+    return {"results": results, "started": started}
+
+
+class Orchestrator:
+    """
+    Dispatches shards of a roster to workers in parallel and re-shards failures.
+
+    Parameters:
+        invoker (callable): Called with each shard payload, returns the worker's result.
+        shards (int): Number of shards.
+        rounds (int): Maximum number of dispatch rounds, the first one included.
+        workers (int): Shards invoked at the same time. Defaults to `shards`.
+        shared_state (bool): Whether the workers share `state_dir`. Defaults to `shared_state_dir()`.
+        round_budget (float): Seconds one round can take. Defaults to the `timeout` of the invoker, else `EMPLOYEE_BUDGET`.
+    """
+
+    def __init__(self, invoker, shards: int = 4, rounds: int = ROUNDS, workers: int = None,
+                 shared_state: bool = None, round_budget: float = None):
+        self.invoker = invoker
+        self.shards = shards
+        self.rounds = rounds
+        self.workers = workers or shards
+        self.shared_state = shared_state if shared_state is not None else shared_state_dir()
+        self.round_budget = round_budget or getattr(invoker, "timeout", EMPLOYEE_BUDGET)
+
+    def dispatch(self, shard: int, nips: list) -> tuple:
+        """
+        Invoke one shard and return `({nip: status}, started)`.
+
+        If the invocation fails every NIP is marked 'error' and counted as started, since the worker
+        may have submitted entries before failing.
+        """
+        try:
+            result = self.invoker({"shard": shard, "nips": nips}) or {}
+            results, started = result.get("results", {}), set(result.get("started", []))
+        except Exception as e:
+            orchestratorlog.error(f"Shard {shard} gagal dijalankan {repr(e)}")
+            results, started = {}, set(nips)
+        return {nip: results.get(nip, "error") for nip in nips}, started
+
+    def retryable(self, status: str, started: bool) -> bool:
+        """Return True if an employee with `status` can be re-sharded to another worker."""
+        if self.shared_state:
+            return status in RETRY_STATUSES
+        return status in SAFE_RETRY_STATUSES and not started
+
+    def run(self, nips: list, deadline=None) -> dict:
+        """
+        Process the roster, re-sharding failed employees between rounds.
+
+        Parameters:
+            deadline (Deadline): Deadline of the orchestrator itself; a round is only started if it
+                still allows `round_budget`. Unlimited by default.
+
+        Returns:
+            dict: Final `results` per NIP, `rounds` used, the `failed` NIPs and the wall time `durasi`.
+        """
+        started = perf_counter()
+        results = {}
+        submitted = set()
+        pending = list(dict.fromkeys(nips))
+        rounds = 0
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            while pending and rounds < self.rounds:
+                if deadline is not None and not deadline.allows(self.round_budget):
+                    orchestratorlog.warning(f"Sisa waktu orchestrator tidak cukup untuk putaran {rounds + 1}, "
+                                            f"{len(pending)} pegawai tidak diproses")
+                    for nip in pending:
+                        results.setdefault(nip, "tidak_diproses")
+                    break
+                # SALT BERBEDA SETIAP PUTARAN AGAR PEGAWAI YANG GAGAL PINDAH KE WORKER LAIN
+                shards = partition(pending, self.shards, salt=rounds)
+                orchestratorlog.info(f"Putaran {rounds + 1}: {len(pending)} pegawai dalam {len(shards)} shard")
+                for shard_results, shard_started in pool.map(self.dispatch, range(len(shards)), shards):
+                    results.update(shard_results)
+                    submitted |= shard_started
+                rounds += 1
+                failed = [nip for nip in pending if results[nip] in RETRY_STATUSES]
+                pending = [nip for nip in failed if self.retryable(results[nip], nip in submitted)]
+                if len(pending) < len(failed):
+                    orchestratorlog.warning(f"{len(failed) - len(pending)} pegawai mungkin sudah mengirim kegiatan "
+                                            "dan tidak dibagi ulang tanpa state_dir bersama")
+            pending = [nip for nip in results if results[nip] in RETRY_STATUSES]
+        return {
+            "results": results,
+            "rounds": rounds,
+            "failed": pending,
+            "durasi": round(perf_counter() - started, 3),
+        }
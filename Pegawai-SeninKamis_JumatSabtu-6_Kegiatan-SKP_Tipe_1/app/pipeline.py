@@ -0,0 +1,189 @@
+"""Plan/submit pipeline: a cheap planner stage and browser-equipped submitter workers.
+
+The planner stage reads the sheet once, evaluates the calendar and compiles and validates the plan
+of every employee. It never launches Chrome. Each valid plan becomes a work item in the durable
+local queue (`app/workqueue.py`). Submitter workers lease items from the queue and run
+`BOT.start(plan=...)`. A worker keeps its browser open between items and only logs in again, so
+submitters can be scaled independently of planning.
+
+The password of each employee is read from the `password_<nip>` environment variable, or from
+`password` for the employee configured in `nip`. Passwords are never written to the queue.
+
+Usage:
+    python -m app.pipeline plan --nip 199001012020121001 --nip 199102022021011002
+    python -m app.pipeline plan --roster roster.csv
+    python -m app.pipeline submit --workers 2 --server local
+    python -m app.pipeline stats
+"""
+from datetime import datetime
+from multiprocessing import Process
+from time import sleep
+import argparse
+import csv
+import json
+import logging
+import os
+
+from .bot import BOT
+from .deadline import Deadline, DEFAULT_MARGIN
+from .logs import setup_logging, flush_logs
+from .planner import DayPlan
+from .report import RunReport
+from .validation import has_errors
+from .workqueue import WorkQueue
+
+pipelinelog = logging.getLogger(__name__)
+
+# Status run yang dicoba ulang oleh worker lain / percobaan berikutnya
+RETRY_STATUSES = ("timeout", "gagal", "login_gagal", "watchdog", "crash")
+RETRY_DELAY = 120
+# Jeda pengecekan antrean ketika kosong
+POLL = 5
+
+
+def kredensial(nip: str):
+    """Return the password of `nip` from the environment, or None if it is not configured."""
+    password = os.getenv(f"password_{nip}")
+    if password is None and nip == os.getenv("nip"):
+        password = os.getenv("password")
+    return password
+
+
+def rencanakan(bot: BOT, nips: list, queue: WorkQueue) -> dict:
+    """
+    Planner stage: compile today's plan of every employee in `nips` and enqueue the valid ones.
+
+    The sheet is read and the calendar evaluated once for all employees. Plans already compiled
+    today are taken from the plan cache, and an employee already queued today is not queued twice.
+    A plan with an SKP label missing from the cached catalog is queued but not cached, the worker
+    resolves it after login (see `BOT.start`).
+
+    Returns:
+        dict: Counts of queued and already queued employees and the NIPs with an invalid plan.
+    """
+    bot.date = datetime.now(bot.tz).date()
+    bot.report = RunReport()
+    result = {"antre": 0, "sudah_antre": 0, "tidak_valid": []}
+
+    with bot.report.phase("sheet"):
+        jurnal = bot.get_jurnal()
+    hari = bot.jenis_hari()
+    if hari is None:
+        pipelinelog.info("HARI INI LIBUR")
+        result["libur"] = True
+        return result
+
+    for nip in nips:
+        plan = bot.plan_cache.load(nip, bot.date)
+        if plan is None:
+            plan, catalog, issues = bot.susun_rencana(jurnal, hari, nip)
+            if has_errors(issues):
+                errors = "; ".join(str(issue) for issue in issues if issue.level == "error")
+                pipelinelog.error(f"Rencana {nip} tidak valid, tidak diantrekan: {errors}")
+                result["tidak_valid"].append(nip)
+                continue
+            if plan.resolved:
+                bot.plan_cache.save(plan)
+        if queue.put({"plan": plan.to_dict()}, key=f"{nip}-{plan.tanggal}"):
+            result["antre"] += 1
+        else:
+            result["sudah_antre"] += 1
+
+    pipelinelog.info(f"{result['antre']} rencana diantrekan, {bot.report.summary()}")
+    return result
+
+
+def kirim(bot: BOT, queue: WorkQueue, wait: bool = False) -> int:
+    """
+    Submitter stage: take work items from the queue and submit them until it is empty.
+
+    Each run gets a deadline shorter than the lease, so a slow run stops with status 'timeout' and
+    is released for a retry (resuming from the run state) before another worker could take it.
+
+    Parameters:
+        wait (bool): Keep polling an empty queue instead of returning.
+
+    Returns:
+        int: The number of work items processed.
+    """
+    processed = 0
+    bot.keep_browser = True
+    try:
+        while True:
+            job = queue.get()
+            if job is None:
+                if not wait:
+                    return processed
+                sleep(POLL)
+                continue
+
+            plan = DayPlan.from_dict(job.payload["plan"])
+            password = kredensial(plan.nip)
+            if password is None:
+                pipelinelog.error(f"Password untuk {plan.nip} tidak ditemukan (password_{plan.nip})")
+                queue.nack(job, error="password tidak ditemukan", delay=RETRY_DELAY)
+                continue
+
+            # GANTI PEGAWAI: BROWSER TETAP TERBUKA, LOGIN ULANG
+            bot.ganti_pegawai(plan.nip, password)
+
+            report = bot.start(deadline=Deadline(queue.visibility - DEFAULT_MARGIN), plan=plan)
+            if report.status in RETRY_STATUSES:
+                queue.nack(job, error=report.status, delay=RETRY_DELAY)
+            else:
+                queue.ack(job)
+            processed += 1
+    finally:
+        bot.keep_browser = False
+        bot.close()
+
+
+def worker(server: str, wait: bool):
+    """Entry point of a submitter process: its own BOT, browser and queue connection."""
+    try:
+        processed = kirim(BOT(server=server), WorkQueue(), wait=wait)
+        pipelinelog.info(f"Worker {os.getpid()} selesai, {processed} pekerjaan diproses")
+    finally:
+        # PROSES ANAK KELUAR TANPA atexit, TULIS LOG YANG MASIH DI ANTREAN
+        flush_logs()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.pipeline", description="Pipeline rencana/pengisian jurnal")
+    sub = parser.add_subparsers(dest="name", required=True)
+
+    p = sub.add_parser("plan", help="susun rencana setiap pegawai dan masukkan ke antrean")
+    p.add_argument("--nip", action="append", default=[], help="NIP pegawai, dapat diulang")
+    p.add_argument("--roster", help="CSV dengan kolom nip")
+
+    p = sub.add_parser("submit", help="jalankan worker pengisi jurnal dari antrean")
+    p.add_argument("--workers", type=int, default=1)
+    p.add_argument("--server", choices=("local", "lambda"), default="local")
+    p.add_argument("--wait", action="store_true", help="tetap menunggu pekerjaan baru ketika antrean kosong")
+
+    sub.add_parser("stats", help="jumlah pekerjaan per status")
+
+    args = parser.parse_args(argv)
+    if args.name == "plan":
+        nips = list(args.nip)
+        if args.roster:
+            with open(args.roster, newline="") as f:
+                nips += [row["nip"] for row in csv.DictReader(f)]
+        result = rencanakan(BOT(), nips or [os.getenv("nip")], WorkQueue())
+        print(json.dumps(result, indent=1))
+    elif args.name == "submit":
+        if args.workers == 1:
+            worker(args.server, args.wait)
+        else:
+            processes = [Process(target=worker, args=(args.server, args.wait)) for _ in range(args.workers)]
+            for process in processes:
+                process.start()
+            for process in processes:
+                process.join()
+    else:
+        print(json.dumps(WorkQueue().stats(), indent=1))
+
+
+if __name__ == "__main__":
+    setup_logging()
+    main()
@@ -0,0 +1,131 @@
+"""Run report: timings per phase, validation issues and counters of one bot run."""
+from contextlib import contextmanager
+from datetime import datetime
+from time import perf_counter
+from uuid import uuid4
+import json
+import logging
+
+from .state import state_path
+
+reportlog = logging.getLogger(__name__)
+
+
+class RunReport:
+    """
+    Collects what happened during one run of `BOT.start()`.
+
+    Attributes:
+        run_id (str): Random id of the run.
+        nip (str): The employee the run is for.
+        started (str): ISO timestamp of the start of the run.
+        phases (dict): Phase name to accumulated wall time in seconds.
+        waits (dict): Queueing delay in seconds (see `app/governor.py`), included in the phases.
+        issues (list): Validation issues (see `app/validation.py`).
+        counters (dict): Free form counters, e.g. submitted entries.
+        interventions (list): Drivers torn down by the watchdog (see `app/watchdog.py`).
+        memory (dict): Peak RSS of the browser processes per phase in MB (see `app/memory.py`).
+        current (str): Name of the innermost phase being measured, None outside phases.
+        navigations (list): Timing record of every page loaded (see `app/navtiming.py`).
+        commands (dict): WebDriver commands per command type, phase and entry (see `app/commands.py`).
+        allocations (list): Python memory snapshots at the phase boundaries (see `app/memtrace.py`).
+        diagnostics (list): Diagnostics artifacts of the entries that failed (see `app/diagnostics.py`).
+        timeouts (dict): Timeouts learned per wait step and the waits that ran out (see `app/timeouts.py`).
+        recording (str): Path of the recorded WebDriver session, when recording is enabled (see `app/recorder.py`).
+        profile (dict): Profile artifact and time blocked on I/O, when profiling is enabled (see `app/profiling.py`).
+        status (str): Final status of the run.
+    """
+
+    def __init__(self, nip: str = None, run_id: str = None):
+        self.run_id = run_id or uuid4().hex[:12]
+        self.nip = nip
+        self.started = datetime.now().isoformat(timespec="seconds")
+        self.phases = {}
+        self.waits = {}
+        self.issues = []
+        self.counters = {}
+        self.interventions = []
+        self.memory = {}
+        self.current = None
+        self.navigations = []
+        self.commands = {}
+        self.allocations = []
+        self.diagnostics = []
+        self.timeouts = {}
+        self.recording = None
+        self.profile = None
+        self.status = None
+
+    @contextmanager
+    def phase(self, name: str):
+        """Measure the wall time of a block and add it to `phases[name]`."""
+        start = perf_counter()
+        previous, self.current = self.current, name
+        try:
+            yield
+        finally:
+            self.current = previous
+            self.phases[name] = self.phases.get(name, 0.0) + perf_counter() - start
+
+    def add_wait(self, name: str, seconds: float):
+        """Add `seconds` of queueing delay to `waits[name]`."""
+        if seconds > 0:
+            self.waits[name] = self.waits.get(name, 0.0) + seconds
+
+    def count(self, name: str, n: int = 1):
+        """Increase the counter `name` by `n`."""
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def to_dict(self) -> dict:
+        return {
+            "run_id": self.run_id,
+            "nip": self.nip,
+            "started": self.started,
+            "status": self.status,
+            "phases": {name: round(seconds, 4) for name, seconds in self.phases.items()},
+            "waits": {name: round(seconds, 4) for name, seconds in self.waits.items()},
+            "issues": [issue.to_dict() for issue in self.issues],
+            "counters": self.counters,
+            "interventions": self.interventions,
+            "memory": self.memory,
+            "navigations": self.navigations,
+            "commands": self.commands,
+            "allocations": self.allocations,
+            "diagnostics": self.diagnostics,
+            "timeouts": self.timeouts,
+            "recording": self.recording,
+            "profile": self.profile,
+        }
+
+    def summary(self) -> str:
+        """Return a short human readable summary of the run."""
+        phases = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in self.phases.items())
+        lines = [f"Run {self.run_id} [{self.status}] {phases}"]
+        if self.waits:
+            lines.append("antrian " + ", ".join(f"{name} {seconds:.2f}s" for name, seconds in self.waits.items()))
+        ttfb = sorted(nav["ttfb"] for nav in self.navigations if nav.get("ttfb") is not None)
+        if ttfb:
+            lines.append(f"navigasi {len(self.navigations)} halaman, ttfb median {ttfb[len(ttfb) // 2]:.0f}ms, "
+                         f"maks {ttfb[-1]:.0f}ms")
+        total = self.commands.get("total")
+        if total:
+            per_entry = [item["count"] for item in self.commands["per_entry"].values()]
+            lines.append(f"perintah webdriver {total['count']} ({(total['sent'] + total['received']) / 1024:.0f} KB, "
+                         f"{total['seconds']:.2f}s)" + (f", per kegiatan maks {max(per_entry)}" if per_entry else ""))
+        if self.memory:
+            lines.append("memori " + ", ".join(f"{name} {mb:.0f}MB" for name, mb in self.memory.items()))
+        if self.allocations:
+            lines.append("memori python " + ", ".join(f"{item['label']} {item['current_mb']:.1f}MB ({item['delta_mb']:+.1f})"
+                                                      for item in self.allocations))
+        lines += [f"- watchdog: {item['alasan']}" for item in self.interventions]
+        lines += [f"- timeout: {step} ({count}x)" for step, count in self.timeouts.get("expired", {}).items()]
+        lines += [f"- diagnostik: {path}" for path in self.diagnostics]
+        lines += [f"- {issue}" for issue in self.issues]
+        return "\n".join(lines)
+
+    def save(self, path: str = None) -> str:
+        """Write the report as JSON to the state directory and return the path."""
+        path = path or state_path("reports", f"{self.started[:10]}-{self.run_id}.json")
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=1)
+        return path
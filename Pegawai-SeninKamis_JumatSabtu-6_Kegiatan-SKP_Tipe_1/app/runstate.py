@@ -0,0 +1,105 @@
+"""Durable run state of every planned journal entry, stored in SQLite.
+
+Each entry of a day's plan goes through the lifecycle
+
+    planned -> submitting -> submitted -> verified
+                         \\-> failed
+
+and every transition is a single autocommitted UPDATE on a WAL database, cheap enough to
+run around every submission. After a crash or kill, `BOT.start()` resumes from these states:
+submitted and verified entries are never submitted again, and an entry left in 'submitting'
+is first looked up in the portal's journal table before it is retried.
+"""
+from time import time
+import logging
+import re
+import sqlite3
+
+from .state import state_path
+
+runstatelog = logging.getLogger(__name__)
+
+PLANNED = "planned"
+SUBMITTING = "submitting"
+SUBMITTED = "submitted"
+VERIFIED = "verified"
+FAILED = "failed"
+
+# Status yang tidak boleh dikirim ulang
+DONE_STATES = (SUBMITTED, VERIFIED)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    nip TEXT NOT NULL,
+    tanggal TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    kegiatan TEXT,
+    mulai INTEGER,
+    selesai INTEGER,
+    skp_value TEXT,
+    state TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (nip, tanggal, idx)
+) WITHOUT ROWID;
+"""
+
+
+def connect(path: str) -> sqlite3.Connection:
+    """Open a SQLite database in autocommit mode with WAL journaling."""
+    conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    # WAL + NORMAL: commit tidak menunggu fsync, tetap aman dari korupsi saat crash
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def normalize_text(text: str) -> str:
+    return re.sub(r"\s+", " ", str(text or "")).strip().casefold()
+
+
+def find_entry(entry, rows: list) -> bool:
+    """Return True if one of the journal table `rows` (their text) shows `entry`."""
+    kegiatan = normalize_text(entry.kegiatan)
+    mulai = f"{entry.jam_mulai}:{entry.menit_mulai}"
+    return any(kegiatan in normalize_text(row) and mulai in row for row in rows)
+
+
+class RunStateStore:
+    """
+    SQLite store of the lifecycle state of planned entries, keyed by NIP, date and plan index.
+
+    Parameters:
+        path (str): Location of the database. Defaults to `runstate.db` in the state directory.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path or state_path("runstate.db")
+        self.conn = connect(self.path)
+        self.conn.executescript(SCHEMA)
+
+    def plan(self, nip: str, tanggal, entries: list):
+        """Register the entries of a plan as 'planned'. Entries already known keep their state."""
+        now = time()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO entries (nip, tanggal, idx, kegiatan, mulai, selesai, skp_value, state, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(nip, str(tanggal), i, e.kegiatan, e.mulai, e.selesai, e.skp_value, PLANNED, now)
+                 for i, e in enumerate(entries)])
+
+    def states(self, nip: str, tanggal) -> dict:
+        """Return plan index -> state of the entries of `nip` for `tanggal`."""
+        cursor = self.conn.execute("SELECT idx, state FROM entries WHERE nip = ? AND tanggal = ?", (nip, str(tanggal)))
+        return dict(cursor.fetchall())
+
+    def mark(self, nip: str, tanggal, idx: int, state: str, error: str = None):
+        """Move an entry to `state`. Moving to 'submitting' counts an attempt."""
+        self.conn.execute(
+            "UPDATE entries SET state = ?, error = ?, updated_at = ?, attempts = attempts + ? "
+            "WHERE nip = ? AND tanggal = ? AND idx = ?",
+            (state, error, time(), 1 if state == SUBMITTING else 0, nip, str(tanggal), idx))
+
+    def close(self):
+        self.conn.close()
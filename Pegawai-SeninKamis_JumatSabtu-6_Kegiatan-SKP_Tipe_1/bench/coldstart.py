@@ -0,0 +1,131 @@
+"""Cold start of the Lambda handler: import time per module and module-level side effects.
+
+The handler module (`server` by default, which also constructs the bot) is imported in a fresh
+interpreter started with `-X importtime`, like the init phase of a new Lambda container. The
+report holds the time to handler, the self and cumulative import time of every module, the self
+time summed per top-level package, and the side effects of the imports: network connections,
+files read besides Python sources, subprocesses and errors, each charged to the module being
+executed, recorded with an audit hook and grouped per directory or installed package.
+
+`--compare before.json` adds the difference with an earlier report, e.g. one taken before an
+import was made lazy.
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+TOP = 25
+
+# Dijalankan di interpreter baru: impor handler dan catat efek samping lewat audit hook
+CHILD = r"""
+import importlib, json, sys, time
+started = time.perf_counter()
+effects = []
+EVENTS = ("socket.connect", "socket.getaddrinfo", "subprocess.Popen", "os.system", "open")
+SOURCES = (".py", ".pyc", ".so", ".pth")
+
+def executing():
+    frame = sys._getframe(2)
+    while frame is not None:
+        if frame.f_code.co_name == "<module>" and frame.f_globals.get("__name__") not in (None, "__main__"):
+            return frame.f_globals["__name__"]
+        frame = frame.f_back
+    return None
+
+def hook(event, args):
+    if event not in EVENTS:
+        return
+    if event == "open" and (not isinstance(args[0], str) or args[0].endswith(SOURCES) or args[0].startswith("/dev/")):
+        return
+    name = executing()
+    if name is not None:
+        target = args[0] if event == "open" else args[:2]
+        effects.append([name, event, target if isinstance(target, str) else repr(target)[:160]])
+
+sys.addaudithook(hook)
+error = None
+try:
+    importlib.import_module(sys.argv[1])
+except BaseException as e:
+    error = repr(e)[:300]
+print(json.dumps({"seconds": time.perf_counter() - started, "effects": effects, "error": error}))
+"""
+
+
+def parse_importtime(text: str) -> dict:
+    """Return module name to `(self, cumulative)` microseconds from the `-X importtime` output."""
+    modules = {}
+    for line in text.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = (int(self_us), int(cumulative))
+    return modules
+
+
+def file_group(path: str) -> str:
+    """Return the installed package of a data file (e.g. the zone files of pytz), else its directory."""
+    head, sep, tail = path.partition("site-packages/")
+    return head + sep + tail.split("/")[0] if sep else os.path.dirname(path) or path
+
+
+def group_effects(effects: list) -> list:
+    """Group side effects by module, event and target, files by `file_group`."""
+    groups = {}
+    for module, event, target in effects:
+        key = (module, event, file_group(target) if event == "open" else target)
+        group = groups.setdefault(key, {"module": module, "event": event, "target": key[2], "count": 0, "example": target})
+        group["count"] += 1
+    return sorted(groups.values(), key=lambda group: -group["count"])
+
+
+def measure(handler: str = "server") -> dict:
+    """Import `handler` once in a fresh interpreter and return its raw measurements."""
+    process = subprocess.run([sys.executable, "-X", "importtime", "-c", CHILD, handler],
+                             capture_output=True, text=True, cwd=os.getcwd())
+    result = json.loads(process.stdout.strip().splitlines()[-1])
+    result["modules"] = parse_importtime(process.stderr)
+    return result
+
+
+def run(handler: str = "server", runs: int = 3, top: int = TOP, compare: str = None) -> dict:
+    """
+    Measure the cold start of `handler` `runs` times and report the medians.
+
+    Returns:
+        dict: `time_to_handler` and `imports` (seconds), the `top` slowest `modules`, every
+        `packages`, the `side_effects` and `error` of the import, and `diff` with `compare`.
+    """
+    results = [measure(handler) for _ in range(runs)]
+    names = set().union(*(r["modules"] for r in results))
+    modules = {name: (statistics.median(r["modules"].get(name, (0, 0))[0] for r in results) / 1e6,
+                      statistics.median(r["modules"].get(name, (0, 0))[1] for r in results) / 1e6)
+               for name in names}
+    packages = {}
+    for name, (self_s, _) in modules.items():
+        package = name.split(".")[0]
+        packages[package] = packages.get(package, 0) + self_s
+
+    report = {
+        "handler": handler,
+        "runs": runs,
+        "time_to_handler": round(statistics.median(r["seconds"] for r in results), 4),
+        "imports": round(sum(self_s for self_s, _ in modules.values()), 4),
+        "packages": {name: round(seconds, 4) for name, seconds in sorted(packages.items(), key=lambda item: -item[1])},
+        "modules": [{"module": name, "self": round(self_s, 4), "cumulative": round(cumulative, 4)}
+                    for name, (self_s, cumulative) in sorted(modules.items(), key=lambda item: -item[1][1])[:top]],
+        "side_effects": group_effects(results[0]["effects"]),
+        "error": results[0]["error"],
+    }
+    if compare:
+        with open(compare) as f:
+            before = json.load(f)
+        report["diff"] = {
+            "time_to_handler": round(report["time_to_handler"] - before["time_to_handler"], 4),
+            "imports": round(report["imports"] - before["imports"], 4),
+            "packages": {name: round(report["packages"].get(name, 0) - before["packages"].get(name, 0), 4)
+                         for name in set(report["packages"]) | set(before["packages"])},
+        }
+    return report
@@ -1,12 +1,56 @@
 from app import BOT
+from app.deadline import Deadline, DeadlineExceeded
+from app.orchestrator import Orchestrator, LambdaInvoker, LocalInvoker, run_shard, shared_state_dir
+from app.logs import setup_logging, flush_logs
+from functools import wraps
 import logging
+import os
 
-logging.basicConfig(level=logging.INFO,
-                    format="%(asctime)s - %(levelname)s - %(message)s")
+# log JSON lewat antrean, ditulis oleh thread listener (log_level, log_levels, log_format, log_sample)
+setup_logging()
 
 bot = BOT(server="lambda")
+serverlog = logging.getLogger(__name__)
 
+def flushed(task):
+  # tulis log yang masih di antrean sebelum container Lambda dibekukan
+  @wraps(task)
+  def handler(event=None, context=None):
+    try:
+      return task(event, context)
+    finally:
+      flush_logs()
+  return handler
+
+@flushed
 def main_task(event=None, context=None):
-  bot.start()
+  report = bot.start(deadline=Deadline.from_context(context))
+  if report.status == "timeout":
+    if not shared_state_dir():
+      # run state di /tmp container ini: retry di container baru tidak tahu kegiatan yang sudah terkirim
+      serverlog.error("Sisa waktu Lambda habis, tidak di-retry karena state_dir tidak di EFS (kegiatan bisa terkirim dua kali)")
+      return report.to_dict()
+    # gagalkan invocation agar Lambda menjalankan ulang (async retry) dan melanjutkan dari run state
+    raise DeadlineExceeded(f"Sisa waktu Lambda habis setelah {report.counters.get('submitted', 0)} kegiatan, dilanjutkan pada retry berikutnya")
+  return report.to_dict()
+
+@flushed
+def worker_task(event=None, context=None):
+  # satu shard dari orchestrator_task: {"shard": i, "nips": [...]}
+  return run_shard(bot, event["nips"], Deadline.from_context(context))
 
-    
\ No newline at end of file
+@flushed
+def orchestrator_task(event=None, context=None):
+  # {"nips": [...], "shards": n}, default dari variabel roster (NIP dipisah koma) dan shards
+  event = event or {}
+  nips = event.get("nips") or [nip for nip in os.getenv("roster", "").split(",") if nip]
+  shards = int(event.get("shards") or os.getenv("shards", 4))
+  function = os.getenv("worker_function")
+  if function:
+    invoker = LambdaInvoker(function)
+  else:
+    # tanpa fungsi worker, setiap shard dijalankan di proses ini dengan BOT sendiri (untuk uji lokal)
+    invoker = LocalInvoker(lambda payload, context: run_shard(BOT(server="lambda"), payload["nips"], Deadline.from_context(context)))
+    # shard dijalankan bergantian: setiap BOT memakai port debugging Chrome yang sama (9222)
+    return Orchestrator(invoker, shards=shards, workers=1).run(nips, deadline=Deadline.from_context(context))
+  return Orchestrator(invoker, shards=shards).run(nips, deadline=Deadline.from_context(context))
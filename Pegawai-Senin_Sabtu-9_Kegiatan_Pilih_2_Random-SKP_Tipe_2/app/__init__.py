@@ -1,2 +1,15 @@
-from .bot import BOT
-from .utilities import Util
\ No newline at end of file
+from .memtrace import start as _start_memtrace
+
+# MEMTRACE HARUS AKTIF SEBELUM IMPOR BERAT (selenium, gspread, ...) AGAR IKUT TERUKUR
+_start_memtrace()
+
+
+def __getattr__(name):
+    # impor malas: modul ringan seperti app.jurnal dapat dipakai tanpa memuat selenium/gspread
+    if name == "BOT":
+        from .bot import BOT
+        return BOT
+    if name == "Util":
+        from .utilities import Util
+        return Util
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,77 @@
+"""Counter of WebDriver commands.
+
+Every `wait_element_*` helper, page load and script call is one or more HTTP round trips to
+chromedriver, and their number dominates the cost of an entry. The counter wraps the command
+executor of the driver and accumulates, per phase of the run report, per journal entry and per
+command type, the number of commands, the bytes sent and received and the time they took.
+The benchmarks use it to enforce a command budget (`python -m bench commands`).
+"""
+from time import perf_counter
+import json
+
+
+class CommandCounter:
+    """
+    Counts the commands of the drivers it is installed on.
+
+    Parameters:
+        context (callable): Returns `(phase, entry)` for the command being executed.
+    """
+
+    def __init__(self, context=None):
+        self.context = context or (lambda: (None, None))
+        self.stats = {}
+
+    def install(self, driver):
+        """Count every command of `driver` from now on."""
+        executor = driver.command_executor
+        execute = executor.execute
+
+        def counted(command, params):
+            started = perf_counter()
+            response = None
+            try:
+                response = execute(command, params)
+                return response
+            finally:
+                phase, entry = self.context()
+                item = self.stats.setdefault((phase or "-", entry, command), [0, 0, 0, 0.0])
+                item[0] += 1
+                item[1] += len(json.dumps(params, default=str)) if params else 0
+                if isinstance(response, dict):
+                    item[2] += len(json.dumps(response.get("value"), default=str))
+                item[3] += perf_counter() - started
+
+        executor.execute = counted
+
+    def reset(self):
+        self.stats = {}
+
+    def total(self, phase: str = None, entry: int = None) -> int:
+        """Return the number of commands, optionally only those of a phase and/or an entry."""
+        return sum(item[0] for (p, e, _), item in self.stats.items()
+                   if (phase is None or p == phase) and (entry is None or e == entry))
+
+    def summary(self) -> dict:
+        """
+        Return the counters grouped for the run report.
+
+        Returns:
+            dict: `total`, `per_command`, `per_phase` and `per_entry`, each with `count`,
+            `sent` and `received` bytes and `seconds`.
+        """
+        groups = {"total": {}, "per_command": {}, "per_phase": {}, "per_entry": {}}
+
+        def add(group: dict, values: list):
+            group["count"] = group.get("count", 0) + values[0]
+            group["sent"] = group.get("sent", 0) + values[1]
+            group["received"] = group.get("received", 0) + values[2]
+            group["seconds"] = round(group.get("seconds", 0) + values[3], 4)
+
+        for (phase, entry, command), values in self.stats.items():
+            add(groups["total"], values)
+            add(groups["per_command"].setdefault(command, {}), values)
+            add(groups["per_phase"].setdefault(phase, {}), values)
+            if entry is not None:
+                add(groups["per_entry"].setdefault(str(entry), {}), values)
+        return groups
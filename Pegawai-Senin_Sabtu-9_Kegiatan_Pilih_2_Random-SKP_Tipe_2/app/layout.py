@@ -0,0 +1,8 @@
+"""Sheet layout of this variant: Senin-Sabtu, 2 of 9 kegiatan chosen at random."""
+from .jurnal import DayLayout, SheetLayout
+
+LAYOUT = SheetLayout(
+    days=(
+        DayLayout("senin-sabtu", rows=9, pick=2),
+    ),
+)
@@ -0,0 +1,138 @@
+"""Compiles each day's exact journal entries ahead of submission.
+
+The random choices of a day (which activities are picked and how many minutes are added)
+are drawn from a generator seeded per employee per date, and the compiled plan is stored
+in a plan cache. The submitter only replays the cached entries, so a retried run submits
+exactly the same minutes and activities as the first attempt.
+"""
+from datetime import datetime
+import hashlib
+import json
+import logging
+import os
+import random
+
+from .jurnal import Entry
+from .state import state_path
+
+planlog = logging.getLogger(__name__)
+
+# Rentang menit acak yang ditambahkan pada waktu mulai/selesai
+JITTER_MINUTES = 5
+
+
+def plan_seed(nip: str, tanggal) -> int:
+    """Return the deterministic random seed of an employee for a date.
+
+    Example:
+        >>> plan_seed("199001012020121001", "2024-03-01") == plan_seed("199001012020121001", "2024-03-01")
+        True
+    """
+    digest = hashlib.sha256(f"{nip}:{tanggal}".encode()).digest()
+    return int.from_bytes(digest[:8], "big")
+
+
+class DayPlan:
+    """
+    The compiled entries of one employee for one date.
+
+    Attributes:
+        nip (str): The employee NIP.
+        tanggal (str): The date in ISO format.
+        hari (str): The day type the entries were taken from.
+        seed (int): The seed the random choices were drawn with.
+        entries (list): The ``Entry`` objects with their final times, in submission order.
+    """
+
+    def __init__(self, nip: str, tanggal: str, hari: str, seed: int, entries: list):
+        self.nip = nip
+        self.tanggal = str(tanggal)
+        self.hari = hari
+        self.seed = seed
+        self.entries = entries
+
+    @property
+    def resolved(self) -> bool:
+        """True when the SKP option of every entry is known; only such a plan is cached."""
+        return all(entry.skp_value is not None for entry in self.entries)
+
+    def to_dict(self) -> dict:
+        return {"nip": self.nip, "tanggal": self.tanggal, "hari": self.hari, "seed": self.seed,
+                "entries": [entry.to_dict() for entry in self.entries]}
+
+    @classmethod
+    def from_dict(cls, values: dict):
+        return cls(values["nip"], values["tanggal"], values["hari"], values["seed"],
+                   [Entry.from_dict(entry) for entry in values["entries"]])
+
+
+def compile_plan(jurnal: dict, layout, hari: str, nip: str, tanggal, jitter: int = JITTER_MINUTES) -> DayPlan:
+    """
+    Compile the exact entries of a day.
+
+    Day types declared with ``pick`` submit a seeded random sample of their rows. Every end time,
+    and the start time if ``jitter_start`` is set, gets 1 to ``jitter`` random minutes added.
+
+    Parameters:
+        jurnal (dict): The journal data returned by ``Util.get_jurnal``.
+        layout (SheetLayout): The layout of the variant.
+        hari (str): The day type of the date.
+        nip (str): The employee NIP, part of the seed.
+        tanggal (date): The date of the plan, part of the seed.
+        jitter (int): The maximum number of random minutes added.
+
+    Returns:
+        DayPlan: The compiled plan. The same inputs always give the same plan.
+    """
+    day = layout.day(hari)
+    seed = plan_seed(nip, tanggal)
+    rng = random.Random(seed)
+
+    entries = jurnal.get(hari, [])
+    if day.pick is not None and day.pick < len(entries):
+        entries = rng.sample(entries, day.pick)
+
+    def geser(minutes):
+        return None if minutes is None else minutes + rng.randint(1, jitter)
+
+    entries = [entry.replace(mulai=geser(entry.mulai) if day.jitter_start else entry.mulai,
+                             selesai=geser(entry.selesai))
+               for entry in entries]
+    return DayPlan(nip, tanggal, hari, seed, entries)
+
+
+class PlanCache:
+    """Stores compiled plans as JSON files in the state directory, one per employee per date."""
+
+    def __init__(self, directory: str = None):
+        self.directory = directory
+
+    def path(self, nip: str, tanggal) -> str:
+        name = f"{nip}-{tanggal}.json"
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+            return os.path.join(self.directory, name)
+        return state_path("plans", name)
+
+    def load(self, nip: str, tanggal):
+        """Return the cached ``DayPlan`` of `nip` for `tanggal`, or None if it has not been compiled."""
+        path = self.path(nip, tanggal)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path) as f:
+                return DayPlan.from_dict(json.load(f))
+        except (OSError, ValueError, KeyError) as e:
+            planlog.warning(f"Rencana {path} tidak dapat dibaca {repr(e)}")
+            return None
+
+    def save(self, plan: DayPlan) -> str:
+        """Write the plan to the cache and return its path."""
+        path = self.path(plan.nip, plan.tanggal)
+        values = plan.to_dict()
+        values["compiled_at"] = datetime.now().isoformat(timespec="seconds")
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(values, f, indent=1)
+        os.replace(tmp, path)
+        return path
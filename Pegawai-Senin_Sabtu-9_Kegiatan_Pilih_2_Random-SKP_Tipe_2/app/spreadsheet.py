@@ -1,9 +1,6 @@
 import os
-from datetime import datetime
 
-import gspread
 from dotenv import load_dotenv
-from google.oauth2.service_account import Credentials
 
 load_dotenv()
 
@@ -11,11 +8,28 @@ load_dotenv()
 scopes = [
     "https://www.googleapis.com/auth/spreadsheets"
 ]
-# The credentials to access the Google Sheets API.
-creds = Credentials.from_service_account_file(
-    "sheet_cred.json", scopes=scopes)
-client = gspread.authorize(creds)
-worksheet = client.open_by_key(os.getenv('sheet_id')).sheet1
+# Worksheet yang sudah diotorisasi, dibuat saat sheet pertama kali dibaca (bukan saat impor)
+_worksheet = None
+
+def get_worksheet():
+  """
+  Return the first worksheet of the `sheet_id` spreadsheet, authorizing on the first call.
+
+  gspread and google-auth are imported and the credentials are exchanged here instead of at
+  import, so the init phase of a cold start, and processes that never read the sheet such as the
+  orchestrator, do not pay for them.
+  """
+  global _worksheet
+  if _worksheet is None:
+    import gspread
+    from google.oauth2.service_account import Credentials
+
+    # The credentials to access the Google Sheets API.
+    creds = Credentials.from_service_account_file(
+        "sheet_cred.json", scopes=scopes)
+    client = gspread.authorize(creds)
+    _worksheet = client.open_by_key(os.getenv('sheet_id')).sheet1
+  return _worksheet
 
 def get_sheet_row_col(row=int, col=int):
   """
@@ -31,11 +45,12 @@ def get_sheet_row_col(row=int, col=int):
   Example:
   get_sheet_row_col(1, 1)  # Returns the value of the cell in the first row and first column.
   """
-  return worksheet.cell(row, col).value
+  return get_worksheet().cell(row, col).value
 
-def get_sheet_table_values() -> list:
-    """medapatkan semua data dari tabel dalam bantuk list"""
-    return worksheet.get_all_values()[:10]
+def get_sheet_table_values(limit: int = None) -> list:
+    """medapatkan semua data dari tabel dalam bantuk list, dibatasi `limit` baris pertama jika diberikan"""
+    values = get_worksheet().get_all_values()
+    return values if limit is None else values[:limit]
 
 def get_sheet_time(value) -> str:
     """
@@ -61,45 +76,3 @@ def get_sheet_time(value) -> str:
       pass
 
     return str(value)
-
-
-def get_skp_value(skp):
-    """
-    This function takes a string parameter 'skp' and returns a tuple containing an integer value and a string value.
-
-    Parameters:
-    - skp (str): The input string representing the SKP value.
-
-    Returns:
-    - tuple: A tuple containing an integer value and a string value. The integer value represents the SKP category, while the string value represents the SKP code.
-
-    SKP Categories:
-    0: Membantu pelaksanaan tugas dan pendalaman materi bidang pengamanan
-    1: Membantu pelaksanaan tugas dalam pendalaman materi bidang pelayanan tahanan
-    2: Membantu pelaksanaan tugas dalam pendalaman materi bidang pengelolaan
-    3: Melaksanakan tugas lainnya yang diperintahkan oleh pimpinan
-    4: Lain-Lain
-    5: Tugas Tambahan
-    6: Kreatifitas
-
-    SKP Codes:
-    - For categories 0 to 3: A string value in the format '{current_year}999967720178403_{category_number}'.
-    - For category 4: The string value is 'lainlain'.
-    - For category 5: The string value is '2'.
-    - For category 6: The string value is '3'.
-    """
-
-    if skp == "Melaksanakan tugas penjagaan sesuai jadwal":
-      return 0, f"{datetime.now().year}199006032178404_01"
-    elif skp == "Menjaga keamanan dan ketertiban kantor agar tidak terjadi pelarian":
-      return 1, f"{datetime.now().year}199006032178404_02"
-    elif skp == "Memariksa/mengeledah tamu,Napi/tahanan dan barang-barang yang keluar masuk kantor":
-      return 2, f"{datetime.now().year}199006032178404_03"
-    elif skp == "Mengelola Data Kepegawaian":
-      return 3, f"{datetime.now().year}199006032178404_04"
-    elif skp == "Lain-Lain":
-      return 4, "lainlain"
-    elif skp == "Tugas Tambahan":
-      return 5, "2"
-    elif skp == "Kreatifitas":
-      return 6, "3"
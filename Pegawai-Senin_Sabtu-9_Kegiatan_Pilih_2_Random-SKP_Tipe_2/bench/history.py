@@ -0,0 +1,65 @@
+"""Benchmark of the reporting queries of ``app.history`` on a large synthetic history."""
+from datetime import date, timedelta
+import os
+import random
+import tempfile
+import time
+
+from app.history import History
+from app.jurnal import Entry
+
+SKP_VALUES = ("101", "102", "103", "104", "105")
+
+
+def fill(history: History, employees: int, years: int, per_day: int = 4, seed: int = 0):
+    """Insert `per_day` submissions per employee for every Monday-Saturday of `years` years."""
+    rnd = random.Random(seed)
+    start = date(2020, 1, 1)
+    days = [start + timedelta(days=d) for d in range(365 * years) if (start + timedelta(days=d)).weekday() < 6]
+    with history.conn:
+        for e in range(employees):
+            nip = f"1990{e:014d}"
+            rows = []
+            for day in days:
+                if rnd.random() < 0.02:
+                    continue  # HARI YANG TERLEWAT
+                for i in range(per_day):
+                    skp = rnd.choice(SKP_VALUES)
+                    rows.append((nip, day.isoformat(), i, skp, f"SKP {skp}", f"Kegiatan {i}", 450 + i * 60,
+                                 500 + i * 60, rnd.randint(1, 5), 1, 0.0, rnd.uniform(3, 20), "verified", None))
+            history.conn.executemany(
+                "INSERT INTO submissions (nip, tanggal, idx, skp_value, skp_label, kegiatan, mulai, selesai, "
+                "jumlah_diselesaikan, attempts, started_at, duration, outcome, run_id) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+
+def timed(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return round(best * 1000, 3)
+
+
+def run(employees: int = 200, years: int = 3, repeat: int = 5) -> dict:
+    """Fill a temporary history and time the reporting queries for one employee.
+
+    Returns:
+        dict: The number of rows and the best wall time of each query in milliseconds.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        history = History(os.path.join(tmp, "history.db"))
+        fill(history, employees, years)
+        history.conn.execute("ANALYZE")
+        rows = history.conn.execute("SELECT count(*) FROM submissions").fetchone()[0]
+        nip, end = "1990" + "0" * 14, date(2020 + years - 1, 12, 31)
+        result = {
+            "rows": rows,
+            "skp_bulanan_ms": timed(lambda: history.monthly_skp_totals(nip, 2020 + years - 1), repeat),
+            "hari_terlewat_ms": timed(lambda: history.missing_days(nip, end - timedelta(days=30), end), repeat),
+            "p95_mingguan_ms": timed(lambda: history.weekly_latency(nip, date(2020 + years - 1, 1, 1), end), repeat),
+            "record_ms": timed(lambda: history.record(nip, end, 0, Entry("x", 450, 500, "l", 1, "101", 1), 1, 0.0, 1.0, "submitted"), repeat),
+        }
+        history.close()
+    return result
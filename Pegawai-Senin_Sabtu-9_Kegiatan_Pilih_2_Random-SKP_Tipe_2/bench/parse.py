@@ -0,0 +1,51 @@
+"""Microbenchmark of ``parse_jurnal`` on large synthetic sheets."""
+import random
+import time
+
+from app.jurnal import DayLayout, SheetLayout, parse_jurnal
+from app.layout import LAYOUT
+
+SKP_LABELS = ("Lain-Lain", "Tugas Tambahan", "Kreatifitas")
+
+
+def synthetic_sheet(rows: int, days: int, seed: int = 0) -> list:
+    """Build a sheet with ``days`` blocks of ``rows`` rows separated by a blank row."""
+    rnd = random.Random(seed)
+    values = [["No", "Kegiatan", "Jam Mulai", "Menit Mulai", "Jam Selesai", "Menit Selesai", "SKP", "Jumlah"]]
+    for _ in range(days):
+        for i in range(rows):
+            jam = rnd.randint(7, 15)
+            values.append([str(i + 1), f"Kegiatan {i + 1}", str(jam), str(rnd.randint(0, 50)),
+                           str(jam + 1), str(rnd.randint(0, 50)), rnd.choice(SKP_LABELS), str(rnd.randint(1, 9))])
+        values.append([""] * 8)
+    return values
+
+
+def resolver(label):
+    return SKP_LABELS.index(label), label
+
+
+def run(rows: int = 10000, days: int = 4, repeat: int = 5) -> dict:
+    """Time ``parse_jurnal`` over an open ended layout of ``days`` x ``rows`` rows.
+
+    Returns:
+        dict: Best and mean wall time in milliseconds and the parse rate in rows per second.
+    """
+    layout = SheetLayout(days=tuple(DayLayout(f"hari-{i}") for i in range(days)))
+    values = synthetic_sheet(rows, days)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        jurnal = parse_jurnal(values, layout, skp_resolver=resolver)
+        timings.append(time.perf_counter() - start)
+
+    assert sum(len(entries) for entries in jurnal.values()) == rows * days
+    best = min(timings)
+    return {
+        "rows": rows * days,
+        "best_ms": round(best * 1000, 3),
+        "mean_ms": round(sum(timings) / len(timings) * 1000, 3),
+        "rows_per_s": int(rows * days / best),
+        # layout varian ini juga diparse sebagai sanity check
+        "variant_days": [day.name for day in LAYOUT.days],
+    }
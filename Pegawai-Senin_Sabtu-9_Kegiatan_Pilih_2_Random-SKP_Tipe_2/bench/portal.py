@@ -0,0 +1,186 @@
+"""Local stand-in for the SIMPEG portal, for browser benchmarks.
+
+The pages reproduce the element structure the bot addresses with absolute XPaths: the two step
+login of `signin.php` and the journal table, 'Tambah' button and entry form of `skp_journal.php`.
+Saved entries are kept in memory per session. Point the bot at it with `BOT.portal_url` (or the
+`portal_url` environment variable) set to `StandInPortal.url`.
+"""
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+from urllib.parse import parse_qs
+from uuid import uuid4
+import time
+
+SKP_OPTIONS = [("", "-- Pilih SKP --")] + [(f"{i}", f"SKP tiruan nomor {i}") for i in range(1, 11)]
+
+SIGNIN = """<!DOCTYPE html>
+<html><head><title>SIAP - Masuk</title></head>
+<body>
+<div><div><div><div><div><div><div>
+  <div>SIMPEG</div>
+  <div><input type="text" id="nip" placeholder="NIP"><input type="button" value="Lanjut" onclick="lanjut()"></div>
+</div></div></div></div></div></div></div>
+<div id="modal" style="display:none">
+  <div>Password</div>
+  <div><form method="post" action="signin.php">
+    <input type="hidden" name="a"><input type="hidden" name="b"><input type="hidden" name="c">
+    <input type="hidden" name="d"><input type="hidden" name="e"><input type="hidden" name="nip" id="nip2">
+    <input type="password" name="password">
+  </form></div>
+  <div><button type="button" onclick="document.forms[0].submit()">Masuk</button></div>
+</div>
+<script>
+function lanjut() {
+  document.getElementById("nip2").value = document.getElementById("nip").value;
+  document.getElementById("modal").style.display = "block";
+}
+</script>
+</body></html>"""
+
+JOURNAL = """<!DOCTYPE html>
+<html><head><title>SIAP - Jurnal Harian</title></head>
+<body>
+<div>Menu</div>
+<div>Jurnal Harian</div>
+<div>
+  <div><div><table>
+    <thead><tr><th>Waktu</th><th>Kegiatan</th><th>SKP</th><th>Jumlah</th></tr></thead>
+    <tbody>{rows}</tbody>
+  </table></div></div>
+  <div><a href="#" onclick="document.getElementById('form').style.display='block'; return false;">Tambah</a></div>
+</div>
+<div id="form" style="display:none">
+  <div>Tambah Jurnal</div>
+  <div><form method="post" action="skp_journal.php"><fieldset>
+    <div><div>{times}</div></div>
+    <div><div><select name="skp">{skp}</select></div></div>
+    <div><div><textarea name="kegiatan"></textarea></div></div>
+    <div><div><input type="text" name="jumlah" value="1"></div></div>
+  </fieldset></form></div>
+  <div><button type="button" onclick="document.getElementById('form').style.display='none'">Batal</button><button type="button" onclick="document.forms[0].submit()">Simpan</button></div>
+</div>
+</body></html>"""
+
+
+def _select(name: str, values) -> str:
+    options = "".join(f'<option value="{v}">{v}</option>' for v in values)
+    return f'<select name="{name}">{options}</select>'
+
+
+TIMES = "".join([
+    _select("jam_mulai", (f"{h:02d}" for h in range(24))),
+    _select("menit_mulai", (f"{m:02d}" for m in range(60))),
+    _select("jam_selesai", (f"{h:02d}" for h in range(24))),
+    _select("menit_selesai", (f"{m:02d}" for m in range(60))),
+])
+SKP = "".join(f'<option value="{value}">{escape(label)}</option>' for value, label in SKP_OPTIONS)
+
+
+class PortalHandler(BaseHTTPRequestHandler):
+    server_version = "StandInPortal/1.0"
+
+    def log_message(self, format, *args):
+        pass
+
+    def session(self):
+        for part in self.headers.get("Cookie", "").split(";"):
+            name, _, value = part.strip().partition("=")
+            if name == "PHPSESSID" and value in self.server.journals:
+                return value
+        return None
+
+    def reply(self, status: int, body: str = "", headers: dict = None):
+        delay = self.server.delay
+        seconds = delay(self.command, self.path) if callable(delay) else delay
+        if seconds:
+            time.sleep(seconds)
+        data = body.encode()
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def form(self) -> dict:
+        length = int(self.headers.get("Content-Length", 0))
+        fields = parse_qs(self.rfile.read(length).decode())
+        return {name: values[0] for name, values in fields.items()}
+
+    def do_GET(self):
+        page = self.path.split("?")[0].rsplit("/", 1)[-1]
+        self.server.hits[page] = self.server.hits.get(page, 0) + 1
+        if page == "signin.php":
+            return self.reply(200, SIGNIN)
+        if page == "skp_journal.php":
+            session = self.session()
+            if session is None:
+                return self.reply(302, headers={"Location": "signin.php"})
+            rows = "".join(
+                f"<tr><td>{escape(row['jam_mulai'])}:{escape(row['menit_mulai'])} - "
+                f"{escape(row['jam_selesai'])}:{escape(row['menit_selesai'])}</td>"
+                f"<td>{escape(row['kegiatan'])}</td><td>{escape(row['skp'])}</td><td>{escape(row['jumlah'])}</td></tr>"
+                for row in self.server.journals[session])
+            return self.reply(200, JOURNAL.replace("{rows}", rows).replace("{times}", TIMES).replace("{skp}", SKP))
+        self.reply(404, "Not Found")
+
+    def do_POST(self):
+        page = self.path.split("?")[0].rsplit("/", 1)[-1]
+        self.server.hits[page] = self.server.hits.get(page, 0) + 1
+        fields = self.form()
+        if page == "signin.php":
+            session = uuid4().hex
+            self.server.journals[session] = []
+            return self.reply(302, headers={"Location": "skp_journal.php", "Set-Cookie": f"PHPSESSID={session}; Path=/"})
+        if page == "skp_journal.php":
+            session = self.session()
+            if session is None:
+                return self.reply(302, headers={"Location": "signin.php"})
+            self.server.journals[session].append({key: fields.get(key, "") for key in (
+                "jam_mulai", "menit_mulai", "jam_selesai", "menit_selesai", "skp", "kegiatan", "jumlah")})
+            return self.reply(302, headers={"Location": "skp_journal.php"})
+        self.reply(404, "Not Found")
+
+
+class StandInPortal:
+    """
+    The stand-in portal served from a background thread on 127.0.0.1.
+
+    Parameters:
+        port (int): Port to listen on, 0 picks a free one.
+        delay (float or callable): Seconds added to every response, or `delay(method, path)` returning them.
+
+    Attributes:
+        url (str): Base URL to use as `portal_url`.
+        hits (dict): Requests served per page.
+    """
+
+    def __init__(self, port: int = 0, delay=0):
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), PortalHandler)
+        self.server.daemon_threads = True
+        self.server.delay = delay
+        self.server.journals = {}
+        self.server.hits = {}
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/devp/siap"
+        self.thread = None
+
+    @property
+    def hits(self) -> dict:
+        return self.server.hits
+
+    def start(self):
+        self.thread = Thread(target=self.server.serve_forever, name="portal", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,59 @@
+"""Remaining-time budget of a run.
+
+On AWS Lambda the budget comes from `context.get_remaining_time_in_millis()`; locally it can be
+set with the `run_budget` environment variable (seconds). Waits and retries are clamped to the
+budget, so the bot stops and records its progress before the Lambda timeout kills it.
+"""
+from time import monotonic
+import os
+
+# Detik yang disisakan untuk run state, laporan dan menutup browser
+DEFAULT_MARGIN = 15
+
+
+class DeadlineExceeded(Exception):
+    """Raised when the run has no time left to safely continue."""
+
+
+class Deadline:
+    """
+    Deadline of a run, measured with a monotonic clock.
+
+    Parameters:
+        seconds (float): Time available from now. None means no deadline.
+        margin (float): Seconds reserved at the end of the budget.
+    """
+
+    def __init__(self, seconds: float = None, margin: float = DEFAULT_MARGIN):
+        self.margin = margin
+        self.expires = None if seconds is None else monotonic() + seconds
+
+    @classmethod
+    def from_context(cls, context=None, margin: float = DEFAULT_MARGIN):
+        """Create the deadline from a Lambda context, or from `run_budget` when running locally."""
+        if context is not None and hasattr(context, "get_remaining_time_in_millis"):
+            return cls(context.get_remaining_time_in_millis() / 1000, margin)
+        budget = os.getenv("run_budget")
+        return cls(float(budget) if budget else None, margin)
+
+    def remaining(self) -> float:
+        """Seconds left before the margin, `inf` when there is no deadline."""
+        if self.expires is None:
+            return float("inf")
+        return self.expires - monotonic() - self.margin
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def allows(self, seconds: float) -> bool:
+        """Return True if an operation expected to take `seconds` still fits in the budget."""
+        return self.remaining() >= seconds
+
+    def clamp(self, timeout: float, minimum: float = 1) -> float:
+        """Limit a wait timeout to the remaining budget (but never below `minimum`)."""
+        return max(min(timeout, self.remaining()), minimum)
+
+    def check(self):
+        """Raise `DeadlineExceeded` if the budget is used up."""
+        if self.expired():
+            raise DeadlineExceeded("Sisa waktu eksekusi habis")
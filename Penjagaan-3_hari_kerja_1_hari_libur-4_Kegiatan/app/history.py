@@ -0,0 +1,366 @@
+"""Append-only history of submitted journal entries with reporting queries.
+
+Every entry `BOT.start()` tries to submit is appended with its timings, attempts and outcome
+to a SQLite database indexed by NIP, date and SKP code, so reports over years of data for
+hundreds of employees stay index lookups.
+The timing of every page the bot loads (see `app/navtiming.py`) is kept in the same database
+to trend portal latency apart from bot overhead, and so is the latency of every wait step the
+adaptive timeouts are derived from (see `app/timeouts.py`).
+
+Usage:
+    python -m app.history skp --nip 199001012020121001 --year 2024
+    python -m app.history missing --nip 199001012020121001 --start 2024-01-01 --end 2024-01-31
+    python -m app.history latency --nip 199001012020121001 --start 2024-01-01 --end 2024-12-31
+    python -m app.history export --format csv --output history.csv
+    python -m app.history portal --start 2024-01-01 --end 2024-01-31
+    python -m app.history steps --start 2024-01-01
+"""
+from datetime import date, datetime, timedelta
+import argparse
+import csv
+import json
+import logging
+import math
+import sys
+
+from .runstate import connect
+from .state import state_path
+
+historylog = logging.getLogger(__name__)
+
+COLUMNS = ("id", "nip", "tanggal", "idx", "skp_value", "skp_label", "kegiatan", "mulai", "selesai",
+           "jumlah_diselesaikan", "attempts", "started_at", "duration", "outcome", "run_id")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS submissions (
+    id INTEGER PRIMARY KEY,
+    nip TEXT NOT NULL,
+    tanggal TEXT NOT NULL,
+    idx INTEGER,
+    skp_value TEXT,
+    skp_label TEXT,
+    kegiatan TEXT,
+    mulai INTEGER,
+    selesai INTEGER,
+    jumlah_diselesaikan INTEGER,
+    attempts INTEGER,
+    started_at REAL,
+    duration REAL,
+    outcome TEXT NOT NULL,
+    run_id TEXT
+);
+CREATE INDEX IF NOT EXISTS submissions_nip_tanggal ON submissions (nip, tanggal, outcome, duration);
+CREATE INDEX IF NOT EXISTS submissions_nip_skp ON submissions (nip, skp_value, tanggal);
+CREATE INDEX IF NOT EXISTS submissions_tanggal ON submissions (tanggal, outcome);
+CREATE TABLE IF NOT EXISTS navigations (
+    id INTEGER PRIMARY KEY,
+    run_id TEXT,
+    nip TEXT NOT NULL,
+    tanggal TEXT NOT NULL,
+    page TEXT,
+    phase TEXT,
+    wall REAL,
+    ttfb REAL,
+    load REAL,
+    bot REAL,
+    script REAL,
+    heap_mb REAL
+);
+CREATE INDEX IF NOT EXISTS navigations_tanggal ON navigations (tanggal, page);
+CREATE TABLE IF NOT EXISTS steps (
+    id INTEGER PRIMARY KEY,
+    run_id TEXT,
+    nip TEXT NOT NULL,
+    tanggal TEXT NOT NULL,
+    step TEXT NOT NULL,
+    seconds REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS steps_step ON steps (step, tanggal, seconds);
+"""
+
+# Kolom timing navigasi (milidetik) yang diringkas oleh portal_latency
+NAV_METRICS = ("wall", "ttfb", "load", "bot")
+
+# Outcome yang dihitung sebagai kegiatan terisi
+SUCCESS = ("submitted", "verified")
+
+
+def percentile(values: list, q: float) -> float:
+    """Return the `q` percentile (0-100) of sorted `values` using the nearest-rank method.
+
+    Example:
+        >>> percentile([1, 2, 3, 4, 5, 6, 7, 8, 9, 10], 95)
+        10
+    """
+    if not values:
+        return None
+    return values[max(0, math.ceil(q / 100 * len(values)) - 1)]
+
+
+class History:
+    """
+    SQLite store of submitted entries.
+
+    Parameters:
+        path (str): Location of the database. Defaults to `history.db` in the state directory.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path or state_path("history.db")
+        self.conn = connect(self.path)
+        self.conn.executescript(SCHEMA)
+
+    def record(self, nip: str, tanggal, idx: int, entry, attempts: int, started_at: float,
+               duration: float, outcome: str, run_id: str = None) -> int:
+        """Append one submission attempt of `entry` and return its row id."""
+        cursor = self.conn.execute(
+            "INSERT INTO submissions (nip, tanggal, idx, skp_value, skp_label, kegiatan, mulai, selesai, "
+            "jumlah_diselesaikan, attempts, started_at, duration, outcome, run_id) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (nip, str(tanggal), idx, entry.skp_value, entry.skp_label, entry.kegiatan, entry.mulai,
+             entry.selesai, entry.jumlah_diselesaikan, attempts, started_at, duration, outcome, run_id))
+        return cursor.lastrowid
+
+    def verify(self, nip: str, tanggal, indexes: list):
+        """Mark the submitted entries `indexes` of `nip` on `tanggal` as verified."""
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE submissions SET outcome = 'verified' "
+                "WHERE nip = ? AND tanggal = ? AND idx = ? AND outcome = 'submitted'",
+                [(nip, str(tanggal), i) for i in indexes])
+
+    def record_navigations(self, nip: str, tanggal, run_id: str, navigations: list):
+        """Append the navigation timing records of a run (see `app/navtiming.py`)."""
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO navigations (run_id, nip, tanggal, page, phase, wall, ttfb, load, bot, script, heap_mb) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(run_id, nip, str(tanggal), nav.get("page"), nav.get("phase"), nav.get("wall"), nav.get("ttfb"),
+                  nav.get("load"), nav.get("bot"), nav.get("script"), nav.get("heap_mb")) for nav in navigations])
+
+    def record_steps(self, nip: str, tanggal, run_id: str, samples: list):
+        """Append the `(step, seconds)` latencies of the waits of a run (see `app/timeouts.py`)."""
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO steps (run_id, nip, tanggal, step, seconds) VALUES (?, ?, ?, ?, ?)",
+                [(run_id, nip, str(tanggal), step, seconds) for step, seconds in samples])
+
+    def step_latency(self, since, q: float = 99) -> dict:
+        """
+        Return step to `(samples, q percentile in seconds)` of the waits of every employee since `since`.
+
+        The percentile (nearest rank, like `percentile`) is looked up in SQLite, only one value per
+        step is read into Python.
+        """
+        counts = self.conn.execute("SELECT step, COUNT(*) FROM steps WHERE tanggal >= ? GROUP BY step",
+                                   (str(since),)).fetchall()
+        result = {}
+        for step, count in counts:
+            rank = max(0, math.ceil(q / 100 * count) - 1)
+            value, = self.conn.execute(
+                "SELECT seconds FROM steps WHERE step = ? AND tanggal >= ? ORDER BY seconds LIMIT 1 OFFSET ?",
+                (step, str(since), rank)).fetchone()
+            result[step] = (count, value)
+        return result
+
+    def portal_latency(self, start, end, page: str = None, q: float = 50) -> list:
+        """
+        Returns the `q` percentile of the navigation timings per day, separating the portal (`ttfb`,
+        `load`) from the bot overhead (`bot`) in the wall time of `driver.get`.
+
+        Returns:
+            list: Dicts with `tanggal`, `navigasi` and the percentile of each of `NAV_METRICS` in ms.
+        """
+        sql = f"SELECT tanggal, {', '.join(NAV_METRICS)} FROM navigations WHERE tanggal BETWEEN ? AND ?"
+        params = [str(start), str(end)]
+        if page:
+            sql += " AND page = ?"
+            params.append(page)
+        days = {}
+        for tanggal, *values in self.conn.execute(sql, params):
+            days.setdefault(tanggal, []).append(values)
+        result = []
+        for tanggal, rows in sorted(days.items()):
+            item = {"tanggal": tanggal, "navigasi": len(rows)}
+            for n, name in enumerate(NAV_METRICS):
+                values = sorted(row[n] for row in rows if row[n] is not None)
+                item[name] = percentile(values, q)
+            result.append(item)
+        return result
+
+    def monthly_skp_totals(self, nip: str, year: int) -> list:
+        """
+        Returns the number of entries and the sum of `jumlah_diselesaikan` per month and SKP code.
+
+        Returns:
+            list: Dicts with `bulan` ('YYYY-MM'), `skp_value`, `skp_label`, `kegiatan` and `jumlah`.
+        """
+        cursor = self.conn.execute(
+            "SELECT substr(tanggal, 1, 7) AS bulan, skp_value, max(skp_label), count(*), "
+            "coalesce(sum(jumlah_diselesaikan), 0) FROM submissions "
+            "WHERE nip = ? AND skp_value IS NOT NULL AND tanggal BETWEEN ? AND ? AND outcome IN (?, ?) "
+            "GROUP BY bulan, skp_value ORDER BY bulan, skp_value",
+            (nip, f"{year}-01-01", f"{year}-12-31", *SUCCESS))
+        return [{"bulan": bulan, "skp_value": value, "skp_label": label, "kegiatan": n, "jumlah": jumlah}
+                for bulan, value, label, n, jumlah in cursor]
+
+    def filled_days(self, nip: str, start, end) -> set:
+        """Return the dates ('YYYY-MM-DD') between `start` and `end` with at least one successful entry."""
+        cursor = self.conn.execute(
+            "SELECT DISTINCT tanggal FROM submissions "
+            "WHERE nip = ? AND tanggal BETWEEN ? AND ? AND outcome IN (?, ?)",
+            (nip, str(start), str(end), *SUCCESS))
+        return {row[0] for row in cursor}
+
+    def missing_days(self, nip: str, start, end, days=None) -> list:
+        """
+        Returns the days between `start` and `end` on which `nip` has no successful entry.
+
+        Parameters:
+            days (iterable): The days that should have been filled. Defaults to the days on which
+                any employee in the history has a successful entry, i.e. the days the bot ran.
+
+        Returns:
+            list: Sorted dates as 'YYYY-MM-DD' strings.
+        """
+        if days is None:
+            cursor = self.conn.execute(
+                "SELECT DISTINCT tanggal FROM submissions WHERE tanggal BETWEEN ? AND ? AND outcome IN (?, ?)",
+                (str(start), str(end), *SUCCESS))
+            days = [row[0] for row in cursor]
+        filled = self.filled_days(nip, start, end)
+        return sorted(str(day) for day in days if str(day) not in filled)
+
+    def weekly_latency(self, nip: str, start, end, q: float = 95) -> list:
+        """
+        Returns the `q` percentile of the submission duration per ISO week.
+
+        Returns:
+            list: Dicts with `minggu` ('YYYY-Www'), `kegiatan` and `p{q}` in seconds.
+        """
+        cursor = self.conn.execute(
+            "SELECT tanggal, duration FROM submissions "
+            "WHERE nip = ? AND tanggal BETWEEN ? AND ? AND outcome IN (?, ?) AND duration IS NOT NULL",
+            (nip, str(start), str(end), *SUCCESS))
+        weeks = {}
+        for tanggal, duration in cursor:
+            year, week, _ = date.fromisoformat(tanggal).isocalendar()
+            weeks.setdefault(f"{year}-W{week:02d}", []).append(duration)
+        key = f"p{q:g}"
+        return [{"minggu": minggu, "kegiatan": len(durations), key: round(percentile(sorted(durations), q), 3)}
+                for minggu, durations in sorted(weeks.items())]
+
+    def entry_duration(self, nip: str, q: float = 95, since=None) -> float:
+        """Return the `q` percentile of the successful submission duration of `nip` in seconds, or None."""
+        since = since or date.today() - timedelta(days=60)
+        cursor = self.conn.execute(
+            "SELECT duration FROM submissions "
+            "WHERE nip = ? AND tanggal >= ? AND outcome IN (?, ?) AND duration IS NOT NULL ORDER BY duration",
+            (nip, str(since), *SUCCESS))
+        return percentile([row[0] for row in cursor], q)
+
+    def rows(self, nip: str = None, start=None, end=None):
+        """Yield the stored submissions as dicts, optionally filtered by NIP and date range."""
+        where, params = [], []
+        if nip:
+            where.append("nip = ?"); params.append(nip)
+        if start:
+            where.append("tanggal >= ?"); params.append(str(start))
+        if end:
+            where.append("tanggal <= ?"); params.append(str(end))
+        sql = f"SELECT {', '.join(COLUMNS)} FROM submissions"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        for row in self.conn.execute(sql + " ORDER BY nip, tanggal, idx, id", params):
+            yield dict(zip(COLUMNS, row))
+
+    def export(self, out, fmt: str = "csv", **filters) -> int:
+        """
+        Write the stored submissions to the file object `out` as CSV or JSON.
+
+        Returns:
+            int: The number of rows written.
+        """
+        n = 0
+        if fmt == "csv":
+            writer = csv.DictWriter(out, fieldnames=COLUMNS)
+            writer.writeheader()
+            for row in self.rows(**filters):
+                writer.writerow(row)
+                n += 1
+        elif fmt == "json":
+            rows = list(self.rows(**filters))
+            json.dump(rows, out, indent=1)
+            n = len(rows)
+        else:
+            raise ValueError(f"Format export tidak dikenal: {fmt}")
+        return n
+
+    def close(self):
+        self.conn.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.history", description="Riwayat pengisian jurnal harian")
+    parser.add_argument("--db", help="lokasi history.db, default di state_dir")
+    sub = parser.add_subparsers(dest="name", required=True)
+
+    p = sub.add_parser("skp", help="total kegiatan per bulan dan SKP")
+    p.add_argument("--nip", required=True)
+    p.add_argument("--year", type=int, default=datetime.now().year)
+
+    for name, help in (("missing", "hari yang belum terisi"), ("latency", "p95 durasi pengisian per minggu")):
+        p = sub.add_parser(name, help=help)
+        p.add_argument("--nip", required=True)
+        p.add_argument("--start", default=str(date.today() - timedelta(days=30)))
+        p.add_argument("--end", default=str(date.today()))
+
+    p = sub.add_parser("portal", help="median timing navigasi portal per hari (ttfb, load, overhead bot)")
+    p.add_argument("--start", default=str(date.today() - timedelta(days=30)))
+    p.add_argument("--end", default=str(date.today()))
+    p.add_argument("--page", help="contoh skp_journal.php")
+    p.add_argument("--q", type=float, default=50, help="persentil")
+
+    p = sub.add_parser("steps", help="persentil latensi setiap langkah tunggu dan timeout turunannya")
+    p.add_argument("--start", default=str(date.today() - timedelta(days=30)))
+    p.add_argument("--q", type=float, help="persentil, default timeout_quantile")
+
+    p = sub.add_parser("export", help="export riwayat ke CSV/JSON")
+    p.add_argument("--format", choices=("csv", "json"), default="csv")
+    p.add_argument("--output", help="file tujuan, default stdout")
+    p.add_argument("--nip")
+    p.add_argument("--start")
+    p.add_argument("--end")
+
+    args = parser.parse_args(argv)
+    history = History(args.db)
+    if args.name == "export":
+        out = open(args.output, "w", newline="") if args.output else sys.stdout
+        try:
+            n = history.export(out, args.format, nip=args.nip, start=args.start, end=args.end)
+        finally:
+            if args.output:
+                out.close()
+        print(f"{n} baris diexport", file=sys.stderr)
+        return
+    if args.name == "skp":
+        result = history.monthly_skp_totals(args.nip, args.year)
+    elif args.name == "missing":
+        result = history.missing_days(args.nip, args.start, args.end)
+    elif args.name == "portal":
+        result = history.portal_latency(args.start, args.end, args.page, args.q)
+    elif args.name == "steps":
+        from .timeouts import StepTimeouts
+
+        timeouts = StepTimeouts()
+        q = args.q or timeouts.quantile
+        result = [{"step": step, "sampel": count, f"p{q:g}": round(value, 3), "timeout": round(timeouts.derive(value), 1)
+                   if count >= timeouts.min_samples else None}
+                  for step, (count, value) in sorted(history.step_latency(args.start, q).items())]
+    else:
+        result = history.weekly_latency(args.nip, args.start, args.end)
+    print(json.dumps(result, indent=1))
+
+
+if __name__ == "__main__":
+    main()
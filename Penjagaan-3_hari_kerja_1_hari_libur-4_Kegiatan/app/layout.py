@@ -0,0 +1,10 @@
+"""Sheet layout of this variant: 3 hari kerja with 4 kegiatan each, then 1 hari libur."""
+from .jurnal import DayLayout, SheetLayout
+
+LAYOUT = SheetLayout(
+    days=(
+        DayLayout("Hari Kerja 1", rows=4, jitter_start=False),
+        DayLayout("Hari Kerja 2", rows=4, jitter_start=False),
+        DayLayout("Hari Kerja 3", rows=4, jitter_start=False),
+    ),
+)
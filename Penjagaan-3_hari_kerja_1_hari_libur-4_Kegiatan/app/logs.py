@@ -0,0 +1,182 @@
+"""Logging of the bot: structured records formatted and written off the calling thread.
+
+`setup_logging()` replaces the handlers of the root logger with a `QueueHandler`. The thread that
+logs, e.g. the one filling the journal, only stamps the record and puts it on a queue; a
+`QueueListener` thread formats it (JSON or text) and writes it to stderr. Records are stamped with
+the `run_id` and `nip` of the run being executed (see `bind_run`), also those of the watchdog and
+sampler threads, so every line of a run can be correlated with its report.
+
+Configured with environment variables:
+
+- `log_level`: level of the root logger, default INFO,
+- `log_levels`: per-logger levels, default `selenium=WARNING,urllib3=WARNING` so the HTTP requests
+  of every WebDriver command are not even formatted,
+- `log_format`: `json` (default on AWS Lambda) or `text`,
+- `log_sample`: DEBUG lines logged from the same place are all kept up to this count, then only
+  one in every `log_sample` (default 20, 0 keeps them all); the number skipped is added to the record.
+"""
+from contextvars import ContextVar
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
+import atexit
+import json
+import logging
+import os
+
+LEVELS = "selenium=WARNING,urllib3=WARNING"
+SAMPLE = 20
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+# Run yang sedang dijalankan thread ini, thread latar (watchdog, sampler) memakai run terakhir
+_run = ContextVar("run", default=None)
+_last_run = {}
+_listener = None
+_config = None
+
+
+def bind_run(**fields):
+    """Stamp the records logged from now on with `fields`, e.g. `run_id` and `nip`."""
+    global _last_run
+    _last_run = fields
+    _run.set(fields)
+
+
+class ContextFilter(logging.Filter):
+    """Adds the fields of the current run to every record."""
+
+    def filter(self, record):
+        for key, value in (_run.get() or _last_run).items():
+            setattr(record, key, value)
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps the first `every` DEBUG records of each logging call site, then one in every `every`.
+
+    Parameters:
+        every (int): 0 keeps every record.
+    """
+
+    def __init__(self, every: int = SAMPLE):
+        super().__init__()
+        self.every = every
+        self.counts = {}
+
+    def filter(self, record):
+        if self.every <= 0 or record.levelno > logging.DEBUG:
+            return True
+        key = (record.pathname, record.lineno)
+        n = self.counts.get(key, 0) + 1
+        self.counts[key] = n
+        if n <= self.every:
+            return True
+        if n % self.every:
+            return False
+        record.skipped = self.every - 1
+        return True
+
+
+class RecordQueueHandler(QueueHandler):
+    """Puts records on the queue with their message merged and the traceback kept apart."""
+
+    def prepare(self, record):
+        # SATU-SATUNYA HANDLER DI ROOT: RECORD TIDAK PERLU DISALIN
+        record.msg, record.args = record.getMessage(), None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats a record as one JSON object per line."""
+
+    FIELDS = ("run_id", "nip", "skipped")
+
+    def format(self, record):
+        data = {
+            "time": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key in self.FIELDS:
+            value = getattr(record, key, None)
+            if value is not None:
+                data[key] = value
+        if record.exc_text:
+            data["exception"] = record.exc_text
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+def parse_levels(text: str) -> dict:
+    """Parse 'logger=LEVEL,...' into a dict."""
+    levels = {}
+    for item in filter(None, (part.strip() for part in text.split(","))):
+        name, _, level = item.partition("=")
+        levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def setup_logging(level: str = None, levels: str = None, fmt: str = None, sample: int = None, stream=None):
+    """
+    Route every record through a queue to a listener thread, replacing the root handlers.
+
+    The arguments default to the `log_level`, `log_levels`, `log_format` and `log_sample`
+    environment variables, `stream` to stderr. Calling it again reconfigures the levels and the listener.
+    """
+    global _listener, _config
+    level = level or os.getenv("log_level", "INFO")
+    levels = parse_levels(levels if levels is not None else os.getenv("log_levels", LEVELS))
+    fmt = fmt or os.getenv("log_format") or ("json" if os.getenv("AWS_LAMBDA_FUNCTION_NAME") else "text")
+    sample = sample if sample is not None else int(os.getenv("log_sample", SAMPLE))
+    _config = {"level": level, "levels": ",".join(f"{name}={value}" for name, value in levels.items()),
+               "fmt": fmt, "sample": sample}
+
+    if _listener is not None:
+        _listener.stop()
+    output = logging.StreamHandler(stream)
+    output.setFormatter(JsonFormatter() if fmt == "json" else logging.Formatter(TEXT_FORMAT))
+    queue = SimpleQueue()
+    handler = RecordQueueHandler(queue)
+    handler.addFilter(SamplingFilter(sample))
+    handler.addFilter(ContextFilter())
+    _listener = QueueListener(queue, output)
+    _listener.start()
+
+    root = logging.getLogger()
+    for old in root.handlers[:]:
+        root.removeHandler(old)
+    root.addHandler(handler)
+    root.setLevel(level.upper())
+    for name, value in levels.items():
+        logging.getLogger(name).setLevel(value)
+
+
+def flush_logs():
+    """Write every queued record before returning, e.g. before a Lambda invocation is frozen."""
+    if _listener is not None:
+        _listener.stop()
+        _listener.start()
+
+
+def stop_logging():
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def _after_fork():
+    # THREAD LISTENER TIDAK IKUT KE PROSES ANAK (worker pipeline): BUAT ULANG
+    global _listener
+    if _listener is not None:
+        _listener = None
+        setup_logging(**_config)
+
+
+atexit.register(stop_logging)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork)
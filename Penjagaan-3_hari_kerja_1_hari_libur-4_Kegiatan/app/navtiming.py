@@ -0,0 +1,96 @@
+"""Timing of every page the bot navigates to.
+
+After `driver.get` returns, the Navigation Timing entry of the page is read with one script call
+and, on a Chrome driver, the CDP `Performance.getMetrics` counters with one more. Together with the
+wall time of `driver.get` they split a slow page into portal time (DNS, connect, time to first byte,
+download), rendering (DOM and load events, script and layout time) and bot overhead (the WebDriver
+round trip around the load). Records are attached to the run report and stored in the history so
+portal latency can be trended over time.
+
+Collection is disabled with the `nav_timing=0` environment variable.
+"""
+import logging
+import os
+
+from .watchdog import WatchdogTripped, DriverCrashed
+
+navlog = logging.getLogger(__name__)
+
+NAVIGATION_JS = """
+const n = performance.getEntriesByType('navigation')[0];
+if (!n) return null;
+return {
+  redirect: n.redirectEnd - n.redirectStart,
+  dns: n.domainLookupEnd - n.domainLookupStart,
+  connect: n.connectEnd - n.connectStart,
+  ttfb: n.responseStart - n.requestStart,
+  download: n.responseEnd - n.responseStart,
+  dom: n.domContentLoadedEventEnd - n.responseEnd,
+  load: n.loadEventEnd - n.startTime,
+  size: n.transferSize
+};
+"""
+
+# Metrik CDP kumulatif per proses, disimpan sebagai selisih terhadap navigasi sebelumnya
+CDP_DURATIONS = {"ScriptDuration": "script", "LayoutDuration": "layout", "RecalcStyleDuration": "style", "TaskDuration": "task"}
+CDP_GAUGES = {"JSHeapUsedSize": "heap_mb", "Nodes": "nodes"}
+
+
+class NavigationTimer:
+    """
+    Collects the timing record of each navigation of one driver at a time.
+
+    Parameters:
+        enabled (bool): Defaults to the `nav_timing` environment variable, enabled unless it is '0'.
+    """
+
+    def __init__(self, enabled: bool = None):
+        self.enabled = enabled if enabled is not None else os.getenv("nav_timing", "1") != "0"
+        self.driver = None
+        self.cdp = False
+        self.previous = {}
+
+    def _metrics(self, driver) -> dict:
+        if driver is not self.driver:
+            # DRIVER BARU: AKTIFKAN DOMAIN PERFORMANCE SEKALI
+            self.driver, self.previous = driver, {}
+            self.cdp = hasattr(driver, "execute_cdp_cmd")
+            if self.cdp:
+                driver.execute_cdp_cmd("Performance.enable", {})
+        if not self.cdp:
+            return {}
+        values = {m["name"]: m["value"] for m in driver.execute_cdp_cmd("Performance.getMetrics", {})["metrics"]}
+        result = {}
+        for name, key in CDP_DURATIONS.items():
+            if name in values:
+                result[key] = round((values[name] - self.previous.get(name, 0)) * 1000, 1)
+        for name, key in CDP_GAUGES.items():
+            if name in values:
+                result[key] = round(values[name] / 1048576, 1) if key == "heap_mb" else int(values[name])
+        self.previous = values
+        return result
+
+    def collect(self, driver, url: str, wall: float, phase: str = None):
+        """
+        Return the timing record of the page `driver` just loaded, or None if it cannot be read.
+
+        Parameters:
+            url (str): The requested URL, only its last path segment is kept.
+            wall (float): Seconds `driver.get` took.
+            phase (str): The report phase the navigation belongs to.
+        """
+        if not self.enabled:
+            return None
+        record = {"page": url.split("?")[0].rsplit("/", 1)[-1], "phase": phase, "wall": round(wall * 1000, 1)}
+        try:
+            timing = driver.execute_script(NAVIGATION_JS)
+            if timing:
+                record.update({key: round(value, 1) for key, value in timing.items()})
+                # WAKTU DI LUAR PEMUATAN HALAMAN: ROUND TRIP WEBDRIVER DAN OVERHEAD BOT
+                record["bot"] = round(record["wall"] - record["load"], 1) if record["load"] > 0 else None
+            record.update(self._metrics(driver))
+        except (WatchdogTripped, DriverCrashed):
+            raise
+        except Exception as e:
+            navlog.debug(f"Timing navigasi tidak dapat dibaca {repr(e)}")
+        return record
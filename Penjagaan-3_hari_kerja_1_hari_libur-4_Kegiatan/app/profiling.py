@@ -0,0 +1,161 @@
+"""On-demand profiling of whole runs.
+
+Set the `profile` environment variable to profile every `BOT.start()`:
+
+- `cprofile`: deterministic profile with `cProfile`, written as a `.prof` file (for `pstats`,
+  snakeviz, ...) and a `.txt` summary of the top functions by cumulative time,
+- `sampling`: the stack of the run is sampled every `profile_interval` seconds (default 0.005)
+  from a background thread and written as folded stacks (`.folded`, for flamegraph tools).
+  Overhead stays low even when WebDriver calls are many and short.
+
+Both modes attribute the wall-clock time spent blocked on WebDriver, Google Sheets, SMTP and the
+portal governor, added to the run report as `profile`. Artifacts are written to `profile_dir`,
+by default `/tmp` on AWS Lambda and `profiles` in the state directory elsewhere. Without `profile`
+the wrapper only reads the environment variable.
+"""
+from functools import wraps
+from threading import Event, Thread, get_ident
+from time import perf_counter
+import cProfile
+import io
+import logging
+import os
+import pstats
+import sys
+
+from .state import state_dir
+
+profilelog = logging.getLogger(__name__)
+
+# Fungsi tempat run menunggu I/O: (akhiran nama file, nama fungsi), tidak saling memanggil
+BLOCKING = {
+    "webdriver": ("selenium/webdriver/remote/remote_connection.py", ("execute",)),
+    "sheets": ("app/spreadsheet.py", ("get_sheet_row_col", "get_sheet_table_values")),
+    "smtp": ("smtplib.py", ("connect", "ehlo", "login", "sendmail", "close")),
+    "governor": ("app/governor.py", ("_wait",)),
+}
+INTERVAL = 0.005
+TOP = 40
+
+
+def category(filename: str, function: str):
+    """Return the BLOCKING category of a function, or None."""
+    filename = filename.replace(os.sep, "/")
+    for name, (suffix, functions) in BLOCKING.items():
+        if function in functions and filename.endswith(suffix):
+            return name
+    return None
+
+
+def profile_dir() -> str:
+    """Return the directory of the profile artifacts, creating it if needed."""
+    path = os.getenv("profile_dir")
+    if not path:
+        path = "/tmp" if os.getenv("AWS_LAMBDA_FUNCTION_NAME") else os.path.join(state_dir(), "profiles")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+class Sampler:
+    """Samples the stack of the thread `ident` from a background thread."""
+
+    def __init__(self, ident: int, interval: float = INTERVAL):
+        self.ident = ident
+        self.interval = interval
+        self.stacks = {}
+        self.samples = 0
+        self.stopped = Event()
+        self.thread = Thread(target=self._run, name="profiler", daemon=True)
+
+    def _run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.ident)
+            stack = []
+            while frame is not None:
+                stack.append((frame.f_code.co_filename, frame.f_code.co_name))
+                frame = frame.f_back
+            key = tuple(reversed(stack))
+            self.stacks[key] = self.stacks.get(key, 0) + 1
+            self.samples += 1
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        self.thread.join()
+
+    def blocked(self, wall: float) -> dict:
+        """Wall-clock seconds per category, from the share of samples inside its functions."""
+        counts = {}
+        for stack, n in self.stacks.items():
+            names = {category(filename, function) for filename, function in stack} - {None}
+            for name in names:
+                counts[name] = counts.get(name, 0) + n
+        return {name: round(wall * n / self.samples, 3) for name, n in counts.items()} if self.samples else {}
+
+    def write(self, path: str):
+        """Write the samples as folded stacks, one 'frame;frame;... count' line per stack."""
+        with open(path, "w") as f:
+            for stack, n in sorted(self.stacks.items(), key=lambda item: -item[1]):
+                frames = ";".join(f"{os.path.basename(filename)}:{function}" for filename, function in stack)
+                f.write(f"{frames} {n}\n")
+
+
+def blocked_cprofile(stats: pstats.Stats) -> dict:
+    """Cumulative seconds per category from a cProfile run."""
+    result = {}
+    for (filename, _, function), (_, _, _, cumulative, _) in stats.stats.items():
+        name = category(filename, function)
+        if name:
+            result[name] = round(result.get(name, 0) + cumulative, 3)
+    return result
+
+
+def profiled(method):
+    """Profile `BOT.start` according to the `profile` environment variable and attach the result to its report."""
+
+    @wraps(method)
+    def wrapper(*args, **kwargs):
+        mode = os.getenv("profile")
+        if not mode:
+            return method(*args, **kwargs)
+
+        started = perf_counter()
+        if mode == "sampling":
+            sampler = Sampler(get_ident(), float(os.getenv("profile_interval", INTERVAL)))
+            sampler.start()
+            try:
+                report = method(*args, **kwargs)
+            finally:
+                sampler.stop()
+            wall = perf_counter() - started
+            path = os.path.join(profile_dir(), f"{report.started[:10]}-{report.run_id}.folded")
+            sampler.write(path)
+            blocked = sampler.blocked(wall)
+        else:
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                report = method(*args, **kwargs)
+            finally:
+                profiler.disable()
+            wall = perf_counter() - started
+            path = os.path.join(profile_dir(), f"{report.started[:10]}-{report.run_id}.prof")
+            profiler.dump_stats(path)
+            text = io.StringIO()
+            stats = pstats.Stats(profiler, stream=text)
+            stats.sort_stats("cumulative").print_stats(TOP)
+            with open(path[:-len(".prof")] + ".txt", "w") as f:
+                f.write(text.getvalue())
+            blocked = blocked_cprofile(stats)
+
+        report.profile = {"mode": mode, "artifact": path, "wall": round(wall, 3), "blocked": blocked,
+                          "lainnya": round(wall - sum(blocked.values()), 3)}
+        profilelog.info(f"Profil run disimpan ke {path}, menunggu I/O: "
+                        + ", ".join(f"{name} {seconds:.2f}s" for name, seconds in blocked.items()))
+        # LAPORAN SUDAH DISIMPAN OLEH start(), SIMPAN ULANG DENGAN HASIL PROFIL
+        report.save()
+        return report
+
+    return wrapper
@@ -0,0 +1,182 @@
+"""Recording of the WebDriver session of a run, to reproduce a slow or flaky night offline.
+
+With the `record` environment variable set to 1 the recorder wraps the command executor of every
+driver of the run and keeps each command with its parameters, status, response value, duration,
+phase and entry, and after every `get` the HTML of the page. At the end of the run they are
+written as gzip JSON lines to `recordings/` in the state directory and the path is added to the
+run report. Pages are stored once per distinct content and long response values (screenshots,
+page sources) are cut to `record_value_limit` characters, so a run is a few hundred KB.
+
+Secrets never reach the file: the keys typed into elements (the password among them) and the
+cookie values are replaced by `REDACTED` before a command is kept. The recording still holds the
+HTML of the pages and the responses of the portal, i.e. personal data of the employee (name, NIP,
+journal entries): keep the files private and delete them once the run has been analysed.
+
+`python -m bench replay <file>` re-runs the commands against the stand-in portal with the
+recorded latencies (see `bench/replay.py`).
+"""
+from datetime import datetime
+from time import perf_counter
+import gzip
+import hashlib
+import json
+import logging
+import os
+
+from .state import state_path
+
+recorderlog = logging.getLogger(__name__)
+
+VERSION = 1
+VALUE_LIMIT = 4096
+REDACTED = "[redacted]"
+
+
+def is_ok(response) -> bool:
+    """Return True if a raw WebDriver response is not an error."""
+    return isinstance(response, dict) and response.get("status") in (None, 0, 200)
+
+
+def compact(value, limit: int = VALUE_LIMIT):
+    """Return `value` with the strings longer than `limit` cut, keeping their length."""
+    if isinstance(value, str) and len(value) > limit:
+        return f"{value[:limit]}...[{len(value)}]"
+    if isinstance(value, dict):
+        return {key: compact(item, limit) for key, item in value.items()}
+    if isinstance(value, list):
+        return [compact(item, limit) for item in value]
+    return value
+
+
+def redact(command: str, params: dict, value=None) -> tuple:
+    """Return `params` and the response `value` of a command without the typed keys and cookie values."""
+    if command == "sendKeysToElement":
+        params = dict(params, text=REDACTED, value=list(REDACTED))
+    elif command == "addCookie" and isinstance(params.get("cookie"), dict):
+        params = dict(params, cookie=dict(params["cookie"], value=REDACTED))
+    elif command in ("getAllCookies", "getCookie"):
+        cookies = value if isinstance(value, list) else [value]
+        cookies = [dict(cookie, value=REDACTED) if isinstance(cookie, dict) else cookie for cookie in cookies]
+        value = cookies if isinstance(value, list) else cookies[0]
+    return params, value
+
+
+class SessionRecorder:
+    """
+    Records the commands of the drivers it is installed on.
+
+    Parameters:
+        enabled (bool): Defaults to the `record` environment variable, disabled unless it is '1'.
+        context (callable): Returns `(phase, entry)` for the command being executed.
+    """
+
+    def __init__(self, enabled: bool = None, context=None):
+        self.enabled = enabled if enabled is not None else os.getenv("record", "0") == "1"
+        self.context = context or (lambda: (None, None))
+        self.limit = int(os.getenv("record_value_limit", VALUE_LIMIT))
+        self.reset()
+
+    def reset(self):
+        self.records = []
+        self.pages = {}
+        self.started = perf_counter()
+        self.started_at = datetime.now().isoformat(timespec="seconds")
+
+    def install(self, driver):
+        """Record every command of `driver` from now on."""
+        if not self.enabled:
+            return
+        executor = driver.command_executor
+        execute = executor.execute
+
+        def recorded(command, params):
+            started = perf_counter()
+            try:
+                response = execute(command, params)
+            except Exception as e:
+                self.add(command, params, started, perf_counter() - started, error=repr(e))
+                raise
+            seconds = perf_counter() - started
+            page = None
+            if command == "get" and is_ok(response):
+                # HTML HALAMAN DIAMBIL LANGSUNG DARI EXECUTOR, TIDAK DIHITUNG SEBAGAI PERINTAH BOT
+                try:
+                    source = execute("getPageSource", {"sessionId": params.get("sessionId")})
+                    if is_ok(source):
+                        page = self.add_page(source.get("value") or "")
+                except Exception as e:
+                    recorderlog.debug(f"HTML halaman tidak dapat direkam {repr(e)}")
+            self.add(command, params, started, seconds, response=response, page=page)
+            return response
+
+        executor.execute = recorded
+
+    def add_page(self, html: str) -> str:
+        """Store the HTML of a page once and return its key."""
+        key = hashlib.sha1(html.encode()).hexdigest()[:16]
+        self.pages.setdefault(key, html)
+        return key
+
+    def add(self, command: str, params: dict, started: float, seconds: float, response=None,
+            error: str = None, page: str = None):
+        phase, entry = self.context()
+        # KATA SANDI DAN COOKIE SESI TIDAK PERNAH DISIMPAN
+        params, value = redact(command, {key: item for key, item in (params or {}).items() if key != "sessionId"},
+                               response.get("value") if isinstance(response, dict) else None)
+        record = {
+            "t": round(started - self.started, 4),
+            "cmd": command,
+            "params": compact(params, self.limit),
+            "s": round(seconds, 4),
+            "phase": phase,
+            "entry": entry,
+        }
+        if isinstance(response, dict):
+            record["status"] = response.get("status")
+            record["value"] = compact(value, self.limit)
+        if error is not None:
+            record["error"] = error
+        if page is not None:
+            record["page"] = page
+        self.records.append(record)
+
+    def save(self, name: str, portal_url: str = None) -> str:
+        """
+        Write the recording as `recordings/<name>.jsonl.gz` and return the path, None when nothing was recorded.
+
+        The first line is the header (`version`, `started`, `portal_url`, number of `commands`),
+        then one line per distinct page (`page`, `html`) and one per command.
+        """
+        if not self.enabled or not self.records:
+            return None
+        path = state_path("recordings", f"{name}.jsonl.gz")
+        header = {"version": VERSION, "started": self.started_at, "portal_url": portal_url,
+                  "commands": len(self.records), "seconds": round(perf_counter() - self.started, 3)}
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            f.write(json.dumps(header) + "\n")
+            for key, html in self.pages.items():
+                f.write(json.dumps({"page": key, "html": html}, ensure_ascii=False) + "\n")
+            for record in self.records:
+                f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        recorderlog.info(f"Sesi WebDriver ({len(self.records)} perintah) direkam ke {path}")
+        self.reset()
+        return path
+
+
+def load(path: str):
+    """
+    Read a recording written by `SessionRecorder.save`.
+
+    Returns:
+        tuple: The header (dict), the command records (list) and the pages (dict of key to HTML).
+    """
+    records, pages = [], {}
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        header = json.loads(f.readline())
+        for line in f:
+            item = json.loads(line)
+            if "html" in item:
+                pages[item["page"]] = item["html"]
+            else:
+                records.append(item)
+    return header, records, pages
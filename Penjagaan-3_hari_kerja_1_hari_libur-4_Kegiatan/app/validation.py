@@ -0,0 +1,136 @@
+"""Validation of a day's plan before the browser is started.
+
+Every check works on the already parsed ``Entry`` objects, so problems in the sheet
+are found (and repaired where that is safe) without launching Chrome or logging in.
+"""
+
+# Batas waktu dalam menit sejak tengah malam
+DAY_END = 24 * 60 - 1
+
+ERROR = "error"
+REPAIRED = "repaired"
+WARNING = "warning"
+
+
+class Issue:
+    """A problem found in the plan.
+
+    Attributes:
+        level (str): 'error' aborts the run, 'repaired' was fixed in place, 'warning' is informational.
+        row (int): The 0-based sheet row of the entry, if any.
+        field (str): The entry field the issue is about.
+        message (str): Description of the problem.
+    """
+    __slots__ = ("level", "row", "field", "message")
+
+    def __init__(self, level: str, row, field: str, message: str):
+        self.level = level
+        self.row = row
+        self.field = field
+        self.message = message
+
+    def to_dict(self) -> dict:
+        return {"level": self.level, "row": self.row, "field": self.field, "message": self.message}
+
+    def __str__(self):
+        where = f"baris {self.row + 1}" if self.row is not None else "jurnal"
+        return f"[{self.level}] {where} {self.field}: {self.message}"
+
+    __repr__ = __str__
+
+
+def check_fields(entries: list) -> list:
+    """Check the format of every field that is typed into the form."""
+    issues = []
+    for entry in entries:
+        if not str(entry.kegiatan or "").strip():
+            issues.append(Issue(ERROR, entry.row, "kegiatan", "kegiatan kosong"))
+        if entry.jumlah_diselesaikan is None:
+            issues.append(Issue(ERROR, entry.row, "jumlah_diselesaikan", "jumlah diselesaikan bukan angka"))
+        elif entry.jumlah_diselesaikan < 1:
+            issues.append(Issue(ERROR, entry.row, "jumlah_diselesaikan", "jumlah diselesaikan harus lebih dari 0"))
+    return issues
+
+
+def check_times(entries: list, repair: bool = True) -> list:
+    """Check that every entry has a valid time range within the day.
+
+    End times pushed past 23:59 (e.g. by the random minutes) are clamped when `repair` is set.
+    """
+    issues = []
+    for entry in entries:
+        if entry.mulai is None:
+            issues.append(Issue(ERROR, entry.row, "mulai", "jam/menit mulai tidak valid"))
+            continue
+        if entry.selesai is None:
+            issues.append(Issue(ERROR, entry.row, "selesai", "jam/menit selesai tidak valid"))
+            continue
+        if entry.selesai > DAY_END and repair:
+            entry.selesai = DAY_END
+            issues.append(Issue(REPAIRED, entry.row, "selesai", "waktu selesai dibatasi menjadi 23:59"))
+        if entry.selesai <= entry.mulai:
+            issues.append(Issue(ERROR, entry.row, "selesai",
+                                f"waktu selesai {entry.jam_selesai}:{entry.menit_selesai} tidak setelah waktu mulai {entry.jam_mulai}:{entry.menit_mulai}"))
+    return issues
+
+
+def check_overlaps(entries: list, repair: bool = True) -> list:
+    """Detect overlapping entries with a single pass over the entries sorted by start time.
+
+    When `repair` is set and an entry ends after the next one starts, its end is moved back
+    to the start of the next entry as long as it still ends after it starts.
+    """
+    issues = []
+    timed = sorted((e for e in entries if e.mulai is not None and e.selesai is not None), key=lambda e: e.mulai)
+    for prev, nxt in zip(timed, timed[1:]):
+        if nxt.mulai >= prev.selesai:
+            continue
+        if repair and prev.mulai < nxt.mulai:
+            prev.selesai = nxt.mulai
+            issues.append(Issue(REPAIRED, prev.row, "selesai",
+                                f"waktu selesai dimajukan ke {prev.jam_selesai}:{prev.menit_selesai} agar tidak bertumpuk dengan baris {nxt.row + 1}"))
+        else:
+            issues.append(Issue(ERROR, prev.row, "waktu", f"bertumpuk dengan baris {nxt.row + 1}"))
+    return issues
+
+
+def check_skp(entries: list, catalog, final: bool = False) -> list:
+    """Check that every SKP label resolves in the catalog.
+
+    Before login (`final` False) the cached catalog may be missing or stale, so the check is
+    deferred: the catalog is scraped again after login and the labels checked with `final` set,
+    only then an unknown label is an error.
+    """
+    if not final and (catalog is None or len(catalog) == 0):
+        return [Issue(WARNING, None, "skp", "katalog SKP belum tersedia, SKP diperiksa setelah login")]
+    if not final:
+        return [Issue(WARNING, entry.row, "skp",
+                      f"SKP '{entry.skp_label}' belum ada di katalog SKP tersimpan, diperiksa lagi setelah login")
+                for entry in entries if entry.skp_value is None]
+    return [Issue(ERROR, entry.row, "skp",
+                  f"SKP '{entry.skp_label}' tidak ditemukan di katalog SKP ({catalog.path})")
+            for entry in entries if entry.skp_value is None]
+
+
+def validate_plan(entries: list, catalog=None, repair: bool = True) -> list:
+    """
+    Validate the whole day's plan up front.
+
+    Parameters:
+        entries (list): The ``Entry`` objects to be submitted, with their final times.
+        catalog (SkpCatalog): The SKP catalog the entries were resolved with.
+        repair (bool): Fix safe problems (end times) in place instead of reporting them as errors.
+
+    Returns:
+        list: The ``Issue`` objects found. The plan may only be submitted if none has level 'error'.
+    """
+    issues = check_fields(entries)
+    issues += check_times(entries, repair)
+    issues += check_overlaps(entries, repair)
+    issues += check_skp(entries, catalog)
+    return issues
+
+
+def has_errors(issues: list) -> bool:
+    """Return True if any issue aborts the run."""
+    return any(issue.level == ERROR for issue in issues)
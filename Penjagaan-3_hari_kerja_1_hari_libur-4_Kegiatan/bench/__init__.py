@@ -0,0 +1 @@
+"""Offline benchmarks for the journal bot. Run with ``python -m bench <name>``."""
@@ -0,0 +1,70 @@
+"""WebDriver command budget of the bot against the stand-in portal.
+
+Logs in, fills `entries` journal entries and reads the journal table with the bot's own methods,
+counting every WebDriver command. A change in `app/bot.py` that adds round trips shows up as a
+budget overrun, and `python -m bench commands` then exits with status 1.
+
+The default budgets are the command counts of the current helpers with a small margin. A
+`wait_element_*` call is 3 commands (find, displayed, enabled) plus a second find and the action;
+a select adds 5 more (tag name, multiple, options, selected, enabled) before its click, and every
+page load adds the navigation timing calls of `app/navtiming.py`.
+"""
+import os
+
+from app.report import RunReport
+from bench.portal import StandInPortal
+
+LOGIN_BUDGET = 30
+ENTRY_BUDGET = 80
+TABLE_BUDGET = 10
+
+
+def run(entries: int = 3, chrome: str = None, chromedriver: str = None, max_login: int = LOGIN_BUDGET,
+        max_entry: int = ENTRY_BUDGET, max_table: int = TABLE_BUDGET) -> dict:
+    """Run the scenario once and check the command counts against the budgets.
+
+    Returns:
+        dict: The counter summary, the measured counts, the budgets and the `exceeded` ones.
+    """
+    if chrome:
+        os.environ["chrome_binary"] = chrome
+    if chromedriver:
+        os.environ["chromedriver"] = chromedriver
+    from app.bot import BOT
+
+    with StandInPortal() as portal:
+        bot = BOT(server="lambda", username="199001012020121001", password="rahasia")
+        bot.portal_url = portal.url
+        bot.send_email = lambda **kwargs: None
+        bot.login_pause = 0
+        bot.report = RunReport(nip=bot.username)
+        try:
+            with bot.report.phase("browser"):
+                bot.launch()
+            with bot.report.phase("login"):
+                if not bot.login():
+                    raise RuntimeError("login ke portal tiruan gagal")
+            with bot.report.phase("isi_jurnal"):
+                for i in range(entries):
+                    with bot.watchdog.entry(i):
+                        if not bot.fill_jurnal("07", f"{i:02d}", "08", "10", 1, "1", f"Kegiatan tiruan {i}", 1):
+                            raise RuntimeError(f"kegiatan {i} tidak tersimpan")
+            with bot.report.phase("verifikasi"):
+                rows = bot.baca_tabel_jurnal()
+        finally:
+            bot.close()
+
+    counter = bot.perintah
+    measured = {
+        "login": counter.total(phase="login"),
+        "entry": max(counter.total(entry=i) for i in range(entries)) if entries else 0,
+        "table": counter.total(phase="verifikasi"),
+    }
+    budget = {"login": max_login, "entry": max_entry, "table": max_table}
+    return {
+        "rows": len(rows),
+        "measured": measured,
+        "budget": budget,
+        "exceeded": [name for name in budget if measured[name] > budget[name]],
+        "commands": counter.summary(),
+    }
@@ -0,0 +1,45 @@
+"""Throughput of the fan-out orchestrator against a stubbed worker."""
+import random
+import threading
+import time
+
+from app.orchestrator import LocalInvoker, Orchestrator
+
+
+def stub_worker(seconds: float, fail_rate: float, seed: int = 0):
+    """Return a worker handler that takes `seconds` per employee and fails the login of a share of them."""
+    rnd = random.Random(seed)
+    lock = threading.Lock()
+
+    def handler(payload, context):
+        results = {}
+        for nip in payload["nips"]:
+            time.sleep(seconds)
+            with lock:
+                failed = rnd.random() < fail_rate
+            results[nip] = "login_gagal" if failed else "selesai"
+        return {"results": results}
+
+    return handler
+
+
+def run(employees: int = 200, workers: tuple = (1, 2, 4, 8, 16), seconds: float = 0.005,
+        fail_rate: float = 0.05) -> dict:
+    """Process a roster of `employees` with each number of `workers`.
+
+    Returns:
+        dict: Per worker count the wall time, throughput, speedup against one worker, rounds and failures.
+    """
+    nips = [f"1990{i:014d}" for i in range(employees)]
+    result, base = {}, None
+    for n in workers:
+        summary = Orchestrator(LocalInvoker(stub_worker(seconds, fail_rate)), shards=n).run(nips)
+        base = base or summary["durasi"]
+        result[n] = {
+            "durasi": summary["durasi"],
+            "pegawai_per_detik": round(employees / summary["durasi"], 1),
+            "speedup": round(base / summary["durasi"], 2),
+            "rounds": summary["rounds"],
+            "failed": len(summary["failed"]),
+        }
+    return result
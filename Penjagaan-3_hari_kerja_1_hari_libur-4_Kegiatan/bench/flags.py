@@ -0,0 +1,131 @@
+"""Chrome launch-flag matrix against the stand-in portal.
+
+Every combination of the toggled flags is launched `runs` times. A run measures the cold start
+(creating the driver), the first page (`signin.php`), and a scenario of login, one journal entry
+and reading the journal table with the bot's own methods. The peak RSS of chromedriver and Chrome
+is sampled during the whole run, and any exception counts as a crash. Combinations are ranked by
+crash rate, then total p50 time, then peak RSS.
+
+Needs Chrome and chromedriver: `--chrome` / `--chromedriver`, by default the paths of the Lambda image.
+"""
+from itertools import combinations
+from time import perf_counter
+import os
+
+from app.browser import BASE_ARGUMENTS, LOW_MEMORY_ARGUMENTS, JS_HEAP, RENDERER_LIMIT
+from app.history import percentile
+from app.memory import MemorySampler, MB
+from bench.portal import StandInPortal
+
+# Flag yang dibandingkan (ada / tidak ada), sisanya dari BASE_ARGUMENTS selalu dipakai
+TOGGLES = {
+    "single-process": ["--single-process"],
+    "no-zygote": ["--no-zygote"],
+    "dev-shm": ["--disable-dev-shm-usage"],
+    "window-size": ["--window-size=1280x1696"],
+    "low-memory": LOW_MEMORY_ARGUMENTS + [f"--js-flags=--max-old-space-size={JS_HEAP}",
+                                          f"--renderer-process-limit={RENDERER_LIMIT}"],
+}
+TOGGLED = {flag for flags in TOGGLES.values() for flag in flags}
+
+
+def matrix(toggles: list) -> list:
+    """Return every subset of `toggles`, from none to all."""
+    return [list(subset) for n in range(len(toggles) + 1) for subset in combinations(toggles, n)]
+
+
+def arguments(enabled: list) -> list:
+    base = [flag for flag in BASE_ARGUMENTS if flag not in TOGGLED]
+    return base + [flag for name in enabled for flag in TOGGLES[name]]
+
+
+def run_once(enabled: list, portal: StandInPortal, chrome: str, chromedriver: str) -> dict:
+    """Launch Chrome with the flags of `enabled`, run the scenario and return the measurements."""
+    from selenium import webdriver
+    from app.bot import BOT
+
+    sampler = MemorySampler(limit=0, interval=0.05)
+    options = webdriver.ChromeOptions()
+    options.binary_location = chrome
+    for argument in arguments(enabled):
+        options.add_argument(argument)
+    service = webdriver.ChromeService(chromedriver)
+    driver, result = None, {"crash": None}
+    try:
+        started = perf_counter()
+        driver = webdriver.Chrome(options=options, service=service)
+        result["cold_start"] = perf_counter() - started
+        sampler.attach(service.process.pid)
+
+        started = perf_counter()
+        driver.get(f"{portal.url}/signin.php")
+        result["first_page"] = perf_counter() - started
+
+        bot = BOT(server="lambda", username="199001012020121001", password="rahasia")
+        bot.portal_url, bot.driver = portal.url, driver
+        bot.send_email = lambda **kwargs: None
+        # PORTAL TIRUAN TIDAK PERLU JEDA SETELAH LOGIN
+        bot.login_pause = 0
+        started = perf_counter()
+        if not bot.login():
+            raise RuntimeError("login gagal")
+        if not bot.fill_jurnal("07", "05", "08", "10", 1, "1", "Rapat koordinasi", 1):
+            raise RuntimeError("kegiatan tidak tersimpan")
+        if not bot.baca_tabel_jurnal():
+            raise RuntimeError("tabel jurnal kosong")
+        result["scenario"] = perf_counter() - started
+        sampler.sample()
+    except Exception as e:
+        result["crash"] = repr(e)
+    finally:
+        result["peak_rss"] = max(sampler.peaks.values(), default=0) / MB
+        sampler.stop()
+        if driver is not None:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+    return result
+
+
+def run(runs: int = 3, toggles: tuple = tuple(TOGGLES), chrome: str = None, chromedriver: str = None) -> dict:
+    """Benchmark every combination of `toggles`.
+
+    Returns:
+        dict: `ranking`, one item per combination with its crash rate, p50 timings and peak RSS, best first.
+    """
+    chrome = chrome or os.getenv("chrome_binary", "/opt/chrome/chrome")
+    chromedriver = chromedriver or os.getenv("chromedriver", "/opt/chromedriver")
+    ranking = []
+    with StandInPortal() as portal:
+        for enabled in matrix(list(toggles)):
+            results = [run_once(enabled, portal, chrome, chromedriver) for _ in range(runs)]
+            ok = [r for r in results if r["crash"] is None]
+
+            def p50(key):
+                return round(percentile(sorted(r[key] for r in ok), 50), 3) if ok else None
+
+            item = {
+                "flags": "+".join(enabled) or "(dasar)",
+                "crash_rate": round(1 - len(ok) / runs, 3),
+                "cold_start": p50("cold_start"),
+                "first_page": p50("first_page"),
+                "scenario": p50("scenario"),
+                "peak_rss_mb": round(max(r["peak_rss"] for r in results), 1),
+                "errors": sorted({r["crash"] for r in results if r["crash"]}),
+            }
+            item["total"] = round(item["cold_start"] + item["first_page"] + item["scenario"], 3) if ok else None
+            ranking.append(item)
+    ranking.sort(key=lambda r: (r["crash_rate"], r["total"] if r["total"] is not None else float("inf"), r["peak_rss_mb"]))
+    return {"runs": runs, "chrome": chrome, "ranking": ranking}
+
+
+def table(result: dict) -> str:
+    """Format the ranking as a fixed width text table."""
+    lines = [f"{'#':>2}  {'flags':<52} {'crash':>6} {'cold':>7} {'page1':>7} {'skenario':>8} {'total':>7} {'rss MB':>7}"]
+    for n, r in enumerate(result["ranking"], 1):
+        def fmt(value):
+            return f"{value:.3f}" if value is not None else "-"
+        lines.append(f"{n:>2}  {r['flags']:<52} {r['crash_rate']:>6.0%} {fmt(r['cold_start']):>7} {fmt(r['first_page']):>7} "
+                     f"{fmt(r['scenario']):>8} {fmt(r['total']):>7} {r['peak_rss_mb']:>7.1f}")
+    return "\n".join(lines)
@@ -0,0 +1,72 @@
+"""Logging overhead on the thread that fills the journal.
+
+Every WebDriver command logs its request and response on the `selenium` logger and the HTTP
+request on `urllib3` at DEBUG. The benchmark emits the lines of `entries` journal entries of
+`commands` commands each at DEBUG and measures the time spent in the calling thread with:
+
+- `sync`: the previous setup, a `StreamHandler` on the root logger formatting and writing inline,
+- `queue`: `setup_logging` with every logger at DEBUG, records only stamped and queued,
+- `levels`: `setup_logging` with its default per-logger levels, selenium and urllib3 lines dropped.
+
+Output goes to /dev/null, so the numbers are the cost of logging itself, not of the terminal.
+With such a fast sink queueing costs about as much as writing inline; it pays off when the sink
+blocks (a full pipe, a slow terminal). Dropping the selenium and urllib3 lines before they are
+formatted is what makes the overhead of an entry negligible.
+"""
+from time import perf_counter
+import logging
+import os
+
+from app.logs import TEXT_FORMAT, LEVELS, flush_logs, setup_logging, stop_logging
+from bench.commands import ENTRY_BUDGET
+
+
+def emit(entries: int, commands: int) -> float:
+    """Log the lines of `entries` entries and return the seconds spent doing so."""
+    selenium = logging.getLogger("selenium.webdriver.remote.remote_connection")
+    urllib3 = logging.getLogger("urllib3.connectionpool")
+    bot = logging.getLogger("app.bot")
+    started = perf_counter()
+    for i in range(entries):
+        bot.info(f"Mengisi kegiatan ke-{i}")
+        for n in range(commands):
+            selenium.debug('POST http://localhost:9515/session/5f2c/element {"using": "xpath", "value": "%s"}', n)
+            urllib3.debug('http://localhost:9515 "POST /session/5f2c/element HTTP/1.1" 200 0')
+            selenium.debug('Remote response: status=200 | data={"value":{"element-6066":"f.%s"}} | headers=...', n)
+    return perf_counter() - started
+
+
+def run(entries: int = 20, commands: int = ENTRY_BUDGET) -> dict:
+    """
+    Measure each logging setup on the same sequence of lines.
+
+    Returns:
+        dict: Per setup, the milliseconds spent in the calling thread per entry and the
+        microseconds per line, and for the queued setups the time the listener needed to drain.
+    """
+    lines = entries * (1 + 3 * commands)
+    result = {"entries": entries, "lines": lines}
+    with open(os.devnull, "w") as devnull:
+        root = logging.getLogger()
+        for name in ("sync", "queue", "levels"):
+            stop_logging()
+            for handler in root.handlers[:]:
+                root.removeHandler(handler)
+            for logger in ("selenium", "urllib3"):
+                logging.getLogger(logger).setLevel(logging.NOTSET)
+            if name == "sync":
+                handler = logging.StreamHandler(devnull)
+                handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+                root.addHandler(handler)
+                root.setLevel(logging.DEBUG)
+            else:
+                setup_logging(level="DEBUG", levels=LEVELS if name == "levels" else "", fmt="json", sample=0,
+                              stream=devnull)
+            seconds = emit(entries, commands)
+            started = perf_counter()
+            flush_logs()
+            result[name] = {"ms_per_entry": round(seconds * 1000 / entries, 3),
+                            "us_per_line": round(seconds * 1e6 / lines, 2),
+                            "drain_seconds": round(perf_counter() - started, 3)}
+        stop_logging()
+    return result
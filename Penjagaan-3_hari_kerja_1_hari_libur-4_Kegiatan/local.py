@@ -1,9 +1,29 @@
 from app import BOT
-import logging
+from app.logs import setup_logging
+import argparse
+import os
 
-logging.basicConfig(level=logging.DEBUG,
-                    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+setup_logging(level=os.getenv("log_level", "DEBUG"))
+
+parser = argparse.ArgumentParser(description="Menjalankan pengisian jurnal harian secara lokal")
+parser.add_argument("--daemon", action="store_true",
+                    help="tetap berjalan dan mengisi jurnal sesuai kalender, dengan browser yang tetap terbuka")
+parser.add_argument("--at", default=os.getenv("jadwal", "00:05"), help="jam pengisian (WIB) pada mode daemon")
+parser.add_argument("--port", type=int, default=int(os.getenv("status_port", 8765)),
+                    help="port status endpoint mode daemon, 0 untuk mematikan")
+parser.add_argument("--timetable", default=os.getenv("timetable"),
+                    help="timetable dari `python -m app.window plan`, jam pengisian diambil sesuai NIP")
+args = parser.parse_args()
 
 bot = BOT(server="local")
-bot.start()
+if args.daemon:
+    from app.daemon import Daemon
+    at = args.at
+    if args.timetable:
+        from app.window import load_timetable, jadwal_untuk
+        at = jadwal_untuk(load_timetable(args.timetable), bot.username) or at
+    Daemon(bot, at=at, port=args.port).run_forever()
+else:
+    bot.start()
+
 